@@ -0,0 +1,101 @@
+"""
+Audit Log - асинхронний структурований журнал завдань видалення
+Записи JSON Lines накопичуються в черзі та записуються пакетами фоновим потоком
+"""
+
+import json
+import logging
+import queue
+import threading
+import time
+
+
+DEFAULT_AUDIT_FILE = 'secure_delete_audit.jsonl'
+DEFAULT_TEXT_LOG_FILE = 'secure_delete_log.txt'
+
+text_logger = logging.getLogger('secure_delete')
+
+
+def configure_text_log(filename=DEFAULT_TEXT_LOG_FILE, level=logging.INFO):
+    """Налаштувати текстовий журнал (раніше виконувалося під час імпорту модуля)"""
+    logging.basicConfig(
+        filename=filename,
+        level=level,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        encoding='utf-8'
+    )
+
+
+class AuditLogger:
+    """
+    Неблокуючий журнал аудиту: один JSON-запис на завдання
+
+    log() лише кладе запис у чергу; фоновий потік записує пакети до batch_size
+    записів або раз на flush_interval секунд.
+
+    Args:
+        path: Файл JSON Lines
+        batch_size: Максимальна кількість записів в одному пакеті
+        flush_interval: Максимальна затримка запису в секундах
+        text_log: Дублювати короткий підсумок завдання у текстовий журнал (logging)
+    """
+
+    _STOP = object()
+
+    def __init__(self, path=DEFAULT_AUDIT_FILE, batch_size=256, flush_interval=0.5, text_log=False):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.text_log = text_log
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer, name='audit-log', daemon=True)
+        self._thread.start()
+
+    def log(self, record):
+        """Додати запис про завдання (словник) до черги; не блокує"""
+        record.setdefault('timestamp', time.time())
+        self._queue.put(record)
+
+    def _write_batch(self, stream, batch):
+        stream.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in batch))
+        stream.flush()
+        if self.text_log:
+            for record in batch:
+                self._log_text(record)
+
+    def _log_text(self, record):
+        if record.get('outcome') == 'deleted':
+            text_logger.info("Файл успішно видалено: %s (розмір: %s байт, проходів: %d, %.2f с)",
+                             record.get('path'), record.get('size'),
+                             len(record.get('passes', ())), record.get('duration', 0.0))
+        else:
+            text_logger.error("Помилка видалення файлу %s: %s", record.get('path'), record.get('error'))
+
+    def _writer(self):
+        with open(self.path, 'a', encoding='utf-8') as stream:
+            stopping = False
+            while not stopping:
+                record = self._queue.get()
+                if record is self._STOP:
+                    break
+                batch = [record]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        record = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if record is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(record)
+                self._write_batch(stream, batch)
+
+    def close(self):
+        """Записати всі накопичені записи та зупинити фоновий потік"""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
@@ -0,0 +1,174 @@
+"""
+Batch Planner - підготовка групи шляхів до видалення
+Кожен шлях перевіряється одним lstat; жорсткі посилання на той самий файл
+(st_dev, st_ino) перезаписуються один раз, а файли впорядковуються за фізичним
+зміщенням першого екстента (FIEMAP) або, якщо воно невідоме, за номером inode,
+щоб зменшити переміщення головок HDD. План містить оцінку тривалості.
+"""
+
+import os
+import stat
+from dataclasses import dataclass, field
+
+from extents import FIEMAP_EXTENT_UNKNOWN, fiemap_extents
+
+
+# Параметри оцінки тривалості за замовчуванням (без калібрування конкретної ФС)
+DEFAULT_THROUGHPUT_MB_S = 200.0
+DEFAULT_SYNC_LATENCY = 0.002  # секунд на синхронізацію файлу після кожного проходу
+DEFAULT_FILE_OVERHEAD = 0.001  # секунд на відкриття, перейменування та видалення файлу
+
+
+@dataclass
+class PlannedFile:
+    """
+    Файл групи з результатом єдиного lstat
+
+    Args:
+        path: Шлях, за яким файл перезаписується
+        size: Розмір у байтах
+        mode: st_mode (щоб не змінювати атрибути файлу, вже доступного для запису)
+        device: st_dev
+        inode: st_ino
+        links: Інші шляхи групи до того самого файлу (лише перейменовуються та видаляються)
+        physical: Фізичне зміщення першого екстента або None
+    """
+    path: str
+    size: int
+    mode: int
+    device: int
+    inode: int
+    links: list = field(default_factory=list)
+    physical: int = None
+
+    @property
+    def writable(self):
+        return bool(self.mode & stat.S_IWUSR)
+
+
+@dataclass
+class BatchPlan:
+    """
+    Впорядкований план видалення групи шляхів
+
+    Args:
+        files: PlannedFile у порядку виконання
+        directories: Шляхи каталогів (видаляються як дерева)
+        errors: Список (шлях, помилка) для відсутніх шляхів та спеціальних файлів
+        links: Шляхи до файлів, уже перезаписаних за попереднім планом зі спільним seen
+            (лише перейменовуються та видаляються)
+        total_bytes: Сумарний розмір унікальних файлів
+        duplicates: Кількість шляхів, що є жорсткими посиланнями на вже заплановані файли
+        physical_order: Кількість файлів, упорядкованих за фізичним зміщенням
+        estimated_seconds: Оцінка тривалості перезапису та видалення файлів
+    """
+    files: list = field(default_factory=list)
+    directories: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    links: list = field(default_factory=list)
+    total_bytes: int = 0
+    duplicates: int = 0
+    physical_order: int = 0
+    estimated_seconds: float = 0.0
+
+
+def first_physical_offset(path):
+    """Фізичне зміщення першого екстента файлу (FIEMAP) або None, якщо воно невідоме"""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOFOLLOW', 0))
+    except OSError:
+        return None
+    try:
+        # Досить першого екстента: запит лише для першого байта, потім - для всього файлу
+        # (файл може починатися з діри)
+        extents = fiemap_extents(fd, 1)
+        if extents == []:
+            extents = fiemap_extents(fd)
+    finally:
+        os.close(fd)
+    if not extents:
+        return None
+    _, physical, _, flags = extents[0]
+    if flags & FIEMAP_EXTENT_UNKNOWN:  # відкладене розміщення: адреса ще не призначена
+        return None
+    return physical
+
+
+def estimate_seconds(total_bytes, file_count, passes, throughput_mb_s=DEFAULT_THROUGHPUT_MB_S,
+                     sync_latency=DEFAULT_SYNC_LATENCY, file_overhead=DEFAULT_FILE_OVERHEAD):
+    """
+    Оцінити тривалість видалення: запис усіх проходів з заданою швидкістю,
+    синхронізація кожного файлу після кожного проходу та сталі витрати на файл
+    """
+    write = total_bytes * passes / (throughput_mb_s * 1024 * 1024) if throughput_mb_s else 0.0
+    return write + file_count * (passes * sync_latency + file_overhead)
+
+
+def plan_batch(paths, passes=7, physical=True, seen=None, estimate_for=None):
+    """
+    Скласти план видалення групи шляхів
+
+    Args:
+        paths: Ітерований набір шляхів
+        passes: Кількість проходів перезапису (для оцінки тривалості)
+        physical: Визначати фізичне зміщення через FIEMAP (інакше - порядок inode)
+        seen: Множина (st_dev, st_ino), спільна для кількох планів (щоб жорсткі посилання
+            не перезаписувалися повторно між частинами потоку шляхів); доповнюється
+        estimate_for: Функція шлях -> параметри estimate_seconds (throughput_mb_s,
+            sync_latency) для ФС цього шляху або None (тоді - значення за замовчуванням);
+            викликається один раз для кожного пристрою
+
+    Returns:
+        BatchPlan
+    """
+    plan = BatchPlan()
+    seen = set() if seen is None else seen
+    planned_here = {}
+
+    for path in paths:
+        path = os.fspath(path)
+        try:
+            st = os.lstat(path)
+        except OSError as e:
+            plan.errors.append((path, e))
+            continue
+
+        if stat.S_ISDIR(st.st_mode):
+            plan.directories.append(path)
+            continue
+        if not stat.S_ISREG(st.st_mode):
+            plan.errors.append((path, OSError(f"Не є звичайним файлом: {path}")))
+            continue
+
+        key = (st.st_dev, st.st_ino)
+        if key in planned_here:
+            planned_here[key].links.append(path)
+            plan.duplicates += 1
+            continue
+        if key in seen:
+            plan.links.append(path)
+            plan.duplicates += 1
+            continue
+
+        seen.add(key)
+        planned = planned_here[key] = PlannedFile(path, st.st_size, st.st_mode, st.st_dev, st.st_ino)
+        if physical and st.st_size:
+            planned.physical = first_physical_offset(path)
+            plan.physical_order += planned.physical is not None
+        plan.files.append(planned)
+        plan.total_bytes += st.st_size
+
+    # У межах пристрою: спочатку файли з відомим фізичним зміщенням, далі - за inode
+    plan.files.sort(key=lambda f: (f.device, f.physical is None,
+                                   f.physical if f.physical is not None else f.inode))
+    devices = {}
+    for planned in plan.files:
+        device = devices.get(planned.device)
+        if device is None:
+            kwargs = estimate_for(planned.path) if estimate_for is not None else None
+            device = devices[planned.device] = [kwargs or {}, 0, 0]
+        device[1] += planned.size
+        device[2] += 1
+    plan.estimated_seconds = sum(estimate_seconds(total_bytes, count, passes, **kwargs)
+                                 for kwargs, total_bytes, count in devices.values())
+    return plan
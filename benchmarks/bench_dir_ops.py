@@ -0,0 +1,102 @@
+"""
+Бенчмарк фази перейменування та видалення для великої кількості дрібних файлів
+Порівнює (файлів/с) операції за повним шляхом без синхронізації каталогу, за повним
+шляхом з fsync каталогу після кожного файлу та пакет DirectoryBatch (dir_fd,
+один fsync на каталог); окремо - повне видалення каталогу планом 'zero'
+
+Запуск:
+    python benchmarks/bench_dir_ops.py [--files 10000] [--renames 3] [--dir .] [--full]
+"""
+
+import argparse
+import logging
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dir_batch import DirectoryBatch, random_name
+
+
+def create_files(directory, count, size):
+    os.makedirs(directory)
+    data = os.urandom(size)
+    for i in range(count):
+        with open(os.path.join(directory, f"file_{i:06d}.bin"), 'wb') as f:
+            f.write(data)
+
+
+def by_path(directory, renames, sync_each):
+    dir_fd = os.open(directory, os.O_RDONLY) if sync_each else None
+    try:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            for _ in range(renames):
+                new_path = os.path.join(directory, random_name())
+                os.rename(path, new_path)
+                path = new_path
+            os.remove(path)
+            if sync_each:
+                os.fsync(dir_fd)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+
+def batched(directory, renames):
+    with DirectoryBatch() as directories:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            for _ in range(renames):
+                path = directories.rename(path, random_name())
+            directories.unlink(path)
+    return directories.sync_calls
+
+
+def full_delete(directory):
+    from deleter import SecureFileDeleter
+    SecureFileDeleter(plan='zero').secure_delete_directory(directory)
+
+
+def measure(directory, args, func):
+    create_files(directory, args.files, args.size)
+    try:
+        start = time.perf_counter()
+        func(directory)
+        elapsed = time.perf_counter() - start
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return args.files / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Швидкість перейменування та видалення дрібних файлів")
+    parser.add_argument('--files', type=int, default=10000, help="Кількість файлів")
+    parser.add_argument('--size', type=int, default=1024, help="Розмір кожного файлу в байтах")
+    parser.add_argument('--renames', type=int, default=3, help="Кількість перейменувань кожного файлу")
+    parser.add_argument('--dir', default='.', help="Каталог на досліджуваній файловій системі")
+    parser.add_argument('--full', action='store_true',
+                        help="Також виміряти повне видалення каталогу (secure_delete_directory)")
+    args = parser.parse_args()
+
+    directory = os.path.join(args.dir, 'bench_dir_ops.tmp')
+    cases = [
+        ("За шляхом, без fsync каталогу", lambda d: by_path(d, args.renames, False)),
+        ("За шляхом, fsync на файл", lambda d: by_path(d, args.renames, True)),
+        ("DirectoryBatch", lambda d: batched(d, args.renames)),
+    ]
+    if args.full:
+        logging.disable(logging.INFO)
+        cases.append(("secure_delete_directory ('zero')", full_delete))
+
+    print(f"Файлів: {args.files}, розмір: {args.size} Б, перейменувань: {args.renames}")
+    print("-" * 60)
+    for name, func in cases:
+        files_per_s = measure(directory, args, func)
+        print(f"  {name:<36} {files_per_s:>10.0f} файлів/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Мікро-бенчмарк джерел даних для проходів перезапису
+Порівнює швидкість генерації (MB/s) псевдовипадкових джерел та постійних шаблонів
+
+Запуск:
+    python benchmarks/bench_keystream.py [--size-mb 64] [--chunk-kb 1024]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from keystream import make_keystream
+
+
+def measure(name, fill, total_bytes, chunk_size):
+    """Виміряти швидкість заповнення буфера та вивести результат у MB/s"""
+    buffer = bytearray(chunk_size)
+    start = time.perf_counter()
+    offset = 0
+    while offset < total_bytes:
+        fill(buffer, offset)
+        offset += chunk_size
+    elapsed = time.perf_counter() - start
+    mb_per_s = total_bytes / (1024 * 1024) / elapsed
+    print(f"  {name:<28} {mb_per_s:>10.1f} MB/s")
+    return mb_per_s
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк джерел даних для перезапису")
+    parser.add_argument('--size-mb', type=int, default=64, help="Обсяг даних для кожного джерела")
+    parser.add_argument('--chunk-kb', type=int, default=1024, help="Розмір буфера в КБ")
+    args = parser.parse_args()
+
+    total_bytes = args.size_mb * 1024 * 1024
+    chunk_size = args.chunk_kb * 1024
+
+    print(f"Обсяг: {args.size_mb} MB, буфер: {args.chunk_kb} KB")
+    print("-" * 50)
+
+    for pattern in (b'\x00', b'\xFF', b'\xAA'):
+        def fill_pattern(buffer, offset, pattern=pattern):
+            buffer[:] = pattern * len(buffer)
+        measure(f"pattern 0x{pattern.hex().upper()}", fill_pattern, total_bytes, chunk_size)
+
+    prng = make_keystream('prng')
+    measure("keystream prng", prng.fill, total_bytes, chunk_size)
+
+    csprng = make_keystream('csprng')
+    measure(f"keystream csprng ({csprng.backend})", csprng.fill, total_bytes, chunk_size)
+
+    # Попередня реалізація (виклик Python на кожен байт) - на меншому обсязі
+    legacy_bytes = min(total_bytes, 2 * 1024 * 1024)
+
+    def fill_legacy(buffer, offset):
+        buffer[:] = bytes(random.randint(0, 255) for _ in range(len(buffer)))
+    measure("legacy random.randint", fill_legacy, legacy_bytes, min(chunk_size, legacy_bytes))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Бенчмарк масштабування паралельного перезапису одного великого файлу (range_workers)
+Для кожної кількості потоків вимірює швидкість проходу шаблоном та псевдовипадковими даними
+
+Запуск:
+    python benchmarks/bench_range_parallel.py [--size-mb 1024] [--workers 1,2,4,8,16] [--direct] [--dir .]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wipe_engine import WipeEngine
+
+
+PASS_TYPES = [
+    ('0xFF', [('0xFF', b'\xFF')]),
+    ('random', [('Random', None)]),
+]
+
+
+def create_file(path, size):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(len(block), remaining)])
+            remaining -= len(block)
+
+
+def measure(path, size, passes, workers, args):
+    engine = WipeEngine(passes, chunk_size=args.chunk_kb * 1024, direct_io=args.direct,
+                        keystream_mode=args.keystream, range_workers=workers)
+    start = time.perf_counter()
+    report = engine.run(path, size)
+    elapsed = time.perf_counter() - start
+    return report.bytes_written / (1024 * 1024) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Масштабування перезапису за кількістю потоків")
+    parser.add_argument('--size-mb', type=int, default=1024, help="Розмір тестового файлу")
+    parser.add_argument('--workers', default='1,2,4,8,16', help="Кількості потоків через кому")
+    parser.add_argument('--chunk-kb', type=int, default=4096, help="Розмір буфера запису в КБ")
+    parser.add_argument('--keystream', choices=('prng', 'csprng'), default='prng',
+                        help="Генератор псевдовипадкових даних")
+    parser.add_argument('--direct', action='store_true', help="Запис з O_DIRECT (оминаючи кеш сторінок)")
+    parser.add_argument('--dir', default='.', help="Каталог на досліджуваній файловій системі")
+    args = parser.parse_args()
+
+    workers_list = [int(value) for value in args.workers.split(',')]
+    path = os.path.join(args.dir, 'bench_range_parallel.tmp')
+    size = args.size_mb * 1024 * 1024
+    create_file(path, size)
+
+    print(f"Файл: {args.size_mb} MB, буфер: {args.chunk_kb} KB, O_DIRECT: {'так' if args.direct else 'ні'}, "
+          f"ядер: {os.cpu_count()}")
+    print(f"{'потоків':>8}" + ''.join(f"{name:>16}{'x':>8}" for name, _ in PASS_TYPES))
+    print("-" * (8 + 24 * len(PASS_TYPES)))
+    baseline = {}
+    try:
+        for workers in workers_list:
+            line = f"{workers:>8}"
+            for name, passes in PASS_TYPES:
+                mb_per_s = measure(path, size, passes, workers, args)
+                baseline.setdefault(name, mb_per_s)
+                line += f"{mb_per_s:>11.1f} MB/s{mb_per_s / baseline[name]:>7.2f}x"
+            print(line)
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Перевірка обмеження пам'яті server.secure_delete
+Видаляє файл, значно більший за JOB_MEMORY_BUDGET, в окремому процесі та перевіряє пікове RSS
+
+Запуск:
+    python benchmarks/bench_server_memory.py [--size-mb 128] [--dir .]
+Код виходу 1, якщо приріст пікового RSS перевищує допустиму межу.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r"""
+import os, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+import server
+
+def peak_rss_kb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+baseline = peak_rss_kb()
+path = sys.argv[2]
+start = time.perf_counter()
+result = server.secure_delete(path)
+elapsed = time.perf_counter() - start
+print(baseline, peak_rss_kb(), elapsed, result, sep='\n')
+"""
+
+
+def create_file(path, size):
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(len(block), remaining)])
+            remaining -= len(block)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пікове RSS сервера при видаленні великого файлу")
+    parser.add_argument('--size-mb', type=int, default=128, help="Розмір тестового файлу")
+    parser.add_argument('--dir', default='.', help="Каталог для тестового файлу")
+    parser.add_argument('--slack-mb', type=int, default=16,
+                        help="Допустимий приріст RSS понад JOB_MEMORY_BUDGET")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    import server
+
+    path = os.path.join(args.dir, 'bench_server_memory.tmp')
+    size = args.size_mb * 1024 * 1024
+    create_file(path, size)
+    try:
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, ROOT, path],
+            check=True, capture_output=True, text=True
+        ).stdout.splitlines()
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    baseline_kb, peak_kb, elapsed, result = int(output[0]), int(output[1]), float(output[2]), output[3]
+    growth_mb = (peak_kb - baseline_kb) / 1024
+    limit_mb = server.JOB_MEMORY_BUDGET / (1024 * 1024) + args.slack_mb
+
+    print(f"Файл: {args.size_mb} MB, бюджет: {server.JOB_MEMORY_BUDGET // (1024 * 1024)} MB")
+    print(f"Результат: {result} ({elapsed:.1f} с)")
+    print(f"Приріст пікового RSS: {growth_mb:.1f} MB (межа {limit_mb:.0f} MB)")
+
+    if growth_mb > limit_mb:
+        print("[FAIL] Споживання пам'яті залежить від розміру файлу")
+        sys.exit(1)
+    print("[OK] Споживання пам'яті обмежене")
+
+
+if __name__ == "__main__":
+    main()
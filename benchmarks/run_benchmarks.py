@@ -0,0 +1,465 @@
+"""
+Відтворюваний набір бенчмарків перезапису
+Корпус генерується під час запуску (create_test_files.py, дерево - generate_corpus):
+окремі файли від 4 КБ до 16 ГБ, дерево з багатьма дрібними файлами, розріджений файл та
+файли тільки для читання. Для шляхів SecureFileDeleter та server.secure_delete вимірюються
+MB/s кожного проходу, файлів/с, пікове RSS та кількість системних викликів читання/запису.
+
+Кожне вимірювання виконується в окремому процесі, щоб пікове RSS не накопичувалося.
+Сценарій повторюється --repeats разів; кожен повтор складається з кількох раундів
+(корпус генерується заново), доки сумарний час вимірювання не досягне --min-seconds.
+У результат та порівняння йде медіана повторів. Результат записується в JSON;
+з --baseline запуск завершується з кодом 1 при регресії, що перевищує і відносний
+допуск, і абсолютний поріг метрики (шум коротких вимірювань не провалює перевірку).
+
+Запуск:
+    python benchmarks/run_benchmarks.py [--profile quick|full] [--dir .] [--plan vsitr]
+                                        [--output results.json] [--baseline baseline.json]
+                                        [--repeats 3] [--min-seconds 1.0]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from create_test_files import (SIZE_UNITS, create_readonly_file, create_text_file, generate_corpus,
+                               parse_size)
+from wipe_plans import DEFAULT_PLAN, PLANS
+
+
+PROFILES = {
+    'quick': {
+        'files': ['4K', '1M', '64M'],
+        'tree': (200, '4K'),
+        'sparse': '256M',
+        'readonly': 32,
+    },
+    'full': {
+        'files': ['4K', '64K', '1M', '16M', '256M', '1G', '4G', '16G'],
+        'tree': (10000, '4K'),
+        'sparse': '4G',
+        'readonly': 64,
+    },
+}
+
+PATHS = ('deleter', 'server')
+
+# Напрям кращого значення кожної метрики для порівняння з базовим результатом
+HIGHER_IS_BETTER = ('mb_s', 'files_s')
+LOWER_IS_BETTER = ('rss_growth_mb', 'syscalls')
+
+# Абсолютні пороги: менша різниця з базовим результатом не вважається регресією
+METRIC_FLOORS = {'mb_s': 20.0, 'files_s': 20.0, 'rss_growth_mb': 16.0, 'syscalls': 64}
+
+DEFAULT_REPEATS = 3
+DEFAULT_MIN_SECONDS = 1.0
+MAX_ROUNDS = 50  # раундів в одному повторі (для дуже швидких сценаріїв)
+
+TREE_FANOUT = 100
+FILL_BLOCK = 1024 * 1024
+
+# Дрібні файли вимірюються групою копій (до FILE_COPIES або FILE_GROUP_BYTES), щоб зменшити шум
+FILE_COPIES = 64
+FILE_GROUP_BYTES = 64 * 1024 * 1024
+
+
+@contextlib.contextmanager
+def quiet():
+    """Приховати повідомлення create_test_files.py під час генерації корпусу"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def write_file(path, size):
+    """Швидко створити файл з псевдовипадковим вмістом (один блок os.urandom повторюється)"""
+    block = os.urandom(FILL_BLOCK)
+    with open(path, 'wb') as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(len(block), remaining)])
+            remaining -= len(block)
+
+
+def build_file(workdir, size):
+    files = []
+    for i in range(max(1, min(FILE_COPIES, FILE_GROUP_BYTES // size))):
+        path = os.path.join(workdir, f'file_{i:03d}.bin')
+        if size < 64 * 1024:
+            with quiet():
+                create_text_file(path, size // 1024)
+        else:
+            write_file(path, size)
+        files.append(path)
+    return 'files', files, sum(os.path.getsize(path) for path in files)
+
+
+def build_tree(workdir, count, size):
+    spec = {'entries': [{'kind': 'files', 'path': 'tree', 'count': count, 'size': size,
+                         'fanout': TREE_FANOUT, 'content': 'text'}]}
+    stats = generate_corpus(spec, workdir, progress_interval=0)
+    return 'tree', os.path.join(workdir, 'tree'), stats['bytes']
+
+
+def build_sparse(workdir, size):
+    """Розріджений файл: 1/16 обсягу розміщена рівномірно розподіленими блоками"""
+    path = os.path.join(workdir, 'sparse.bin')
+    block = os.urandom(FILL_BLOCK)
+    with open(path, 'wb') as f:
+        f.truncate(size)
+        step = max(size // 16, FILL_BLOCK)
+        for offset in range(0, size, step):
+            f.seek(offset)
+            f.write(block[:min(len(block), size - offset)])
+    return 'files', [path], size
+
+
+def build_readonly(workdir, count):
+    files = []
+    for i in range(count):
+        path = os.path.join(workdir, f'readonly_{i:03d}.txt')
+        with quiet():
+            create_readonly_file(path, 512)
+        files.append(path)
+    return 'files', files, sum(os.path.getsize(path) for path in files)
+
+
+def scenarios(profile):
+    """Список (назва, необхідний обсяг диска, функція побудови корпусу)"""
+    spec = PROFILES[profile]
+    result = []
+    for size_text in spec['files']:
+        size = parse_size(size_text)
+        result.append((f'file-{size_text}', max(size, FILE_GROUP_BYTES),
+                       lambda d, size=size: build_file(d, size)))
+    count, size_text = spec['tree']
+    size = parse_size(size_text)
+    result.append((f'tree-{count}x{size_text}', count * size * 2,
+                   lambda d, count=count, size=size: build_tree(d, count, size)))
+    size = parse_size(spec['sparse'])
+    result.append((f"sparse-{spec['sparse']}", size // 8, lambda d, size=size: build_sparse(d, size)))
+    count = spec['readonly']
+    result.append((f'readonly-{count}x512K', count * 512 * 1024,
+                   lambda d, count=count: build_readonly(d, count)))
+    return result
+
+
+# --- Вимірювання (виконується в дочірньому процесі) ---
+
+def peak_rss_kb():
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def syscall_counts():
+    """Кількість системних викликів читання та запису процесу (/proc/self/io, лише Linux)"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(': ') for line in f.read().splitlines())
+        return int(fields['syscr']), int(fields['syscw'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class RecordCollector:
+    """Замінник AuditLogger, що зберігає записи аудиту в пам'яті"""
+
+    def __init__(self):
+        self.records = []
+
+    def log(self, record):
+        self.records.append(record)
+
+
+def tree_files(root):
+    return [os.path.join(dirpath, name) for dirpath, _, names in os.walk(root) for name in names]
+
+
+def run_deleter(kind, target, plan, pass_bytes, pass_time):
+    from deleter import SecureFileDeleter
+
+    collector = RecordCollector()
+    deleter = SecureFileDeleter(audit_logger=collector, plan=plan)
+    if kind == 'tree':
+        deleter.secure_delete_directory(target)
+    else:
+        for path in target:
+            deleter.secure_delete(path)
+
+    errors = 0
+    for record in collector.records:
+        if record['outcome'] != 'deleted':
+            errors += 1
+            continue
+        per_pass = record['bytes_written'] / max(1, len(record['passes']))
+        for i, duration in enumerate(record['pass_durations']):
+            pass_bytes[i] = pass_bytes.get(i, 0) + per_pass
+            pass_time[i] = pass_time.get(i, 0.0) + duration
+    return len(collector.records) - errors, errors
+
+
+def run_server(kind, target, plan, pass_bytes, pass_time):
+    import server
+
+    files = tree_files(target) if kind == 'tree' else target
+    done = errors = 0
+    for path in files:
+        st = os.stat(path)
+        allocated = min(st.st_size, getattr(st, 'st_blocks', 0) * 512 or st.st_size)
+        # Тривалість проходу - час між викликами pass_callback (останній - до завершення завдання)
+        marks = []
+        result = server.secure_delete(path, plan=plan,
+                                      pass_callback=lambda *_: marks.append(time.perf_counter()))
+        marks.append(time.perf_counter())
+        if result != server.SUCCESS_RESPONSE:
+            errors += 1
+            continue
+        done += 1
+        for i in range(len(marks) - 1):
+            pass_bytes[i] = pass_bytes.get(i, 0) + allocated
+            pass_time[i] = pass_time.get(i, 0.0) + marks[i + 1] - marks[i]
+    if kind == 'tree':
+        shutil.rmtree(target, ignore_errors=True)
+    return done, errors
+
+
+def measure(spec):
+    """Виміряти один шлях видалення для вже згенерованого корпусу"""
+    # Модулі імпортуються до вимірювання, щоб імпорт не враховувався в RSS та викликах
+    if spec['path'] == 'deleter':
+        import deleter
+        runner = run_deleter
+    else:
+        import server
+        runner = run_server
+    pass_bytes, pass_time = {}, {}
+
+    rss_before = peak_rss_kb()
+    io_before = syscall_counts()
+    started = time.perf_counter()
+    done, errors = runner(spec['kind'], spec['target'], spec['plan'], pass_bytes, pass_time)
+    elapsed = time.perf_counter() - started
+    io_after = syscall_counts()
+    rss_after = peak_rss_kb()
+
+    written = sum(pass_bytes.values())
+    result = {
+        'written': written,
+        'pass_bytes': [pass_bytes[i] for i in sorted(pass_bytes)],
+        'pass_time': [pass_time[i] for i in sorted(pass_bytes)],
+        'files': done,
+        'errors': errors,
+        'seconds': round(elapsed, 4),
+        'mb_s': round(written / (1024 * 1024) / elapsed, 2) if elapsed else 0.0,
+        'files_s': round(done / elapsed, 2) if elapsed else 0.0,
+        'pass_mb_s': [round(pass_bytes[i] / (1024 * 1024) / pass_time[i], 2) if pass_time[i] else 0.0
+                      for i in sorted(pass_bytes)],
+        'peak_rss_mb': round(rss_after / 1024, 1),
+        'rss_growth_mb': round((rss_after - rss_before) / 1024, 1),
+    }
+    if io_before and io_after:
+        result['syscalls_read'] = io_after[0] - io_before[0]
+        result['syscalls_write'] = io_after[1] - io_before[1]
+        result['syscalls'] = result['syscalls_read'] + result['syscalls_write']
+    return result
+
+
+def run_child(spec):
+    """Запустити вимірювання в окремому процесі"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', json.dumps(spec)],
+        check=True, capture_output=True, text=True, cwd=spec['workdir']
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def merge_rounds(rounds):
+    """
+    Об'єднати раунди одного повтору: швидкості - за сумарними байтами та часом,
+    RSS - найбільше значення, системні виклики - середнє на раунд
+    """
+    seconds = sum(r['seconds'] for r in rounds)
+    written = sum(r['written'] for r in rounds)
+    files = sum(r['files'] for r in rounds)
+    passes = max(len(r['pass_bytes']) for r in rounds)
+    pass_bytes = [sum(r['pass_bytes'][i] for r in rounds if i < len(r['pass_bytes'])) for i in range(passes)]
+    pass_time = [sum(r['pass_time'][i] for r in rounds if i < len(r['pass_time'])) for i in range(passes)]
+    result = {
+        'files': files,
+        'errors': sum(r['errors'] for r in rounds),
+        'rounds': len(rounds),
+        'seconds': round(seconds, 4),
+        'mb_s': round(written / (1024 * 1024) / seconds, 2) if seconds else 0.0,
+        'files_s': round(files / seconds, 2) if seconds else 0.0,
+        'pass_mb_s': [round(b / (1024 * 1024) / t, 2) if t else 0.0 for b, t in zip(pass_bytes, pass_time)],
+        'peak_rss_mb': max(r['peak_rss_mb'] for r in rounds),
+        'rss_growth_mb': max(r['rss_growth_mb'] for r in rounds),
+    }
+    if all('syscalls' in r for r in rounds):
+        for metric in ('syscalls_read', 'syscalls_write', 'syscalls'):
+            result[metric] = round(statistics.mean(r[metric] for r in rounds))
+    return result
+
+
+def median_result(samples):
+    """Медіана кожної метрики за повторами (проходи - поелементно)"""
+    result = {'repeats': len(samples), 'files': samples[0]['files'],
+              'errors': max(s['errors'] for s in samples),
+              'rounds': sum(s['rounds'] for s in samples)}
+    for metric in ('seconds', 'mb_s', 'files_s', 'peak_rss_mb', 'rss_growth_mb',
+                   'syscalls_read', 'syscalls_write', 'syscalls'):
+        if all(metric in s for s in samples):
+            result[metric] = statistics.median(s[metric] for s in samples)
+    passes = min(len(s['pass_mb_s']) for s in samples)
+    result['pass_mb_s'] = [statistics.median(s['pass_mb_s'][i] for s in samples) for i in range(passes)]
+    result['samples'] = {metric: [s[metric] for s in samples] for metric in ('mb_s', 'files_s', 'rss_growth_mb')}
+    return result
+
+
+def run_scenario(workdir, build, spec, repeats, min_seconds):
+    """
+    Виміряти сценарій: repeats повторів, кожен - раунди з новим корпусом, доки сумарний
+    час вимірювання не досягне min_seconds; повертає (медіанний результат, обсяг корпусу)
+    """
+    samples = []
+    total = 0
+    for _ in range(repeats):
+        rounds = []
+        while not rounds or (sum(r['seconds'] for r in rounds) < min_seconds and len(rounds) < MAX_ROUNDS):
+            shutil.rmtree(workdir, ignore_errors=True)
+            os.makedirs(workdir)
+            try:
+                kind, target, total = build(workdir)
+                rounds.append(run_child(dict(spec, kind=kind, target=target, workdir=workdir)))
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+        samples.append(merge_rounds(rounds))
+    return median_result(samples), total
+
+
+# --- Порівняння з базовим результатом ---
+
+def compare(results, baseline, tolerance, rss_slack_mb):
+    """
+    Список описів регресій відносно baseline
+
+    Регресія - погіршення медіани більше ніж на tolerance та більше за абсолютний
+    поріг METRIC_FLOORS (для rss_growth_mb - не менший за rss_slack_mb).
+    """
+    floors = dict(METRIC_FLOORS, rss_growth_mb=max(METRIC_FLOORS['rss_growth_mb'], rss_slack_mb))
+    regressions = []
+    for key, current in results.items():
+        base = baseline.get('results', {}).get(key)
+        if not base or 'skipped' in current or 'skipped' in base:
+            continue
+        for metric in HIGHER_IS_BETTER:
+            if metric not in base:
+                continue
+            value = current.get(metric, 0)
+            if value < base[metric] * (1 - tolerance) and base[metric] - value > floors[metric]:
+                regressions.append(f"{key}: {metric} {value} < {base[metric]}")
+        for metric in LOWER_IS_BETTER:
+            if metric not in base or metric not in current:
+                continue
+            value = current[metric]
+            if value > base[metric] * (1 + tolerance) and value - base[metric] > floors[metric]:
+                regressions.append(f"{key}: {metric} {value} > {base[metric]}")
+    return regressions
+
+
+def print_result(key, result):
+    if 'skipped' in result:
+        print(f"  {key:<32} пропущено: {result['skipped']}")
+        return
+    passes = ' '.join(f"{value:.0f}" for value in result['pass_mb_s'])
+    syscalls = result.get('syscalls', 'n/a')
+    print(f"  {key:<32} {result['mb_s']:>9.1f} MB/s {result['files_s']:>9.1f} файл/с "
+          f"RSS +{result['rss_growth_mb']:.1f} MB  викликів: {syscalls}  проходи: [{passes}]  "
+          f"(медіана {result['repeats']} повторів, раундів: {result['rounds']})")
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--child':
+        print(json.dumps(measure(json.loads(sys.argv[2]))))
+        return
+
+    parser = argparse.ArgumentParser(description="Бенчмарки перезапису з порівнянням з базовим результатом")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick',
+                        help="Набір сценаріїв (full - файли до 16 ГБ та 10000 дрібних файлів)")
+    parser.add_argument('--dir', default='.', help="Каталог на досліджуваній файловій системі")
+    parser.add_argument('--plan', choices=sorted(PLANS), default=DEFAULT_PLAN, help="План перезапису")
+    parser.add_argument('--only', help="Запускати лише сценарії, назва яких містить цей рядок")
+    parser.add_argument('--output', default='benchmark_results.json', help="Файл результатів JSON")
+    parser.add_argument('--baseline', help="Базовий результат JSON для перевірки регресій")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Допустиме відносне погіршення метрики (0.2 = 20%%)")
+    parser.add_argument('--rss-slack-mb', type=float, default=METRIC_FLOORS['rss_growth_mb'],
+                        help="Додатковий допустимий приріст пікового RSS")
+    parser.add_argument('--repeats', type=int, default=DEFAULT_REPEATS,
+                        help="Кількість повторів кожного сценарію (порівнюється медіана)")
+    parser.add_argument('--min-seconds', type=float, default=DEFAULT_MIN_SECONDS,
+                        help="Мінімальний сумарний час вимірювання одного повтору")
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error("--repeats має бути не менше 1")
+
+    workdir = os.path.abspath(os.path.join(args.dir, 'bench_corpus.tmp'))
+    results = {}
+    print(f"Профіль: {args.profile}, план: {args.plan}, каталог: {os.path.dirname(workdir)}")
+    print("-" * 100)
+    for name, required, build in scenarios(args.profile):
+        if args.only and args.only not in name:
+            continue
+        for path_kind in PATHS:
+            key = f'{name}/{path_kind}'
+            free = shutil.disk_usage(os.path.dirname(workdir)).free
+            if free < required * 1.1:
+                results[key] = {'skipped': f"недостатньо місця ({free // SIZE_UNITS['M']} MB)"}
+            else:
+                results[key], total = run_scenario(workdir, build, {'path': path_kind, 'plan': args.plan},
+                                                   args.repeats, args.min_seconds)
+                results[key]['bytes'] = total
+            print_result(key, results[key])
+
+    report = {
+        'meta': {
+            'profile': args.profile,
+            'plan': args.plan,
+            'repeats': args.repeats,
+            'min_seconds': args.min_seconds,
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'directory': os.path.abspath(args.dir),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результати записано: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.rss_slack_mb)
+        if regressions:
+            print("[FAIL] Регресії відносно базового результату:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("[OK] Регресій відносно базового результату немає")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Calibration - вимірювання швидкості запису файлової системи та підбір параметрів рушія
+Короткі пробні записи у тимчасовий файл на тій самій ФС визначають розмір буфера,
+кількість потоків запису діапазонів (range_workers) та O_DIRECT; результат зберігається
+в невеликому кеші за ідентифікатором пристрою і повторно використовується до закінчення
+терміну дії, тож наступні видалення не виконують проб
+"""
+
+import json
+import logging
+import os
+import statistics
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+
+from wipe_engine import WipeEngine, pwrite_all
+
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_TTL = 7 * 24 * 3600  # секунд
+
+# Обсяг одного пробного запису та кандидати параметрів
+PROBE_SIZE = 32 * 1024 * 1024
+MIN_PROBE_SIZE = 1024 * 1024
+CHUNK_CANDIDATES = (256 * 1024, 1024 * 1024, 4 * 1024 * 1024, 16 * 1024 * 1024)
+WORKER_CANDIDATES = (2, 4)
+SYNC_PROBES = 3
+
+# Кандидат, повільніший за найкращий не більше ніж на TIE_MARGIN, вважається рівним
+# (тоді обирається менший буфер, менше потоків та запис через кеш сторінок)
+TIE_MARGIN = 0.05
+
+PROBE_PATTERN = b'\x55'
+
+# Кількість запам'ятованих ключів пристроїв каталогів (lookup виконується для кожного файлу)
+MAX_DEVICE_KEYS = 4096
+
+
+def default_cache_path():
+    """Шлях кешу калібрування у каталозі кешу користувача"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.environ.get('LOCALAPPDATA') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'secure_file_deleter', 'calibration.json')
+
+
+def device_key(path):
+    """
+    Ідентифікатор файлової системи шляху: st_dev та, де доступно, f_fsid
+
+    st_dev може повторно призначатися іншому носію (наприклад, USB після перепідключення),
+    тому до нього додається ідентифікатор ФС.
+    """
+    key = str(os.stat(path).st_dev)
+    if hasattr(os, 'statvfs'):
+        fsid = getattr(os.statvfs(path), 'f_fsid', None)
+        if fsid is not None:
+            key += f':{fsid}'
+    return key
+
+
+@dataclass
+class Calibration:
+    """
+    Результат калібрування однієї файлової системи
+
+    Args:
+        device: Ключ пристрою (device_key)
+        chunk_size: Обраний розмір буфера запису
+        range_workers: Обрана кількість потоків запису діапазонів
+        direct_io: Чи обрано O_DIRECT
+        throughput_mb_s: Швидкість обраної конфігурації
+        sync_latency: Медіана тривалості fsync після невеликого запису (секунд)
+        measured_at: Час вимірювання (time.time())
+        probes: Результати всіх проб (для діагностики)
+    """
+    device: str
+    chunk_size: int
+    range_workers: int
+    direct_io: bool
+    throughput_mb_s: float
+    sync_latency: float
+    measured_at: float
+    probes: list = field(default_factory=list)
+
+    def engine_kwargs(self):
+        """Параметри WipeEngine, що перекриваються калібруванням"""
+        return {'chunk_size': self.chunk_size, 'range_workers': self.range_workers,
+                'direct_io': self.direct_io}
+
+    def estimate_kwargs(self):
+        """Параметри batch_planner.estimate_seconds"""
+        return {'throughput_mb_s': self.throughput_mb_s, 'sync_latency': self.sync_latency}
+
+
+def _probe(path, size, chunk_size, workers, direct_io):
+    """Один прохід перезапису пробного файлу; повертає (MB/s, чи використано O_DIRECT)"""
+    engine = WipeEngine([('probe', PROBE_PATTERN)], chunk_size=chunk_size, direct_io=direct_io,
+                        range_workers=workers)
+    started = time.perf_counter()
+    report = engine.run(path, size)
+    elapsed = time.perf_counter() - started
+    return report.bytes_written / (1024 * 1024) / elapsed, report.direct_io
+
+
+def _sync_latency(directory):
+    """Медіана тривалості fsync після запису одного блоку"""
+    fd, path = tempfile.mkstemp(prefix='.secure_delete_sync-', dir=directory)
+    try:
+        durations = []
+        block = bytes(4096)
+        for _ in range(SYNC_PROBES):
+            pwrite_all(fd, block, 0)
+            started = time.perf_counter()
+            os.fsync(fd)
+            durations.append(time.perf_counter() - started)
+        return statistics.median(durations)
+    finally:
+        os.close(fd)
+        os.remove(path)
+
+
+def calibrate(directory, probe_size=PROBE_SIZE):
+    """
+    Виміряти файлову систему каталогу directory
+
+    Спершу порівнюються розміри буфера (один потік, кеш сторінок), потім для найкращого
+    буфера - O_DIRECT та кілька потоків. Пробний файл спочатку заповнюється (без
+    вимірювання), тож проби вимірюють перезапис уже розміщених блоків, як під час видалення
+    (діри розрідженого файлу рушій не перезаписує).
+
+    Returns:
+        Calibration або None, якщо на ФС недостатньо вільного місця для проби
+    """
+    directory = os.path.abspath(directory)
+    if hasattr(os, 'statvfs'):
+        st = os.statvfs(directory)
+        probe_size = min(probe_size, st.f_bavail * st.f_frsize // 4)
+    probe_size -= probe_size % (1024 * 1024)
+    if probe_size < MIN_PROBE_SIZE:
+        return None
+
+    fd, path = tempfile.mkstemp(prefix='.secure_delete_calibration-', dir=directory)
+    probes = []
+    try:
+        block = bytes(1024 * 1024)
+        for offset in range(0, probe_size, len(block)):
+            pwrite_all(fd, block, offset)
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+
+        def measure(chunk_size, workers, direct_io):
+            mb_s, used_direct = _probe(path, probe_size, chunk_size, workers, direct_io)
+            probes.append({'chunk_size': chunk_size, 'range_workers': workers,
+                           'direct_io': used_direct, 'mb_s': round(mb_s, 1)})
+            return probes[-1]
+
+        best = max((measure(chunk, 1, False) for chunk in CHUNK_CANDIDATES), key=lambda p: p['mb_s'])
+        chunk_size = min(p['chunk_size'] for p in probes if p['mb_s'] >= best['mb_s'] * (1 - TIE_MARGIN))
+        chosen = next(p for p in probes if p['chunk_size'] == chunk_size)
+
+        direct = measure(chunk_size, 1, True)
+        if direct['direct_io'] and direct['mb_s'] > chosen['mb_s'] * (1 + TIE_MARGIN):
+            chosen = direct
+        for workers in WORKER_CANDIDATES:
+            candidate = measure(chunk_size, workers, chosen['direct_io'])
+            if candidate['mb_s'] > chosen['mb_s'] * (1 + TIE_MARGIN):
+                chosen = candidate
+        sync_latency = _sync_latency(directory)
+    finally:
+        if fd is not None:
+            os.close(fd)
+        os.remove(path)
+
+    return Calibration(device=device_key(directory), chunk_size=chosen['chunk_size'],
+                       range_workers=chosen['range_workers'], direct_io=chosen['direct_io'],
+                       throughput_mb_s=chosen['mb_s'], sync_latency=round(sync_latency, 6),
+                       measured_at=time.time(), probes=probes)
+
+
+class CalibrationCache:
+    """
+    Кеш калібрувань за ключем пристрою з терміном дії
+
+    Файл кешу - один JSON, що замінюється атомарно (тимчасовий файл, fsync, os.replace);
+    пошкоджений чи несумісний кеш ігнорується. Калібрування однієї ФС виконується лише
+    одним потоком, інші чекають на його результат.
+
+    Args:
+        path: Файл кешу (за замовчуванням - default_cache_path())
+        ttl: Термін дії запису в секундах
+        probe_size: Обсяг пробного запису
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_CACHE_TTL, probe_size=PROBE_SIZE):
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self.probe_size = probe_size
+        self._entries = None
+        self._device_keys = {}  # каталог -> device_key (до MAX_DEVICE_KEYS записів)
+        self._lock = threading.Lock()
+        self._calibrating = threading.Lock()
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') != CACHE_VERSION:
+                    raise ValueError(f"версія кешу {data.get('version')}")
+                self._entries = {key: Calibration(**value) for key, value in data['entries'].items()}
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logging.warning("Кеш калібрування %s пошкоджено, його буде перезаписано: %s",
+                                self.path, e)
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        data = {'version': CACHE_VERSION,
+                'entries': {key: asdict(value) for key, value in self._entries.items()}}
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"  # кеш можуть оновлювати кілька процесів
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, directory):
+        """Чинне калібрування ФС каталогу з кешу або None (проби не виконуються)"""
+        key = self._device_keys.get(directory)
+        if key is None:
+            try:
+                key = device_key(directory)
+            except OSError:
+                return None
+            if len(self._device_keys) >= MAX_DEVICE_KEYS:
+                self._device_keys.clear()
+            self._device_keys[directory] = key
+        with self._lock:
+            calibration = self._load().get(key)
+        if calibration is None or time.time() - calibration.measured_at > self.ttl:
+            return None
+        return calibration
+
+    def get(self, directory, status_callback=None):
+        """
+        Калібрування ФС каталогу: з кешу або, якщо його немає чи термін дії минув,
+        нове вимірювання в цьому каталозі (результат зберігається в кеші)
+        """
+        calibration = self.lookup(directory)
+        if calibration is not None:
+            return calibration
+        with self._calibrating:
+            calibration = self.lookup(directory)  # могло бути виміряно іншим потоком
+            if calibration is not None:
+                return calibration
+            if status_callback:
+                status_callback("Калібрування файлової системи...")
+            calibration = calibrate(directory, self.probe_size)
+            if calibration is None:
+                return None
+            logging.info("Калібрування %s: буфер %d КБ, потоків %d, O_DIRECT %s, %.1f MB/s",
+                         directory, calibration.chunk_size // 1024, calibration.range_workers,
+                         calibration.direct_io, calibration.throughput_mb_s)
+            with self._lock:
+                self._load()[calibration.device] = calibration
+                try:
+                    self._save()
+                except OSError as e:
+                    logging.warning("Не вдалося зберегти кеш калібрування: %s", e)
+            return calibration
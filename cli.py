@@ -0,0 +1,467 @@
+"""
+Secure Delete CLI - консольне безпечне видалення файлів без графічного інтерфейсу
+Шляхи передаються аргументами або через stdin, розділені NUL (find -print0);
+результат кожного шляху виводиться окремим рядком JSON (JSON Lines). Шляхи
+плануються частинами по PLAN_WINDOW (batch_planner): один lstat на шлях,
+жорсткі посилання перезаписуються один раз, порядок - за фізичним розміщенням
+
+Запуск:
+    python cli.py [--plan vsitr] [--jobs 4] [-r] PATH...
+    python cli.py --device-jobs 1 --device-bandwidth 50 PATH...   (обмеження на кожен пристрій)
+    find DIR -type f -print0 | python cli.py --null --jobs 8
+    python cli.py --dry-run PATH...   (лише план та оцінка тривалості)
+    python cli.py --free-space [--reserve 1024] DIR...   (перезапис вільного місця ФС каталогів)
+
+Коди завершення:
+    0 - усі шляхи видалено (з --free-space - вільне місце всіх каталогів перезаписано)
+    1 - частину шляхів не видалено (подробиці - у полі error відповідних рядків)
+    2 - неправильні аргументи
+    130 - перервано (Ctrl+C)
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from deleter import SecureFileDeleter
+from dir_batch import DirectoryBatch
+from io_scheduler import DeviceScheduler
+from wipe_engine import FILE_DURABILITY_POLICIES
+from wipe_plans import DEFAULT_PLAN, PLANS
+
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_INTERRUPTED = 130
+
+DEFAULT_JOBS = 4
+
+# Розмір блоку читання шляхів з stdin
+STDIN_BLOCK = 64 * 1024
+
+# Кількість шляхів в одному плані (пам'ять плану не залежить від загальної кількості шляхів)
+PLAN_WINDOW = 4096
+
+# Скільки секунд після Ctrl+C чекати на завдання, що вже виконуються (перезапис
+# переривається на наступному фрагменті, тож зазвичай вони завершуються одразу)
+INTERRUPT_GRACE = 2.0
+
+# Період виведення прогресу перезапису вільного місця в stderr (секунд)
+FREE_SPACE_PROGRESS_INTERVAL = 1.0
+
+
+def read_null_paths(stream):
+    """Потоково читати шляхи, розділені NUL (пам'ять не залежить від кількості шляхів)"""
+    pending = b''
+    while True:
+        block = stream.read(STDIN_BLOCK)
+        if not block:
+            break
+        *paths, pending = (pending + block).split(b'\0')
+        for path in paths:
+            if path:
+                yield os.fsdecode(path)
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def windows(paths, size=PLAN_WINDOW):
+    """Розбити потік шляхів на списки до size шляхів"""
+    window = []
+    for path in paths:
+        window.append(path)
+        if len(window) >= size:
+            yield window
+            window = []
+    if window:
+        yield window
+
+
+def plan_jobs(plan, recursive):
+    """
+    Завдання одного плану: (вид, шлях, PlannedFile або помилка)
+
+    Вид: 'file' - перезапис, 'link' - лише видалення імені вже перезаписаного файлу,
+    'dir' - дерево каталогу, 'error' - шлях, який не можна видалити.
+    """
+    for path, error in plan.errors:
+        yield 'error', path, error
+    for path in plan.directories:
+        if recursive:
+            yield 'dir', path, None
+        else:
+            yield 'error', path, IsADirectoryError(f"Це каталог (потрібен -r): {path}")
+    for planned in plan.files:
+        yield 'file', planned.path, planned
+    for path in plan.links:
+        yield 'link', path, None
+
+
+def wipe_path(deleter, kind, path, item, workers, throttle=None, directories=None,
+              journal_entry=None):
+    """
+    Виконати одне завдання плану; повертає словник результату для JSON Lines
+
+    throttle передається рушію перезапису (піднімає виняток, щоб перервати перезапис);
+    directories - спільний DirectoryBatch вікна плану (каталоги синхронізуються після
+    завершення всіх його завдань); journal_entry - завдання з групового запису журналу вікна.
+    """
+    started = time.perf_counter()
+    result = {'path': path}
+    try:
+        if kind == 'error':
+            raise item
+        if kind == 'dir':
+            progress = deleter.secure_delete_directory(path, workers=workers)
+            result.update(files=progress.files_done, bytes=progress.bytes_done,
+                          failed=progress.files_failed)
+            if progress.files_failed:
+                raise OSError(f"Не вдалося видалити {progress.files_failed} файл(ів)")
+        elif kind == 'link':
+            deleter.remove_link(path, directories)
+        else:
+            result['bytes'] = item.size
+            if item.links:
+                result['links'] = item.links
+            deleter.secure_delete(path, planned=item, throttle=throttle, directories=directories,
+                                  journal_entry=journal_entry)
+        result['status'] = 'deleted'
+    except Exception as e:
+        result.update(status='failed', error=str(e))
+    result['seconds'] = round(time.perf_counter() - started, 6)
+    return result
+
+
+def resume_journal(deleter, output=sys.stdout):
+    """
+    Завершити завдання, перервані попереднім запуском (за журналом --journal)
+
+    Результат кожного завдання виводиться рядком JSON з полем resumed.
+
+    Returns:
+        Кількість завдань, які не вдалося завершити
+    """
+    failed = 0
+    for path, error in deleter.resume_pending():
+        result = {'path': path, 'resumed': True, 'status': 'deleted'}
+        if error is not None:
+            failed += 1
+            result.update(status='failed', error=str(error))
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+    output.flush()
+    return failed
+
+
+def dry_run(deleter, paths, recursive, output=sys.stdout):
+    """Вивести план (по рядку на завдання) та підсумок з оцінкою тривалості без видалення"""
+    seen = set()
+    total = {'files': 0, 'bytes': 0, 'duplicates': 0, 'errors': 0, 'estimated_seconds': 0.0}
+    for window in windows(paths):
+        plan = deleter.plan_batch(window, seen=seen)
+        for kind, path, item in plan_jobs(plan, recursive):
+            line = {'path': path, 'kind': kind}
+            if kind == 'file':
+                line.update(bytes=item.size, physical=item.physical)
+                if item.links:
+                    line['links'] = item.links
+            elif kind == 'error':
+                line['error'] = str(item)
+                total['errors'] += 1
+            output.write(json.dumps(line, ensure_ascii=False) + '\n')
+        total['files'] += len(plan.files)
+        total['bytes'] += plan.total_bytes
+        total['duplicates'] += plan.duplicates
+        total['estimated_seconds'] += plan.estimated_seconds
+    total['estimated_seconds'] = round(total['estimated_seconds'], 3)
+    output.write(json.dumps({'summary': total}) + '\n')
+    return total['errors']
+
+
+class PlanWindow:
+    """
+    Завдання одного плану зі спільним DirectoryBatch та результатами, що чекають на синхронізацію
+
+    entries - завдання файлів вікна з групового запису журналу, що ще не передані в пул або скасовані
+    (шлях -> JournalEntry)
+    """
+
+    def __init__(self, entries=None):
+        self.directories = DirectoryBatch()
+        self.entries = entries or {}
+        self.pending = 0
+        self.results = []
+        self.submitted = False
+
+    def finish(self, close=True):
+        """
+        Синхронізувати каталоги вікна (close=False - без закриття дескрипторів, якщо
+        завдання ще виконуються); повертає результати, видалення яких тепер надійне
+        """
+        try:
+            if close:
+                self.directories.close()
+            else:
+                self.directories.sync()
+        except OSError as e:
+            for result in self.results:
+                if result['status'] == 'deleted':
+                    result.update(status='failed', error=f"Не вдалося синхронізувати каталог: {e}")
+        results, self.results = self.results, []
+        return results
+
+
+def run(deleter, paths, jobs, recursive, output=sys.stdout, device_jobs=None, device_bandwidth=None,
+        stats_output=sys.stderr):
+    """
+    Видалити шляхи: файли - у чергах їхніх пристроїв (DeviceScheduler, device_jobs файлів
+    одночасно на пристрій, за замовчуванням jobs; запис не швидше device_bandwidth байтів/с
+    на пристрій), каталоги та решта завдань - у jobs потоках
+
+    Статистика пристроїв (глибина черги, пропускна здатність) виводиться наприкінці
+    рядком JSON {"devices": [...]} у stats_output.
+
+    Шляхи плануються частинами по PLAN_WINDOW, кількість завдань у черзі обмежена,
+    тож шляхи з stdin читаються потоково. Файли одного вікна перейменовуються та
+    видаляються через спільний DirectoryBatch: кожен змінений каталог синхронізується
+    один раз після завершення всіх завдань вікна, і лише тоді виводяться їхні
+    результати (в порядку завершення, лише з головного потоку).
+
+    З журналом файли вікна записуються одним груповим записом (journal_batch).
+    Після Ctrl+C завдання в черзі скасовуються (рядок зі статусом 'cancelled', їхні
+    завдання видаляються з журналу),
+    перезапис поточних файлів переривається, результати завершених завдань виводяться,
+    а KeyboardInterrupt передається далі.
+
+    Returns:
+        Кількість шляхів, які не вдалося видалити
+    """
+    failed = 0
+    futures = {}  # future -> (шлях, PlanWindow, JournalEntry або None)
+    scheduler = DeviceScheduler(deleter, concurrency=device_jobs or jobs, bandwidth=device_bandwidth)
+    open_windows = []
+    seen = set()
+    stop = threading.Event()
+
+    def interrupted(size):
+        if stop.is_set():
+            raise InterruptedError("Перервано (Ctrl+C)")
+
+    def write(results):
+        nonlocal failed
+        for result in results:
+            failed += result['status'] != 'deleted'
+            output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+
+    def write_stats():
+        stats_output.write(json.dumps({'devices': scheduler.stats()}) + '\n')
+        stats_output.flush()
+
+    def finish_window(window):
+        open_windows.remove(window)
+        write(window.finish())
+
+    def record(future):
+        path, window, entry = futures.pop(future)
+        window.pending -= 1
+        if future.cancelled():
+            if entry is not None:
+                window.entries[path] = entry
+            window.results.append({'path': path, 'status': 'cancelled'})
+        else:
+            window.results.append(future.result())
+        return window
+
+    def collect():
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            window = record(future)
+            if window.submitted and not window.pending:
+                finish_window(window)
+
+    executor = ThreadPoolExecutor(max_workers=jobs)
+    try:
+        for paths_window in windows(paths):
+            plan = deleter.plan_batch(paths_window, seen=seen)
+            window = PlanWindow(deleter.journal_batch(plan.files))
+            open_windows.append(window)
+            for kind, path, item in plan_jobs(plan, recursive):
+                entry = window.entries.pop(path, None)
+                if kind == 'file':
+                    future = scheduler.submit_call(item.device, wipe_path, deleter, kind, path, item, jobs,
+                                                   throttle=interrupted, directories=window.directories,
+                                                   journal_entry=entry)
+                else:
+                    future = executor.submit(wipe_path, deleter, kind, path, item, jobs, interrupted,
+                                             window.directories, entry)
+                futures[future] = (path, window, entry)
+                window.pending += 1
+                # Черга кожного пристрою тримає до двох завдань на потік
+                while len(futures) >= (jobs + scheduler.capacity()) * 2:
+                    collect()
+            window.submitted = True
+            if not window.pending:
+                finish_window(window)
+        while futures:
+            collect()
+    except KeyboardInterrupt:
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+        scheduler.shutdown(wait=False, cancel_futures=True)
+        # Скасовані завдання wait() не вважає завершеними - чекати лише на ті, що виконуються
+        wait([future for future in futures if not future.cancelled()], timeout=INTERRUPT_GRACE)
+        for future in list(futures):
+            if future.done():
+                record(future)
+        for window in open_windows:
+            write(window.finish(close=not window.pending))
+        # Скасовані й не передані до пулу файли не видалятимуться й під час наступного запуску
+        # з журналом (групові записи перезаписуються один раз)
+        if deleter.journal is not None:
+            deleter.journal.discard([entry for window in open_windows for entry in window.entries.values()])
+        write_stats()
+        raise
+    executor.shutdown()
+    scheduler.shutdown()
+    write_stats()
+    return failed
+
+
+def wipe_free_space(deleter, paths, jobs, reserve, output=sys.stdout, progress_output=sys.stderr):
+    """
+    Перезаписати вільне місце ФС кожного каталогу paths (по черзі, jobs заповнювачів одночасно)
+
+    Прогрес (записані байти) виводиться рядками JSON у progress_output не частіше
+    FREE_SPACE_PROGRESS_INTERVAL, результат кожного каталогу - у output.
+
+    Returns:
+        Кількість каталогів, для яких перезапис не вдався
+    """
+    failed = 0
+    for path in paths:
+        started = time.perf_counter()
+        result = {'path': path}
+        last_report = [0.0]
+
+        def on_progress(progress, path=path):
+            now = time.monotonic()
+            if now - last_report[0] >= FREE_SPACE_PROGRESS_INTERVAL:
+                last_report[0] = now
+                progress_output.write(json.dumps({'path': path, 'bytes_done': progress.bytes_done,
+                                                  'bytes_total': progress.bytes_total}) + '\n')
+                progress_output.flush()
+
+        try:
+            progress = deleter.wipe_free_space(path, workers=jobs, reserve=reserve,
+                                               progress_callback=on_progress)
+            result.update(status='wiped', bytes=progress.bytes_allocated, written=progress.bytes_done,
+                          fillers=progress.files_created, stopped=progress.stopped)
+        except Exception as e:
+            failed += 1
+            result.update(status='failed', error=str(e))
+        result['seconds'] = round(time.perf_counter() - started, 6)
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Безпечне видалення файлів з командного рядка")
+    parser.add_argument('paths', nargs='*', help="Файли (та каталоги з -r) для видалення")
+    parser.add_argument('-0', '--null', action='store_true',
+                        help="Читати шляхи з stdin, розділені NUL (find -print0)")
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS,
+                        help="Кількість файлів, що видаляються одночасно")
+    parser.add_argument('--device-jobs', type=int, metavar='N',
+                        help="Кількість файлів, що видаляються одночасно на одному пристрої "
+                             "(за замовчуванням - --jobs)")
+    parser.add_argument('--device-bandwidth', type=float, metavar='MB',
+                        help="Обмеження швидкості запису на кожен пристрій, MB/s")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Видаляти каталоги рекурсивно")
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help="Лише вивести план та оцінку тривалості, нічого не видаляючи")
+    parser.add_argument('--free-space', action='store_true',
+                        help="Перезаписати вільне місце файлової системи кожного заданого каталогу")
+    parser.add_argument('--reserve', type=int, metavar='MB',
+                        help="Скільки місця (MB) лишити вільним під час перезапису вільного місця "
+                             "(за замовчуванням - DEFAULT_RESERVE модуля free_space_wipe)")
+    parser.add_argument('--plan', choices=sorted(PLANS), default=DEFAULT_PLAN, help="План перезапису")
+    parser.add_argument('--keystream', choices=('prng', 'csprng'), default='prng',
+                        help="Генератор псевдовипадкових даних")
+    # Файли видаляються по одному (secure_delete), тож групова політика 'batch' недоступна
+    parser.add_argument('--durability', choices=FILE_DURABILITY_POLICIES, default='fsync',
+                        help="Політика синхронізації після проходу")
+    parser.add_argument('--direct', action='store_true', help="Запис з O_DIRECT (оминаючи кеш сторінок)")
+    parser.add_argument('--verify', choices=('full', 'sample'),
+                        help="Перевірка останнього проходу: весь файл або вибіркові блоки")
+    parser.add_argument('--autotune', nargs='?', const='', metavar='CACHE',
+                        help="Підбирати буфер, потоки та O_DIRECT калібруванням кожної ФС "
+                             "(результати зберігаються в кеші CACHE, за замовчуванням - у кеші користувача)")
+    parser.add_argument('--journal', metavar='DIR',
+                        help="Каталог журналу: завдання, перервані попереднім запуском, "
+                             "завершуються перед новими шляхами")
+    parser.add_argument('--audit', metavar='FILE', help="Журнал аудиту JSON Lines")
+    parser.add_argument('--log', metavar='FILE', help="Текстовий журнал операцій")
+    args = parser.parse_args(argv)
+
+    if args.jobs < 1:
+        parser.error("--jobs має бути не менше 1")
+    if args.null and args.paths:
+        parser.error("шляхи задаються або аргументами, або через stdin з --null")
+    if not args.null and not args.paths:
+        parser.error("не задано жодного шляху")
+    if args.free_space and args.dry_run:
+        parser.error("--dry-run не підтримується з --free-space")
+    if args.device_jobs is not None and args.device_jobs < 1:
+        parser.error("--device-jobs має бути не менше 1")
+    if args.device_bandwidth is not None and args.device_bandwidth <= 0:
+        parser.error("--device-bandwidth має бути додатним")
+    if args.reserve is not None and args.reserve < 0:
+        parser.error("--reserve не може бути від'ємним")
+
+    # Журнали створюються лише на вимогу: без них запуск не залишає файлів у поточному каталозі
+    audit_logger = journal = calibration = None
+    if args.log:
+        from audit_log import configure_text_log
+        configure_text_log(args.log)
+    if args.audit:
+        from audit_log import AuditLogger
+        audit_logger = AuditLogger(args.audit, text_log=bool(args.log))
+    if args.journal:
+        from journal import WipeJournal
+        journal = WipeJournal(args.journal)
+    if args.autotune is not None:
+        from calibration import CalibrationCache
+        calibration = CalibrationCache(args.autotune or None)
+
+    deleter = SecureFileDeleter(keystream_mode=args.keystream, direct_io=args.direct,
+                                audit_logger=audit_logger, verify=args.verify, plan=args.plan,
+                                durability=args.durability, journal=journal, calibration=calibration)
+    paths = read_null_paths(sys.stdin.buffer) if args.null else args.paths
+    try:
+        failed = 0
+        if journal is not None and not args.dry_run:
+            failed = resume_journal(deleter)
+        if args.free_space:
+            reserve = args.reserve * 1024 * 1024 if args.reserve is not None else None
+            failed += wipe_free_space(deleter, paths, args.jobs, reserve)
+        elif args.dry_run:
+            failed += dry_run(deleter, paths, args.recursive)
+        else:
+            bandwidth = args.device_bandwidth * 1024 * 1024 if args.device_bandwidth else None
+            failed += run(deleter, paths, args.jobs, args.recursive, device_jobs=args.device_jobs,
+                          device_bandwidth=bandwidth)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    finally:
+        if audit_logger:
+            audit_logger.close()
+    return EXIT_FAILED if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
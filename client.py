@@ -1,15 +1,105 @@
 import tkinter as tk
 from tkinter import messagebox
+import itertools
 import socket
 import os
 
-def send_to_server(file_path, host='localhost', port=12345):
+from protocol import recv_message, send_message
+
+class StaleConnectionError(ConnectionError):
+    """A reused connection failed before any reply arrived; the request can be resent"""
+
+
+class BatchInterruptedError(ConnectionError):
+    """The connection was lost mid-batch; results holds the result messages received so far"""
+
+    def __init__(self, message, results):
+        super().__init__(message)
+        self.results = results
+
+
+class ServerConnection:
+    """Persistent connection to the deletion server, reused across requests"""
+
+    def __init__(self, host='localhost', port=12345):
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.request_ids = itertools.count(1)
+
+    def connect(self):
+        if self.sock is None:
+            self.sock = socket.create_connection((self.host, self.port))
+        return self.sock
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def delete(self, paths, event_callback=None, plan=None):
+        """Submit a batch of paths and wait for all results.
+
+        event_callback receives every streamed event (pass, progress, result).
+        Returns a list of result messages in the order of paths. If the connection
+        drops before any reply byte arrives, a reused socket raises StaleConnectionError;
+        once replies have started, BatchInterruptedError carries the partial results.
+        """
+        paths = list(paths)
+        request_id = next(self.request_ids)
+        reused = self.sock is not None
+        sock = self.connect()
+        results = {}
+        replied = False
+        try:
+            request = {'type': 'delete', 'id': request_id, 'paths': paths}
+            if plan:
+                request['plan'] = plan
+            send_message(sock, request)
+            if not sock.recv(1, socket.MSG_PEEK):
+                raise ConnectionError("Connection closed by peer")
+            replied = True
+            while True:
+                message = recv_message(sock)
+                if event_callback:
+                    event_callback(message)
+                if message['type'] == 'result':
+                    results[message['job']] = message
+                elif message['type'] == 'error':
+                    raise RuntimeError(message['message'])
+                elif message['type'] == 'done' and message['id'] == request_id:
+                    return [results[job_id] for job_id in sorted(results)]
+        except OSError as e:
+            self.close()
+            if not replied:
+                if reused:
+                    raise StaleConnectionError(str(e)) from e
+                raise
+            raise BatchInterruptedError(
+                f"Connection lost after {len(results)} of {len(paths)} results: {e}",
+                [results[job_id] for job_id in sorted(results)]) from e
+        except Exception:
+            self.close()
+            raise
+
+_connections = {}
+
+def get_connection(host='localhost', port=12345):
+    if (host, port) not in _connections:
+        _connections[(host, port)] = ServerConnection(host, port)
+    return _connections[(host, port)]
+
+def send_batch(file_paths, host='localhost', port=12345, event_callback=None, plan=None):
+    connection = get_connection(host, port)
+    try:
+        return connection.delete(file_paths, event_callback, plan)
+    except StaleConnectionError:
+        # The server closed the idle pooled connection before reading the request; resend once
+        return connection.delete(file_paths, event_callback, plan)
+
+def send_to_server(file_path, host='localhost', port=12345, event_callback=None):
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.connect((host, port))
-            s.sendall(file_path.encode('utf-8'))
-            response = s.recv(1024).decode('utf-8')
-            return response
+        return send_batch([file_path], host, port, event_callback)[0]['message']
     except Exception as e:
         return f"Error: {e}"
 
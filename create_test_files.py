@@ -1,12 +1,24 @@
 """
 Скрипт для створення тестових файлів для експериментів
-Створює текстові та графічні файли розміром ≥512 КБ
+Створює текстові та графічні файли розміром ≥512 КБ, а з --spec - корпус для
+тестів перезапису за декларативною специфікацією (мільйони дрібних файлів,
+багатогігабайтні та розріджені файли, глибокі дерева)
+
+Запуск:
+    python create_test_files.py
+    python create_test_files.py --spec corpus.json [--dir .] [--workers 4]
 """
 
+import argparse
+import json
 import os
+import stat
 import sys
-import random
-from PIL import Image, ImageDraw, ImageFont
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from keystream import PRNGKeystream
+from wipe_engine import pwrite_all
 
 # Налаштування кодування для Windows консолі
 if sys.platform == 'win32':
@@ -14,6 +26,38 @@ if sys.platform == 'win32':
     sys.stdout = codecs.getwriter('utf-8')(sys.stdout.buffer, 'strict')
     sys.stderr = codecs.getwriter('utf-8')(sys.stderr.buffer, 'strict')
 
+SAMPLE_TEXT = (
+    "Це тестовий файл для експерименту з безпечним видаленням файлів. "
+    "Програма використовує алгоритм German VSITR для остаточного видалення даних. "
+    "Алгоритм виконує 7 проходів перезапису: 0x00, 0xFF, псевдовипадкові дані (3 проходи), "
+    "0xAA, та знову псевдовипадкові дані. "
+)
+
+SIZE_UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+
+# Буфер вмісту корпусу: генерується один раз і записується зрізами, тож пам'ять
+# не залежить від розміру та кількості файлів
+CORPUS_CHUNK = 4 * 1024 * 1024
+
+# Файли, більші за CORPUS_RANGE, записуються кількома потоками суміжними діапазонами
+CORPUS_RANGE = 256 * 1024 * 1024
+
+DEFAULT_CORPUS_WORKERS = 4
+DEFAULT_FANOUT = 1000
+CONTENT_KINDS = ('random', 'text', 'zero')
+
+
+def text_lines(size_bytes, first_line=1):
+    """Пронумеровані рядки SAMPLE_TEXT загальним обсягом не менше size_bytes (цілими рядками)"""
+    if size_bytes <= 0:
+        return b''
+    # Кількість рядків з запасом (номери рядків лише подовжують рядок)
+    count = size_bytes // len(f"[Рядок 1] {SAMPLE_TEXT}\n".encode('utf-8')) + 1
+    data = ''.join(f"[Рядок {i}] {SAMPLE_TEXT}\n"
+                   for i in range(first_line, first_line + count)).encode('utf-8')
+    return data[:data.index(b'\n', size_bytes - 1) + 1]
+
+
 def create_text_file(filename, size_kb=512):
     """
     Створити текстовий файл заданого розміру
@@ -22,27 +66,9 @@ def create_text_file(filename, size_kb=512):
         filename: Ім'я файлу
         size_kb: Розмір файлу в кілобайтах (за замовчуванням 512 КБ)
     """
-    size_bytes = size_kb * 1024
-    
-    # Генерація випадкового тексту
-    text_content = []
-    current_size = 0
-    
-    sample_text = (
-        "Це тестовий файл для експерименту з безпечним видаленням файлів. "
-        "Програма використовує алгоритм German VSITR для остаточного видалення даних. "
-        "Алгоритм виконує 7 проходів перезапису: 0x00, 0xFF, псевдовипадкові дані (3 проходи), "
-        "0xAA, та знову псевдовипадкові дані. "
-    )
-    
-    while current_size < size_bytes:
-        line = f"[Рядок {len(text_content) + 1}] {sample_text}\n"
-        text_content.append(line)
-        current_size += len(line.encode('utf-8'))
-    
-    # Запис у файл
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.writelines(text_content)
+    # Весь вміст формується одним буфером і записується одним викликом
+    with open(filename, 'wb') as f:
+        f.write(text_lines(size_kb * 1024))
     
     actual_size = os.path.getsize(filename)
     print(f"[OK] Створено текстовий файл: {filename}")
@@ -57,30 +83,30 @@ def create_image_file(filename, size_kb=512):
         filename: Ім'я файлу
         size_kb: Мінімальний розмір файлу в кілобайтах
     """
+    # Pillow потрібен лише для зображень (бенчмарки імпортують модуль без нього)
+    from PIL import Image, ImageDraw, ImageFont
+    
     # Розрахунок розмірів зображення для досягнення потрібного розміру файлу
     # PNG з високою якістю: приблизно 3-4 байти на піксель
     target_pixels = (size_kb * 1024) // 3
     width = int((target_pixels ** 0.5) * 1.5)
     height = int(target_pixels / width)
     
-    # Створення зображення з випадковими кольоровими блоками
-    image = Image.new('RGB', (width, height), color='white')
+    # Випадкові кольорові блоки: одне зображення з пікселем на блок із os.urandom,
+    # збільшене без інтерполяції, замість окремого random.randint для кожного блоку
+    block_size = 50
+    columns = -(-width // block_size)
+    rows = -(-height // block_size)
+    blocks = Image.frombytes('RGB', (columns, rows), os.urandom(columns * rows * 3))
+    image = blocks.resize((columns * block_size, rows * block_size), Image.NEAREST)
+    image = image.crop((0, 0, width, height))
     draw = ImageDraw.Draw(image)
     
-    # Малювання випадкових кольорових прямокутників
-    block_size = 50
+    # Контури блоків
     for x in range(0, width, block_size):
-        for y in range(0, height, block_size):
-            color = (
-                random.randint(0, 255),
-                random.randint(0, 255),
-                random.randint(0, 255)
-            )
-            draw.rectangle(
-                [x, y, x + block_size, y + block_size],
-                fill=color,
-                outline='black'
-            )
+        draw.line([x, 0, x, height], fill='black')
+    for y in range(0, height, block_size):
+        draw.line([0, y, width, y], fill='black')
     
     # Додавання тексту
     try:
@@ -120,14 +146,246 @@ def create_readonly_file(filename, size_kb=512):
     create_text_file(filename, size_kb)
     
     # Зробити файл тільки для читання
-    import stat
     os.chmod(filename, stat.S_IREAD)
     
     print(f"[OK] Файл {filename} встановлено як 'тільки для читання'")
 
 
+# --- Корпус за специфікацією ---
+
+def parse_size(value):
+    """'4K' -> 4096, '16G' -> 17179869184 (число повертається без змін)"""
+    if isinstance(value, int):
+        return value
+    text = str(value).strip().upper()
+    if text[-1:] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+class ContentBuffers:
+    """
+    Буфери вмісту корпусу, спільні для всіх потоків запису
+
+    Кожен буфер має подвоєну довжину CORPUS_CHUNK, тож зріз довжиною до CORPUS_CHUNK
+    можна взяти з будь-якого зсуву: файли з різним номером варіанта отримують різний
+    вміст без генерації нових даних.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self._buffers = {}
+
+    def get(self, kind):
+        buffer = self._buffers.get(kind)
+        if buffer is None:
+            if kind == 'random':
+                block = PRNGKeystream(self.seed).generate(CORPUS_CHUNK)
+            elif kind == 'text':
+                block = text_lines(CORPUS_CHUNK)[:CORPUS_CHUNK]
+            elif kind == 'zero':
+                block = bytes(CORPUS_CHUNK)
+            else:
+                raise ValueError(f"Невідомий тип вмісту: {kind}")
+            buffer = self._buffers[kind] = memoryview(block + block)
+        return buffer
+
+    def prepare(self, kinds):
+        """Згенерувати буфери заздалегідь (до запуску потоків запису)"""
+        for kind in kinds:
+            self.get(kind)
+
+
+def write_range(path, offset, length, buffer, variant, mode=None):
+    """
+    Записати length байтів вмісту у файл з позиції offset
+
+    Вміст файлу - буфер, зсунутий на variant, що повторюється з періодом CORPUS_CHUNK.
+    mode - права доступу, що встановлюються після запису (для файлів тільки для читання).
+    Повертає кількість записаних байтів.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | getattr(os, 'O_BINARY', 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        start = variant % CORPUS_CHUNK
+        position = offset
+        end = offset + length
+        while position < end:
+            skip = (start + position) % CORPUS_CHUNK
+            count = min(CORPUS_CHUNK, end - position)
+            pwrite_all(fd, buffer[skip:skip + count], position)
+            position += count
+    finally:
+        os.close(fd)
+    if mode is not None:
+        os.chmod(path, mode)
+    return length
+
+
+def _file_tasks(path, size, buffer, variant, readonly, deferred):
+    """Завдання запису одного файлу: один діапазон або кілька для великого файлу"""
+    if size <= CORPUS_RANGE:
+        yield (path, 0, size, buffer, variant, stat.S_IREAD if readonly else None)
+        return
+    # Розмір встановлюється одразу, після чого діапазони записуються незалежно
+    with open(path, 'wb') as f:
+        f.truncate(size)
+    for offset in range(0, size, CORPUS_RANGE):
+        yield (path, offset, min(CORPUS_RANGE, size - offset), buffer, variant, None)
+    if readonly:
+        deferred.append(path)
+
+
+def _entry_tasks(entry, root, buffers, deferred):
+    """
+    Розгорнути один запис специфікації в потік завдань write_range
+
+    Каталоги створюються в потоці обходу перед першим файлом у них.
+    """
+    kind = entry['kind']
+    path = os.path.join(root, entry['path'])
+    size = parse_size(entry.get('size', 0))
+    buffer = buffers.get(entry.get('content', 'random'))
+    readonly = entry.get('readonly', False)
+
+    if kind == 'file':
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        yield from _file_tasks(path, size, buffer, 0, readonly, deferred)
+
+    elif kind == 'files':
+        # count файлів, розкладених по підкаталогах не більше ніж по fanout файлів
+        fanout = entry.get('fanout', DEFAULT_FANOUT)
+        for i in range(entry['count']):
+            subdir = os.path.join(path, f'd{i // fanout:06d}')
+            if i % fanout == 0:
+                os.makedirs(subdir, exist_ok=True)
+            yield from _file_tasks(os.path.join(subdir, f'f{i:09d}.bin'), size, buffer,
+                                   i * 4099, readonly, deferred)
+
+    elif kind == 'sparse':
+        # Розміщено лише частку allocated обсягу рівномірно розподіленими екстентами
+        extent = parse_size(entry.get('extent', '1M'))
+        step = max(extent, int(extent / entry.get('allocated', 1 / 16)))
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        for offset in range(0, size, step):
+            yield (path, offset, min(extent, size - offset), buffer, offset, None)
+        if readonly:
+            deferred.append(path)
+
+    elif kind == 'tree':
+        # Дерево глибини depth: кожен каталог має width підкаталогів та files файлів
+        depth = entry.get('depth', 8)
+        width = entry.get('width', 2)
+        files = entry.get('files', 4)
+        stack = [(path, 0)]
+        number = 0
+        while stack:
+            dirpath, level = stack.pop()
+            os.makedirs(dirpath, exist_ok=True)
+            for i in range(files):
+                number += 1
+                yield from _file_tasks(os.path.join(dirpath, f'f{i:04d}.bin'), size, buffer,
+                                       number * 4099, readonly, deferred)
+            if level < depth:
+                stack.extend((os.path.join(dirpath, f'd{i:04d}'), level + 1) for i in range(width))
+
+    else:
+        raise ValueError(f"Невідомий тип запису корпусу: {kind}")
+
+
+def generate_corpus(spec, root='.', workers=DEFAULT_CORPUS_WORKERS, progress_interval=2.0):
+    """
+    Створити корпус за специфікацією
+
+    Завдання генеруються потоково, а кількість завдань у черзі обмежена, тож пам'ять
+    не залежить від кількості файлів; вміст записується зрізами спільних буферів.
+
+    Args:
+        spec: Словник {"seed": ..., "entries": [...]} (формат - у README)
+        root: Каталог, у якому створюється корпус
+        workers: Кількість потоків запису (os.pwrite звільняє GIL)
+        progress_interval: Період виведення прогресу в секундах (0 - без виведення)
+
+    Returns:
+        dict з кількістю файлів, байтів, тривалістю та швидкістю генерації
+    """
+    entries = spec['entries']
+    for entry in entries:
+        content = entry.get('content', 'random')
+        if content not in CONTENT_KINDS:
+            raise ValueError(f"Невідомий тип вмісту: {content}")
+    buffers = ContentBuffers(spec.get('seed'))
+    buffers.prepare({entry.get('content', 'random') for entry in entries})
+
+    started = time.perf_counter()
+    last_report = started
+    files = written = 0
+    deferred = []
+    futures = set()
+    max_in_flight = max(1, workers) * 4
+
+    def collect():
+        nonlocal written
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            futures.discard(future)
+            written += future.result()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for entry in entries:
+            for task in _entry_tasks(entry, root, buffers, deferred):
+                futures.add(executor.submit(write_range, *task))
+                if task[1] == 0:  # перший діапазон файлу
+                    files += 1
+                while len(futures) >= max_in_flight:
+                    collect()
+                now = time.perf_counter()
+                if progress_interval and now - last_report >= progress_interval:
+                    last_report = now
+                    elapsed = now - started
+                    print(f"  {files} файлів, {written / 1024 ** 2:.0f} MB, "
+                          f"{files / elapsed:.0f} файлів/с, {written / 1024 ** 2 / elapsed:.1f} MB/s",
+                          flush=True)
+        while futures:
+            collect()
+
+    for path in deferred:
+        os.chmod(path, stat.S_IREAD)
+
+    elapsed = time.perf_counter() - started
+    return {'files': files, 'bytes': written, 'seconds': elapsed,
+            'files_s': files / elapsed if elapsed else 0.0,
+            'mb_s': written / 1024 ** 2 / elapsed if elapsed else 0.0}
+
+
+def create_corpus(spec_path, root, workers):
+    """Створити корпус за файлом специфікації та вивести швидкість генерації"""
+    with open(spec_path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    
+    print("=" * 60)
+    print(f"Створення корпусу {spec_path} у {os.path.abspath(root)} ({workers} потоків)")
+    print("=" * 60)
+    stats = generate_corpus(spec, root, workers)
+    print(f"[OK] {stats['files']} файлів, {stats['bytes'] / 1024 ** 2:.1f} MB "
+          f"за {stats['seconds']:.2f} с")
+    print(f"  {stats['files_s']:.0f} файлів/с, {stats['mb_s']:.1f} MB/s")
+
+
 def main():
     """Створення всіх тестових файлів"""
+    parser = argparse.ArgumentParser(description="Створення тестових файлів для експериментів")
+    parser.add_argument('--spec', help="JSON-специфікація корпусу (без неї - файли для експериментів)")
+    parser.add_argument('--dir', default='.', help="Каталог, у якому створюється корпус")
+    parser.add_argument('--workers', type=int, default=DEFAULT_CORPUS_WORKERS,
+                        help="Кількість потоків запису корпусу")
+    args = parser.parse_args()
+    if args.spec:
+        create_corpus(args.spec, args.dir, args.workers)
+        return
+    
     print("=" * 60)
     print("Створення тестових файлів для експериментів")
     print("=" * 60)
@@ -0,0 +1,541 @@
+"""
+Secure File Deleter - бібліотека безпечного видалення файлів без залежності від GUI
+Використовується графічною програмою (secure_file_deleter.py), консольною (cli.py) та скриптами
+"""
+
+import logging
+import os
+import stat
+import time
+
+from batch_planner import plan_batch
+from dir_batch import DirectoryBatch, random_name
+from wipe_engine import DEFAULT_CHUNK_SIZE, DEFAULT_VERIFY_SAMPLES, FileTarget, WipeEngine, WipeReport
+from wipe_plans import DEFAULT_PLAN, get_plan
+
+
+class SecureFileDeleter:
+    """Клас для безпечного видалення файлів за алгоритмом German VSITR (або іншим планом з wipe_plans)"""
+    
+    def __init__(self, keystream_mode='prng', chunk_size=DEFAULT_CHUNK_SIZE, direct_io=False,
+                 audit_logger=None, verify=None, verify_samples=DEFAULT_VERIFY_SAMPLES,
+                 plan=DEFAULT_PLAN, durability='fsync', offload_zero=False, deallocate=False,
+                 journal=None, range_workers=1, calibration=None):
+        self.keystream_mode = keystream_mode
+        self.calibration = calibration
+        self.range_workers = range_workers
+        self.journal = journal
+        self.offload_zero = offload_zero
+        self.deallocate = deallocate
+        self.durability = durability
+        self.verify = verify
+        self.verify_samples = verify_samples
+        self.audit_logger = audit_logger
+        self.chunk_size = chunk_size
+        self.direct_io = direct_io
+        self.plan = get_plan(plan)
+        self.passes = list(self.plan.passes)
+        self._compiled = None
+    
+    def make_writable(self, filepath):
+        """Зробити файл доступним для запису (для файлів тільки для читання)"""
+        try:
+            os.chmod(filepath, stat.S_IWRITE | stat.S_IREAD)
+            logging.debug("Змінено атрибути файлу: %s", filepath)
+            return True
+        except Exception as e:
+            logging.error("Помилка зміни атрибутів: %s", e)
+            return False
+    
+    def tuning_for(self, filepath, status_callback=None):
+        """
+        Калібрування ФС файлу з кешу self.calibration (CalibrationCache) або None
+        
+        Якщо ФС ще не калібровано (чи термін дії запису минув), виконуються короткі проби.
+        """
+        if self.calibration is None:
+            return None
+        return self.calibration.get(os.path.dirname(os.path.abspath(filepath)), status_callback)
+    
+    def cached_tuning_for(self, filepath):
+        """Калібрування ФС файлу лише з кешу (без проб) або None"""
+        if self.calibration is None:
+            return None
+        return self.calibration.lookup(os.path.dirname(os.path.abspath(filepath)))
+    
+    def engine_settings(self, tuning=None):
+        """Розмір буфера, O_DIRECT та range_workers: з налаштувань або з калібрування tuning"""
+        settings = {'chunk_size': self.chunk_size, 'direct_io': self.direct_io,
+                    'range_workers': self.range_workers}
+        if tuning is not None:
+            settings.update(tuning.engine_kwargs())
+        return settings
+    
+    def create_engine(self, throttle=None, passes=None, tuning=None, sparse=True, offload_zero=None):
+        """
+        Створити рушій перезапису, що виконує таблицю проходів passes (за замовчуванням self.passes)
+        
+        offload_zero - перевизначення self.offload_zero (None - налаштування видаляча).
+        """
+        if offload_zero is None:
+            offload_zero = self.offload_zero
+        return WipeEngine(passes or self.passes, keystream_mode=self.keystream_mode,
+                          throttle=throttle, verify=self.verify, verify_samples=self.verify_samples,
+                          durability=self.durability, offload_zero=offload_zero,
+                          deallocate=self.deallocate, sparse=sparse, **self.engine_settings(tuning))
+    
+    def compiled_engine(self, tuning=None):
+        """
+        Скомпільований рушій для поточних налаштувань (перебудовується, якщо їх змінено)
+        
+        Для кожного набору параметрів калібрування зберігається окремий рушій.
+        """
+        key = (tuple(self.passes), self.chunk_size, self.keystream_mode, self.direct_io,
+               self.verify, self.verify_samples, self.durability, self.offload_zero, self.deallocate,
+               self.range_workers)
+        if self._compiled is None or self._compiled[0] != key:
+            self._compiled = (key, {})
+        engines = self._compiled[1]
+        settings = tuple(sorted(self.engine_settings(tuning).items()))
+        if settings not in engines:
+            engines[settings] = self.create_engine(tuning=tuning).compile()
+        return engines[settings]
+    
+    def overwrite_file(self, filepath, data_byte, file_size, progress_callback=None, keystream=None):
+        """Перезаписати файл заданими даними (один прохід)"""
+        try:
+            engine = WipeEngine([('single', data_byte)], keystream_mode=self.keystream_mode,
+                                **self.engine_settings(self.cached_tuning_for(filepath)))
+            report = WipeReport(path=str(filepath), size=file_size)
+            buffer = engine.allocate_buffers(file_size, report)[data_byte]
+            
+            target = FileTarget(filepath, engine.direct_io)
+            try:
+                engine.write_pass(target, buffer, file_size, data_byte, report,
+                                  progress_callback, keystream)
+            finally:
+                target.close()
+            
+            return True
+        except Exception as e:
+            logging.error("Помилка перезапису файлу: %s", e)
+            return False
+    
+    def rename_file_randomly(self, filepath, times=3, journal_entry=None, directories=None,
+                             names=None):
+        """
+        Перейменувати файл випадковими іменами (весь ланцюжок імен записується в журнал
+        одним збереженням до перейменувань)
+        
+        names - вже записані в журнал імена (продовження перерваного ланцюжка).
+        Перейменування виконуються відносно дескриптора каталогу з пакета directories;
+        без нього каталог синхронізується одразу після перейменувань.
+        """
+        batch = directories if directories is not None else DirectoryBatch()
+        current_path = os.fspath(filepath)
+        
+        try:
+            if names is None:
+                names = [random_name() for _ in range(times)]
+                if journal_entry is not None:
+                    directory = os.path.dirname(current_path)
+                    self.journal.record_renames(journal_entry,
+                                                [os.path.join(directory, name) for name in names])
+            for new_name in names:
+                new_path = batch.rename(current_path, new_name)
+                logging.debug("Перейменовано: %s -> %s", os.path.basename(current_path), new_name)
+                current_path = new_path
+            
+            return current_path
+        except Exception as e:
+            logging.error("Помилка перейменування: %s", e)
+            return current_path
+        finally:
+            if directories is None:
+                batch.close()
+    
+    def audit_record(self, report, started, outcome, error=None):
+        """Сформувати запис журналу аудиту для одного завдання"""
+        record = {
+            'path': report.path,
+            'size': report.size,
+            'passes': report.passes,
+            'pass_durations': [round(d, 6) for d in report.pass_durations],
+            'bytes_written': report.bytes_written,
+            'bytes_skipped': report.bytes_skipped,
+            'started': started,
+            'duration': round(time.time() - started, 6),
+            'outcome': outcome,
+        }
+        if report.resumed_from is not None:
+            record['resumed_from'] = list(report.resumed_from)
+        if report.offloaded_bytes:
+            record['offloaded_bytes'] = report.offloaded_bytes
+        if report.deallocated:
+            record['deallocated'] = True
+        if report.verify_mode:
+            record['verify_mode'] = report.verify_mode
+            record['verified_bytes'] = report.verified_bytes
+            record['verify_mb_s'] = round(report.verify_throughput, 1)
+        if error is not None:
+            record['error'] = str(error)
+        return record
+    
+    def plan_batch(self, filepaths, physical=True, seen=None):
+        """
+        Скласти план видалення групи шляхів (див. batch_planner.plan_batch)
+        
+        Кожен шлях перевіряється одним lstat, жорсткі посилання перезаписуються один раз,
+        файли впорядковуються за фізичним розміщенням; план містить оцінку тривалості
+        (за кешованим калібруванням ФС, якщо воно є).
+        """
+        return plan_batch(filepaths, passes=len(self.passes), physical=physical, seen=seen,
+                          estimate_for=self.estimate_settings)
+    
+    def estimate_settings(self, filepath):
+        """Швидкість та затримка синхронізації ФС файлу з кешу калібрування (без проб)"""
+        tuning = self.cached_tuning_for(filepath)
+        return tuning.estimate_kwargs() if tuning is not None else None
+    
+    def remove_link(self, filepath, directories=None):
+        """Перейменувати та видалити ім'я файлу, дані якого вже перезаписано (жорстке посилання)"""
+        batch = directories if directories is not None else DirectoryBatch()
+        try:
+            batch.unlink(self.rename_file_randomly(filepath, times=3, directories=batch))
+        finally:
+            if directories is None:
+                batch.close()
+    
+    def secure_delete(self, filepath, progress_callback=None, status_callback=None, throttle=None,
+                      journal_entry=None, directories=None, planned=None):
+        """
+        Безпечне видалення файлу за планом self.plan (за замовчуванням German VSITR)
+        
+        Алгоритм German VSITR (7 проходів):
+        1. Запис 0x00
+        2. Запис 0xFF
+        3-5. Запис псевдовипадкових даних (3 проходи)
+        6. Запис 0xAA
+        7. Запис псевдовипадкових даних
+        
+        Якщо задано журнал, стан завдання зберігається в ньому; journal_entry -
+        перерване завдання, яке продовжується з останньої контрольної точки.
+        
+        directories - спільний DirectoryBatch групи файлів: перейменування та видалення
+        виконуються через дескриптори каталогів, а каталоги синхронізуються один раз
+        на пакет (без нього - один раз після видалення цього файлу).
+        
+        planned - PlannedFile з плану групи: файл повторно не перевіряється, а його
+        жорсткі посилання з тієї ж групи видаляються після перезапису.
+        """
+        started = time.time()
+        report = WipeReport(path=str(filepath), size=None)
+        entry = journal_entry
+        batch = directories if directories is not None else DirectoryBatch()
+        try:
+            if planned is not None:
+                # Файл уже перевірено одним lstat під час планування
+                file_size = planned.size
+            else:
+                # Перевірка існування файлу (до запису в журнал: каталоги та пристрої не журналюються)
+                if not os.path.exists(filepath):
+                    raise FileNotFoundError(f"Файл не знайдено: {filepath}")
+                if not os.path.isfile(filepath):
+                    raise ValueError(f"Не є звичайним файлом: {filepath}")
+                
+                # Отримання розміру файлу
+                file_size = os.path.getsize(filepath)
+            report.size = file_size
+            logging.debug("Початок безпечного видалення: %s (розмір: %d байт)", filepath, file_size)
+            
+            if status_callback:
+                status_callback(f"Підготовка файлу до видалення...")
+            
+            # Зробити файл доступним для запису
+            if planned is None or not planned.writable:
+                self.make_writable(filepath)
+            
+            tuning = self.tuning_for(filepath, status_callback)
+            engine = self.compiled_engine(tuning)
+            if entry is None and self.journal is not None:
+                entry = self.journal.begin(filepath, self.plan.name)
+            elif entry is not None and entry.plan != self.plan.name:
+                engine = self.create_engine(passes=get_plan(entry.plan).passes, tuning=tuning).compile()
+            
+            # Виконання проходів перезапису (файл відкривається один раз)
+            def pass_started(pass_num, total_passes, pass_name):
+                if status_callback:
+                    status_callback(f"Прохід {pass_num}/{total_passes}: {pass_name}")
+                logging.debug("Прохід %d: %s", pass_num, pass_name)
+            
+            if entry is None or entry.stage == 'overwrite':
+                self.overwrite_journaled(engine, filepath, file_size, entry, report,
+                                         progress_callback, pass_started, throttle)
+            if report.verify_mode:
+                logging.info("Перевірка (%s): %d байт, %.1f MB/s", report.verify_mode,
+                             report.verified_bytes, report.verify_throughput)
+            
+            # Перейменування файлу
+            if status_callback:
+                status_callback("Перейменування файлу...")
+            
+            logging.debug("Початок перейменування файлу")
+            names = None
+            if entry is not None and entry.renames:
+                # Перерване завдання: продовжити вже записаний ланцюжок імен
+                chain = [entry.path] + entry.renames
+                names = [os.path.basename(path)
+                         for path in chain[chain.index(os.path.abspath(filepath)) + 1:]]
+            final_path = self.rename_file_randomly(filepath, times=3, journal_entry=entry,
+                                                   directories=batch, names=names)
+            
+            # Остаточне видалення
+            if status_callback:
+                status_callback("Остаточне видалення...")
+            
+            batch.unlink(final_path)
+            if planned is not None:
+                for link in planned.links:
+                    self.remove_link(link, batch)
+            if entry is not None:
+                # Запис журналу видаляється лише після синхронізації каталогу
+                batch.defer(lambda: self.journal.finish(entry), final_path)
+            if self.audit_logger:
+                self.audit_logger.log(self.audit_record(report, started, 'deleted'))
+            else:
+                logging.info("Файл успішно видалено: %s", filepath)
+            
+            if progress_callback:
+                progress_callback(100)
+            
+            if status_callback:
+                status_callback("Файл успішно видалено!")
+            
+            return True
+            
+        except Exception as e:
+            if entry is not None and not isinstance(e, InterruptedError):
+                # Завдання, що завершилося помилкою (а не перерване), не повторюється при кожному запуску
+                self.journal.finish(entry)
+            if self.audit_logger:
+                self.audit_logger.log(self.audit_record(report, started, 'error', e))
+            else:
+                logging.error("Помилка видалення файлу: %s", e)
+            if status_callback:
+                status_callback(f"ПОМИЛКА: {str(e)}")
+            raise
+        finally:
+            if directories is None:
+                batch.close()
+    
+    def overwrite_journaled(self, engine, filepath, file_size, entry, report,
+                            progress_callback=None, pass_callback=None, throttle=None):
+        """Виконати проходи перезапису, зберігаючи контрольні точки в журналі (якщо entry задано)"""
+        if entry is None:
+            engine.run(filepath, file_size, progress_callback=progress_callback,
+                       pass_callback=pass_callback, report=report, throttle=throttle)
+            return
+        
+        if entry.pass_index or entry.offset:
+            logging.info("Продовження видалення %s: прохід %d, зміщення %d",
+                         entry.path, entry.pass_index + 1, entry.offset)
+        engine.run(
+            filepath,
+            file_size,
+            progress_callback=progress_callback,
+            pass_callback=pass_callback,
+            report=report,
+            throttle=throttle,
+            resume=(entry.pass_index, entry.offset),
+            checkpoint=lambda pass_index, offset: self.journal.checkpoint(entry, pass_index, offset),
+            checkpoint_interval=self.journal.checkpoint_interval
+        )
+    
+    def journal_batch(self, files, times=3):
+        """
+        Записати завдання групи файлів у журнал одним груповим записом
+        
+        files - PlannedFile групи; ланцюжки з times випадкових імен генеруються тут і
+        записуються разом із завданнями, тож secure_delete(journal_entry=...) не зберігає
+        журнал до першої контрольної точки (файли, перезаписані швидше за checkpoint_interval,
+        коштують лише частку одного запису журналу).
+        
+        Returns:
+            Словник шлях -> JournalEntry (порожній без журналу)
+        """
+        if self.journal is None or not files:
+            return {}
+        jobs = []
+        renames = []
+        prefixes = {}  # каталог -> абсолютний шлях із роздільником у кінці
+        for planned in files:
+            parent, name = os.path.split(planned.path)
+            prefix = prefixes.get(parent)
+            if prefix is None:
+                prefix = prefixes[parent] = os.path.join(os.path.abspath(parent), '')
+            jobs.append((prefix + name, planned.size, planned.device, planned.inode))
+            renames.append([prefix + random_name() for _ in range(times)])
+        entries = self.journal.begin_batch(jobs, self.plan.name, renames)
+        return {planned.path: entry for planned, entry in zip(files, entries)}
+    
+    def resume_pending(self, progress_callback=None, status_callback=None):
+        """
+        Завершити завдання, перервані збоєм або перезавантаженням (за журналом)
+        
+        Returns:
+            Список (початковий шлях, помилка або None)
+        """
+        if self.journal is None:
+            return []
+        
+        results = []
+        for entry in self.journal.pending():
+            filepath = entry.current_path()
+            if filepath is None:
+                # Файл уже видалено (збій між видаленням і оновленням журналу) або замінено іншим
+                logging.info("Завдання з журналу вже не актуальне: %s", entry.path)
+                self.journal.finish(entry)
+                continue
+            try:
+                self.secure_delete(filepath, progress_callback, status_callback, journal_entry=entry)
+                results.append((entry.path, None))
+            except Exception as e:
+                results.append((entry.path, e))
+        return results
+    
+    def secure_delete_batch(self, filepaths, progress_callback=None, status_callback=None):
+        """
+        Безпечне видалення групи файлів з почерговим виконанням проходів
+        
+        Прохід N виконується для всіх файлів групи перед проходом N+1; з політикою
+        durability='batch' файли групи синхронізуються разом наприкінці кожного проходу.
+        Файли обробляються в порядку плану (plan_batch): жорсткі посилання на той самий
+        файл перезаписуються один раз, звіти повертаються в порядку виконання.
+        """
+        started = time.time()
+        plan = self.plan_batch(filepaths)
+        if plan.errors:
+            raise plan.errors[0][1]
+        if plan.directories:
+            raise IsADirectoryError(f"Це каталог: {plan.directories[0]}")
+        for planned in plan.files:
+            if not planned.writable:
+                self.make_writable(planned.path)
+        filepaths = [planned.path for planned in plan.files]
+        
+        def pass_started(pass_num, total_passes, pass_name):
+            if status_callback:
+                status_callback(f"Прохід {pass_num}/{total_passes}: {pass_name}")
+        
+        # Калібрування застосовується, лише якщо вся група на одному пристрої
+        tuning = None
+        if len({planned.device for planned in plan.files}) == 1:
+            tuning = self.tuning_for(plan.files[0].path, status_callback)
+        
+        reports = self.compiled_engine(tuning).run_batch(
+            filepaths,
+            progress_callback=progress_callback,
+            pass_callback=pass_started,
+            sizes=[planned.size for planned in plan.files]
+        )
+        
+        if status_callback:
+            status_callback("Перейменування та видалення файлів...")
+        with DirectoryBatch() as directories:
+            for report, planned in zip(reports, plan.files):
+                directories.unlink(self.rename_file_randomly(report.path, times=3,
+                                                             directories=directories))
+                for link in planned.links:
+                    self.remove_link(link, directories)
+                if self.audit_logger:
+                    self.audit_logger.log(self.audit_record(report, started, 'deleted'))
+        
+        logging.info("Групу файлів успішно видалено: %d файл(ів)", len(reports))
+        if status_callback:
+            status_callback("Файли успішно видалено!")
+        return reports
+    
+    def secure_delete_directory(self, dirpath, workers=None, progress_callback=None,
+                                status_callback=None):
+        """
+        Безпечне видалення всього дерева каталогу
+        
+        Файли перезаписуються паралельно в пулі потоків (workers, за замовчуванням
+        DEFAULT_TREE_WORKERS), спорожнілі каталоги видаляються знизу вгору.
+        progress_callback отримує TreeProgress.
+        """
+        # Імпорт під час виклику: для окремих файлів модуль не потрібен (час запуску CLI)
+        from tree_wipe import DEFAULT_TREE_WORKERS, TreeWipe
+        
+        if workers is None:
+            workers = DEFAULT_TREE_WORKERS
+        if not os.path.isdir(dirpath):
+            raise NotADirectoryError(f"Каталог не знайдено: {dirpath}")
+        
+        logging.info("Початок безпечного видалення каталогу: %s", dirpath)
+        if status_callback:
+            status_callback("Видалення вмісту каталогу...")
+        
+        tree = TreeWipe(self, workers=workers, progress_callback=progress_callback)
+        progress = tree.run(dirpath)
+        
+        for path, error in tree.errors:
+            logging.error("Помилка видалення %s: %s", path, error)
+        logging.info(
+            "Каталог оброблено: %s (файлів: %d, помилок: %d, байт: %d)",
+            dirpath, progress.files_done, progress.files_failed, progress.bytes_done
+        )
+        
+        if tree.errors:
+            if status_callback:
+                status_callback(f"ПОМИЛКА: не вдалося видалити {len(tree.errors)} елемент(ів)")
+            raise OSError(f"Не вдалося видалити {len(tree.errors)} елемент(ів) у {dirpath}")
+        
+        if status_callback:
+            status_callback("Каталог успішно видалено!")
+        return progress
+    
+    def wipe_free_space(self, dirpath, workers=None, reserve=None, filler_size=None,
+                        progress_callback=None, status_callback=None, stop_event=None):
+        """
+        Перезаписати вільне місце файлової системи каталогу dirpath проходами self.plan
+        
+        Вільне місце заповнюється файлами-заповнювачами (паралельно, до резерву reserve
+        байтів), які потім видаляються. progress_callback отримує FreeSpaceProgress.
+        Параметри None - значення за замовчуванням модуля free_space_wipe.
+        """
+        # Імпорт під час виклику, як і для tree_wipe
+        from free_space_wipe import (DEFAULT_FILLER_SIZE, DEFAULT_FREE_SPACE_WORKERS,
+                                     DEFAULT_RESERVE, FreeSpaceWipe)
+        
+        if workers is None:
+            workers = DEFAULT_FREE_SPACE_WORKERS
+        if reserve is None:
+            reserve = DEFAULT_RESERVE
+        if filler_size is None:
+            filler_size = DEFAULT_FILLER_SIZE
+        logging.info("Початок перезапису вільного місця: %s (резерв %d байт)", dirpath, reserve)
+        if status_callback:
+            status_callback("Заповнення вільного місця...")
+        
+        wipe = FreeSpaceWipe(self, workers=workers, reserve=reserve, filler_size=filler_size,
+                             progress_callback=progress_callback, stop_event=stop_event)
+        progress = wipe.run(dirpath)
+        
+        for path, error in wipe.errors:
+            logging.error("Помилка перезапису вільного місця %s: %s", path, error)
+        logging.info(
+            "Вільне місце перезаписано: %s (заповнювачів: %d, розміщено байт: %d, записано байт: %d, "
+            "зупинка: %s)",
+            dirpath, progress.files_created, progress.bytes_allocated, progress.bytes_done,
+            progress.stopped
+        )
+        
+        if wipe.errors:
+            if status_callback:
+                status_callback(f"ПОМИЛКА: {len(wipe.errors)} помилк(и) під час перезапису вільного місця")
+            raise OSError(f"Не вдалося перезаписати вільне місце {dirpath}: {wipe.errors[0][1]}")
+        
+        if status_callback:
+            status_callback("Вільне місце перезаписано!")
+        return progress
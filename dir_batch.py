@@ -0,0 +1,158 @@
+"""
+Dir Batch - перейменування та видалення файлів відносно відкритих дескрипторів каталогів
+Операції виконуються з dir_fd= (без повторного розбору повного шляху), а кожен
+змінений каталог синхронізується одним fsync на пакет замість жодного чи одного на файл
+"""
+
+import os
+import random
+import string
+import threading
+
+
+# Кількість змін у каталозі, після якої він синхронізується, не чекаючи кінця пакета
+DEFAULT_DIR_BATCH = 1024
+
+RANDOM_NAME_LENGTH = 16
+
+# Windows не підтримує dir_fd та відкриття каталогів - тоді операції виконуються за шляхом
+SUPPORTS_DIR_FD = (
+    hasattr(os, 'O_DIRECTORY')
+    and os.rename in os.supports_dir_fd
+    and os.unlink in os.supports_dir_fd
+    and os.rmdir in os.supports_dir_fd
+)
+
+
+def random_name(length=RANDOM_NAME_LENGTH):
+    """Випадкове ім'я файлу з латинських літер та цифр"""
+    return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
+
+
+class DirectoryBatch:
+    """
+    Пакет змін імен у каталогах з відкладеною синхронізацією
+
+    Дескриптор кожного каталогу відкривається один раз; sync() виконує по одному
+    fsync для кожного зміненого каталогу, після чого викликає відкладені функції
+    (наприклад, видалення запису журналу). Функції, відкладені для каталогу, виконуються
+    також після його проміжної синхронізації (кожні batch_size змін), тож їх кількість
+    не залежить від розміру пакета. Безпечний для використання з кількох потоків.
+
+    Args:
+        batch_size: Кількість змін у каталозі, після якої він синхронізується одразу
+    """
+
+    def __init__(self, batch_size=DEFAULT_DIR_BATCH):
+        self.batch_size = batch_size
+        self.sync_calls = 0
+        # каталог -> [дескриптор або None, кількість несинхронізованих змін, відкладені функції]
+        self._dirs = {}
+        self._deferred = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _directory(self, path):
+        """Розділити шлях на (стан каталогу, ім'я), відкривши каталог за потреби"""
+        dirpath, name = os.path.split(os.path.abspath(path))
+        with self._lock:
+            state = self._dirs.get(dirpath)
+            if state is None:
+                fd = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY) if SUPPORTS_DIR_FD else None
+                state = self._dirs[dirpath] = [fd, 0, []]
+        return dirpath, state, name
+
+    def _changed(self, state):
+        with self._lock:
+            state[1] += 1
+            if state[1] < self.batch_size:
+                return
+            state[1] = 0
+            deferred, state[2] = state[2], []
+        if state[0] is not None:
+            os.fsync(state[0])
+            with self._lock:
+                self.sync_calls += 1
+        for func in deferred:
+            func()
+
+    def rename(self, path, new_name):
+        """Перейменувати файл у межах його каталогу; повертає новий шлях"""
+        dirpath, state, name = self._directory(path)
+        if state[0] is None:
+            os.rename(path, os.path.join(dirpath, new_name))
+        else:
+            os.rename(name, new_name, src_dir_fd=state[0], dst_dir_fd=state[0])
+        self._changed(state)
+        return os.path.join(dirpath, new_name)
+
+    def unlink(self, path):
+        dirpath, state, name = self._directory(path)
+        if state[0] is None:
+            os.unlink(path)
+        else:
+            os.unlink(name, dir_fd=state[0])
+        self._changed(state)
+
+    def rmdir(self, path):
+        """Видалити порожній каталог (його власний дескриптор закривається)"""
+        dirpath = os.path.abspath(path)
+        with self._lock:
+            state = self._dirs.pop(dirpath, None)
+        if state is not None and state[0] is not None:
+            os.close(state[0])
+        _, parent_state, name = self._directory(dirpath)
+        if state is not None and state[2]:
+            # Видалення вмісту стає надійним разом із видаленням каталогу (синхронізація батька)
+            with self._lock:
+                parent_state[2].extend(state[2])
+        if parent_state[0] is None:
+            os.rmdir(dirpath)
+        else:
+            os.rmdir(name, dir_fd=parent_state[0])
+        self._changed(parent_state)
+
+    def defer(self, func, path=None):
+        """
+        Викликати func після наступної синхронізації каталогу файлу path
+        (без path - після наступної синхронізації всіх каталогів)
+        """
+        if path is None:
+            with self._lock:
+                self._deferred.append(func)
+            return
+        _, state, _ = self._directory(path)
+        with self._lock:
+            state[2].append(func)
+
+    def sync(self):
+        """Синхронізувати кожен змінений каталог один раз і виконати відкладені функції"""
+        with self._lock:
+            dirty = [state for state in self._dirs.values() if state[1] and state[0] is not None]
+            deferred, self._deferred = self._deferred, []
+            for state in self._dirs.values():
+                state[1] = 0
+                deferred.extend(state[2])
+                state[2] = []
+        for state in dirty:
+            os.fsync(state[0])
+        with self._lock:
+            self.sync_calls += len(dirty)
+        for func in deferred:
+            func()
+
+    def close(self):
+        """Синхронізувати зміни та закрити дескриптори каталогів"""
+        try:
+            self.sync()
+        finally:
+            with self._lock:
+                states, self._dirs = list(self._dirs.values()), {}
+            for fd, _, _ in states:
+                if fd is not None:
+                    os.close(fd)
@@ -0,0 +1,115 @@
+"""
+Extents - визначення розміщених (allocated) діапазонів файлу
+SEEK_DATA/SEEK_HOLE з резервним варіантом FIEMAP (Linux); діри розрідженого файлу не перезаписуються
+"""
+
+import errno
+import os
+import struct
+import sys
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# struct fiemap (linux/fiemap.h)
+FS_IOC_FIEMAP = 0xC020660B
+FIEMAP_FLAG_SYNC = 0x00000001
+FIEMAP_EXTENT_LAST = 0x00000001
+FIEMAP_EXTENT_UNKNOWN = 0x00000002
+_FIEMAP_HEADER = struct.Struct('=QQIIII')
+_FIEMAP_EXTENT = struct.Struct('=QQQQQIIII')
+_FIEMAP_BATCH = 256
+
+
+def fiemap_extents(fd, length=None):
+    """
+    Отримати екстенти файлу через ioctl FIEMAP
+
+    Returns:
+        Список (логічне зміщення, фізичне зміщення, довжина, прапорці)
+        або None, якщо FIEMAP не підтримується
+    """
+    if fcntl is None or not sys.platform.startswith('linux'):
+        return None
+    if length is None:
+        length = os.fstat(fd).st_size
+
+    extents = []
+    start = 0
+    while start < length:
+        request = bytearray(_FIEMAP_HEADER.size + _FIEMAP_EXTENT.size * _FIEMAP_BATCH)
+        _FIEMAP_HEADER.pack_into(request, 0, start, length - start, FIEMAP_FLAG_SYNC, 0, _FIEMAP_BATCH, 0)
+        try:
+            fcntl.ioctl(fd, FS_IOC_FIEMAP, request, True)
+        except OSError:
+            return None
+
+        mapped = _FIEMAP_HEADER.unpack_from(request, 0)[3]
+        if not mapped:
+            break
+        last = False
+        for i in range(mapped):
+            logical, physical, ext_length, _, _, flags, _, _, _ = _FIEMAP_EXTENT.unpack_from(
+                request, _FIEMAP_HEADER.size + i * _FIEMAP_EXTENT.size)
+            extents.append((logical, physical, ext_length, flags))
+            last = bool(flags & FIEMAP_EXTENT_LAST)
+        start = logical + ext_length
+        if last:
+            break
+    return extents
+
+
+def _seek_data_ranges(fd, file_size):
+    """Діапазони даних через SEEK_DATA/SEEK_HOLE; None, якщо не підтримується"""
+    if not hasattr(os, 'SEEK_DATA'):
+        return None
+    ranges = []
+    offset = 0
+    try:
+        while offset < file_size:
+            try:
+                data = os.lseek(fd, offset, os.SEEK_DATA)
+            except OSError as e:
+                if e.errno == errno.ENXIO:  # після offset лише діра до кінця файлу
+                    break
+                raise
+            hole = min(os.lseek(fd, data, os.SEEK_HOLE), file_size)
+            if hole > data:
+                ranges.append((data, hole - data))
+            offset = hole
+    except OSError:
+        return None
+    return ranges
+
+
+def allocated_ranges(fd, file_size):
+    """
+    Повернути список (зміщення, довжина) розміщених діапазонів файлу в межах file_size
+
+    Якщо жоден механізм не доступний, весь файл вважається розміщеним.
+    """
+    if file_size <= 0:
+        return []
+
+    ranges = _seek_data_ranges(fd, file_size)
+    if ranges is not None:
+        return ranges
+
+    extents = fiemap_extents(fd, file_size)
+    if extents is not None:
+        ranges = []
+        for logical, _, length, _ in extents:
+            end = min(logical + length, file_size)
+            if end <= logical:
+                continue
+            if ranges and ranges[-1][0] + ranges[-1][1] >= logical:
+                prev_start = ranges[-1][0]
+                ranges[-1] = (prev_start, max(end, prev_start + ranges[-1][1]) - prev_start)
+            else:
+                ranges.append((logical, end - logical))
+        return ranges
+
+    return [(0, file_size)]
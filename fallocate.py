@@ -0,0 +1,103 @@
+"""
+Fallocate - перенесення проходів нулями та звільнення блоків на рівень ядра (Linux)
+FALLOC_FL_ZERO_RANGE обнуляє діапазон без передачі даних з простору користувача,
+FALLOC_FL_PUNCH_HOLE звільняє блоки (discard) перед видаленням файлу
+"""
+
+import errno
+import os
+import sys
+import threading
+
+
+FALLOC_FL_KEEP_SIZE = 0x01
+FALLOC_FL_PUNCH_HOLE = 0x02
+FALLOC_FL_ZERO_RANGE = 0x10
+
+# Коди помилок, що означають "операція не підтримується цією ФС"
+_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL, errno.ENOTTY}
+
+_fallocate = None
+_loaded = False
+
+# Результат перевірки підтримки для кожної пари (st_dev, mode)
+_support = {}
+_support_lock = threading.Lock()
+
+
+def _load():
+    """
+    Знайти fallocate у libc під час першого використання
+
+    ctypes.util.find_library запускає ldconfig, тому не виконується під час імпорту
+    (інакше кожен запуск програми сповільнюється на десятки мілісекунд).
+    """
+    global _fallocate, _loaded
+    with _support_lock:
+        if _loaded:
+            return _fallocate
+        if sys.platform.startswith('linux'):
+            import ctypes
+            import ctypes.util
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+                _fallocate = libc.fallocate
+                _fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+                _fallocate.restype = ctypes.c_int
+            except (OSError, AttributeError):
+                _fallocate = None
+        _loaded = True
+        return _fallocate
+
+
+def fallocate(fd, mode, offset, length):
+    """Виклик fallocate(2); піднімає OSError у разі помилки"""
+    func = _load()
+    if func is None:
+        raise OSError(errno.ENOSYS, "fallocate недоступний на цій платформі")
+    if func(fd, mode, offset, length) != 0:
+        import ctypes
+        err = ctypes.get_errno()
+        raise OSError(err, os.strerror(err))
+
+
+def _offload(fd, mode, ranges):
+    """
+    Виконати fallocate для всіх діапазонів, якщо ФС підтримує mode
+
+    Returns:
+        True - операцію виконано; False - ФС не підтримує (потрібен звичайний шлях)
+    """
+    if _load() is None:
+        return False
+    key = (os.fstat(fd).st_dev, mode)
+    if _support.get(key) is False:
+        return False
+    try:
+        for offset, length in ranges:
+            if length > 0:
+                fallocate(fd, mode, offset, length)
+    except OSError as e:
+        if e.errno not in _UNSUPPORTED:
+            raise
+        with _support_lock:
+            _support[key] = False
+        return False
+    with _support_lock:
+        _support[key] = True
+    return True
+
+
+def zero_ranges(fd, ranges):
+    """Обнулити діапазони через FALLOC_FL_ZERO_RANGE (розмір файлу не змінюється)"""
+    return _offload(fd, FALLOC_FL_ZERO_RANGE | FALLOC_FL_KEEP_SIZE, ranges)
+
+
+def punch_holes(fd, ranges):
+    """Звільнити блоки діапазонів через FALLOC_FL_PUNCH_HOLE (discard на рівні ФС)"""
+    return _offload(fd, FALLOC_FL_PUNCH_HOLE | FALLOC_FL_KEEP_SIZE, ranges)
+
+
+def is_zero_pattern(data_byte):
+    """Чи складається шаблон лише з нульових байтів"""
+    return data_byte is not None and not data_byte.strip(b'\x00')
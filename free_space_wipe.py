@@ -0,0 +1,274 @@
+"""
+Free Space Wipe - перезапис вільного місця файлової системи
+Залишки файлів, видалених без перезапису (Shift+Delete), лежать у нерозміщених блоках.
+Вільне місце заповнюється великими попередньо розміщеними файлами-заповнювачами, які
+перезаписуються тим самим рушієм проходів, що й звичайні файли, у кількох потоках;
+заповнення зупиняється, коли вільним лишається резерв, після чого заповнювачі видаляються
+"""
+
+import errno
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from dir_batch import DirectoryBatch
+
+
+DEFAULT_FREE_SPACE_WORKERS = 4
+DEFAULT_RESERVE = 256 * 1024 * 1024  # байтів, що лишаються вільними для інших програм
+DEFAULT_FILLER_SIZE = 1024 * 1024 * 1024
+
+# Розмір заповнювача кратний мегабайту (вирівнювання для O_DIRECT із запасом)
+FILLER_ALIGNMENT = 1024 * 1024
+
+FILLER_DIR_PREFIX = '.secure_wipe_free-'
+
+
+@dataclass
+class FreeSpaceProgress:
+    """
+    Прогрес заповнення вільного місця
+
+    bytes_total - оцінка на початку (вільне місце без резерву, помножене на кількість
+    проходів); фактично записаний обсяг може бути меншим, якщо місце зайняли інші програми.
+    """
+    bytes_total: int = 0
+    bytes_done: int = 0
+    files_created: int = 0
+    files_done: int = 0
+    bytes_allocated: int = 0
+    stopped: str = None  # причина зупинки: 'reserve', 'enospc', 'cancelled' або 'error'
+    finished: bool = False
+
+    @property
+    def percent(self):
+        if self.finished:
+            return 100.0
+        if self.bytes_total:
+            return min(self.bytes_done / self.bytes_total * 100, 100.0)
+        return 0.0
+
+
+def free_bytes(path):
+    """Вільне місце ФС шляху, доступне непривілейованому користувачу"""
+    return shutil.disk_usage(path).free
+
+
+def preallocate(fd, size):
+    """
+    Розмістити блоки файлу заздалегідь (posix_fallocate), інакше - лише встановити розмір
+
+    Returns:
+        True, якщо місце розміщено; False - файл розріджений і місце займається лише під час запису
+    """
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+                raise
+    os.ftruncate(fd, size)
+    return False
+
+
+def reserves_space(directory):
+    """Чи розміщує preallocate блоки на ФС каталогу (пробний файл у самому каталозі)"""
+    fd, path = tempfile.mkstemp(prefix='probe-', dir=directory)
+    try:
+        return preallocate(fd, FILLER_ALIGNMENT)
+    except OSError as e:
+        if e.errno != errno.ENOSPC:
+            raise
+        return True
+    finally:
+        os.close(fd)
+        os.unlink(path)
+
+
+class FreeSpaceWipe:
+    """
+    Заповнення вільного місця ФС каталогу через пул потоків
+
+    Кожен заповнювач розміщується під блокуванням, після перевірки вільного місця,
+    тож паралельні потоки разом не виходять за межу резерву. Місце розміщується до
+    запису, а рушій працює без пропуску дір (sparse=False) та без заміни нульових
+    проходів на FALLOC_FL_ZERO_RANGE (offload_zero=False): незаписані екстенти fallocate
+    теж мають бути перезаписані реальними даними. Якщо ФС не підтримує posix_fallocate
+    (заповнювач лише отримує розмір), заповнювачі записуються по одному: інакше перевірка
+    вільного місця не враховувала б ще не записані заповнювачі інших потоків.
+
+    Args:
+        deleter: SecureFileDeleter, чиї проходи та параметри рушія використовуються
+        workers: Кількість заповнювачів, що записуються одночасно
+        reserve: Байтів, що мають лишитися вільними
+        filler_size: Максимальний розмір одного заповнювача
+        progress_callback: Функція, що отримує FreeSpaceProgress (викликається з потоків
+            пулу, послідовно)
+        stop_event: threading.Event для дострокової зупинки
+    """
+
+    def __init__(self, deleter, workers=DEFAULT_FREE_SPACE_WORKERS, reserve=DEFAULT_RESERVE,
+                 filler_size=DEFAULT_FILLER_SIZE, progress_callback=None, stop_event=None):
+        if filler_size < FILLER_ALIGNMENT:
+            raise ValueError(f"filler_size має бути не менше {FILLER_ALIGNMENT} байтів")
+        self.deleter = deleter
+        self.workers = max(1, workers)
+        self.reserve = max(0, reserve)
+        self.filler_size = filler_size - filler_size % FILLER_ALIGNMENT
+        self.progress_callback = progress_callback
+        self.stop_event = stop_event or threading.Event()
+        self.progress = FreeSpaceProgress()
+        self.errors = []
+        self.directory = None
+        self.engine = None
+        self._filled = False
+        self._lock = threading.Lock()
+        self._allocate_lock = threading.Lock()
+
+    def _report(self):
+        if self.progress_callback:
+            self.progress_callback(self.progress)
+
+    def _stop(self, reason, interrupt=True):
+        """
+        Припинити створення заповнювачів; interrupt - також перервати запис уже розміщених
+        (коли місця не лишилося для нових, розміщені дописуються до кінця)
+        """
+        with self._lock:
+            if self.progress.stopped is None:
+                self.progress.stopped = reason
+            self._filled = True
+        if interrupt:
+            self.stop_event.set()
+
+    def _throttle(self, size):
+        """Викликається рушієм перед кожним записом: перервати прохід після зупинки"""
+        if self.stop_event.is_set():
+            raise InterruptedError("Заповнення вільного місця зупинено")
+
+    def _allocate(self, fd):
+        """Розмістити наступний заповнювач у межах вільного місця без резерву; 0 - місця немає"""
+        with self._allocate_lock:
+            size = min(self.filler_size, free_bytes(self.directory) - self.reserve)
+            size -= size % FILLER_ALIGNMENT
+            if size <= 0:
+                return 0
+            preallocate(fd, size)
+        return size
+
+    def _fill_one(self, path):
+        if self._filled or self.stop_event.is_set():
+            return
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0), 0o600)
+        try:
+            size = self._allocate(fd)
+        except OSError as e:
+            if e.errno != errno.ENOSPC:
+                raise
+            size = 0
+            self._stop('enospc', interrupt=False)
+        finally:
+            os.close(fd)
+        if not size:
+            self._stop('reserve', interrupt=False)
+            return
+        with self._lock:
+            self.progress.files_created += 1
+            self.progress.bytes_allocated += size
+
+        total = size * len(self.engine.passes)
+        written = [0]
+
+        def on_progress(percent):
+            done = int(total * percent / 100)
+            with self._lock:
+                self.progress.bytes_done += done - written[0]
+                written[0] = done
+                self._report()
+
+        try:
+            self.engine.run(path, size, progress_callback=on_progress, throttle=self._throttle)
+        except InterruptedError:
+            return
+        except OSError as e:
+            # На ФС з копіюванням під час запису (Btrfs, ZFS) перезапис потребує нових блоків
+            if e.errno != errno.ENOSPC:
+                raise
+            self._stop('enospc')
+            return
+        with self._lock:
+            self.progress.files_done += 1
+
+    def _collect(self, futures):
+        done, _ = wait(futures, return_when=FIRST_COMPLETED)
+        for future in done:
+            path = futures.pop(future)
+            error = future.exception()
+            if error is not None:
+                self.errors.append((path, error))
+                self._stop('error')
+
+    def remove_fillers(self):
+        """Видалити заповнювачі та їхній каталог (одна синхронізація каталогу)"""
+        if self.directory is None:
+            return
+        with DirectoryBatch() as directories:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    try:
+                        directories.unlink(entry.path)
+                    except OSError as e:
+                        self.errors.append((entry.path, e))
+            try:
+                directories.rmdir(self.directory)
+            except OSError as e:
+                self.errors.append((self.directory, e))
+        self.directory = None
+
+    def run(self, directory):
+        """
+        Заповнити вільне місце ФС каталогу directory та видалити заповнювачі
+
+        Returns:
+            FreeSpaceProgress з підсумком; помилки доступні в self.errors
+        """
+        directory = os.path.abspath(os.fspath(directory))
+        if not os.path.isdir(directory):
+            raise NotADirectoryError(f"Каталог не знайдено: {directory}")
+        tuning = self.deleter.tuning_for(os.path.join(directory, FILLER_DIR_PREFIX))
+        self.engine = self.deleter.create_engine(tuning=tuning, sparse=False,
+                                                 offload_zero=False).compile()
+        self.progress.bytes_total = max(0, free_bytes(directory) - self.reserve) * len(self.engine.passes)
+        self.directory = tempfile.mkdtemp(prefix=FILLER_DIR_PREFIX, dir=directory)
+
+        futures = {}
+        index = 0
+        try:
+            workers = self.workers if reserves_space(self.directory) else 1
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                try:
+                    while not (self._filled or self.stop_event.is_set()):
+                        index += 1
+                        path = os.path.join(self.directory, f"filler-{index:06d}")
+                        futures[executor.submit(self._fill_one, path)] = path
+                        while len(futures) >= workers:
+                            self._collect(futures)
+                except BaseException:
+                    # Перерване заповнення (KeyboardInterrupt) зупиняє потоки до видалення заповнювачів
+                    self._stop('cancelled')
+                    raise
+                finally:
+                    while futures:
+                        self._collect(futures)
+        finally:
+            self.remove_fillers()
+
+        if self.progress.stopped is None:
+            self.progress.stopped = 'cancelled'
+        self.progress.finished = True
+        self._report()
+        return self.progress
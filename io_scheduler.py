@@ -0,0 +1,205 @@
+"""
+I/O Scheduler - планувальник завдань видалення з розподілом за пристроями
+Кожен пристрій (st_dev) має власне обмеження паралельності та пропускної здатності
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+DEFAULT_DEVICE_CONCURRENCY = 2
+
+
+class TokenBucket:
+    """
+    Обмежувач пропускної здатності за алгоритмом token bucket
+
+    Args:
+        rate: Швидкість поповнення в байтах за секунду (None - без обмеження)
+        burst: Місткість відра в байтах (за замовчуванням - одна секунда трафіку)
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else (rate or 0)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, amount):
+        """Забрати amount байтів з відра, за потреби очікуючи на поповнення"""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            # Борг допускається: великий запис чекає рівно стільки, скільки потрібно для його оплати
+            self.tokens -= amount
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0
+        if delay:
+            time.sleep(delay)
+
+
+class DeviceQueue:
+    """Черга завдань одного пристрою з власним пулом потоків та статистикою"""
+
+    def __init__(self, device, concurrency, bandwidth):
+        self.device = device
+        self.concurrency = concurrency
+        self.bucket = TokenBucket(bandwidth)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency,
+                                           thread_name_prefix=f"wipe-dev{device}")
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_written = 0
+        # Час, протягом якого на пристрої виконувалося хоча б одне завдання
+        self.busy_time = 0.0
+        self._busy_since = None
+        self._lock = threading.Lock()
+
+    def throttle(self, amount):
+        self.bucket.consume(amount)
+        with self._lock:
+            self.bytes_written += amount
+
+    def job_queued(self):
+        with self._lock:
+            self.queued += 1
+
+    def job_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def job_started(self):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            if self.active == 1:
+                self._busy_since = time.monotonic()
+
+    def job_finished(self, ok):
+        with self._lock:
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self.active -= 1
+            if self.active == 0:
+                self.busy_time += time.monotonic() - self._busy_since
+                self._busy_since = None
+
+    def stats(self):
+        with self._lock:
+            elapsed = self.busy_time
+            if self._busy_since is not None:
+                elapsed += time.monotonic() - self._busy_since
+            return {
+                'device': self.device,
+                'concurrency': self.concurrency,
+                'bandwidth_limit': self.bucket.rate,
+                'queued': self.queued,
+                'active': self.active,
+                'completed': self.completed,
+                'failed': self.failed,
+                'bytes_written': self.bytes_written,
+                'throughput_mb_s': (self.bytes_written / (1024 * 1024) / elapsed) if elapsed else 0.0,
+            }
+
+
+class DeviceScheduler:
+    """
+    Планувальник видалення, що групує завдання за пристроєм (st_dev)
+
+    Args:
+        deleter: SecureFileDeleter, що виконує видалення файлів submit (для submit_call не потрібен)
+        concurrency: Кількість одночасних завдань на пристрій за замовчуванням
+        bandwidth: Обмеження запису в байтах/с на пристрій за замовчуванням (None - без обмеження)
+        device_limits: Словник {st_dev: (concurrency, bandwidth)} для окремих пристроїв
+    """
+
+    def __init__(self, deleter, concurrency=DEFAULT_DEVICE_CONCURRENCY, bandwidth=None,
+                 device_limits=None):
+        self.deleter = deleter
+        self.concurrency = concurrency
+        self.bandwidth = bandwidth
+        self.device_limits = dict(device_limits or {})
+        self.devices = {}
+        self._lock = threading.Lock()
+
+    def _device_queue(self, device):
+        with self._lock:
+            queue = self.devices.get(device)
+            if queue is None:
+                concurrency, bandwidth = self.device_limits.get(device, (self.concurrency, self.bandwidth))
+                queue = DeviceQueue(device, concurrency, bandwidth)
+                self.devices[device] = queue
+            return queue
+
+    def _run(self, queue, func, args, kwargs):
+        queue.job_started()
+        ok = False
+        try:
+            throttle = kwargs.get('throttle')
+            if throttle is None:
+                kwargs['throttle'] = queue.throttle
+            else:
+                # Обмежувач завдання (наприклад, переривання) викликається перед обмежувачем пристрою
+                def combined(amount):
+                    throttle(amount)
+                    queue.throttle(amount)
+                kwargs['throttle'] = combined
+            result = func(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            queue.job_finished(ok)
+
+    def submit(self, filepath, **kwargs):
+        """
+        Поставити файл у чергу його пристрою
+
+        Додаткові аргументи передаються в secure_delete (наприклад, progress_callback).
+
+        Returns:
+            concurrent.futures.Future з результатом secure_delete
+        """
+        return self.submit_call(os.stat(filepath).st_dev, self.deleter.secure_delete, filepath, **kwargs)
+
+    def submit_call(self, device, func, *args, **kwargs):
+        """
+        Поставити в чергу пристрою device довільне завдання func(*args, **kwargs)
+
+        func отримує аргумент throttle - обмежувач пропускної здатності пристрою (якщо
+        throttle задано в kwargs, він викликається перед обмежувачем пристрою).
+
+        Returns:
+            concurrent.futures.Future з результатом func
+        """
+        queue = self._device_queue(device)
+        queue.job_queued()
+        future = queue.executor.submit(self._run, queue, func, args, kwargs)
+        future.add_done_callback(queue.job_cancelled)
+        return future
+
+    def capacity(self):
+        """Сумарна кількість одночасних завдань усіх пристроїв, що вже мають черги"""
+        with self._lock:
+            return sum(queue.concurrency for queue in self.devices.values())
+
+    def stats(self):
+        """Глибина черги та пропускна здатність кожного пристрою"""
+        with self._lock:
+            queues = list(self.devices.values())
+        return [queue.stats() for queue in queues]
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            queues = list(self.devices.values())
+        for queue in queues:
+            queue.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
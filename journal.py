@@ -0,0 +1,300 @@
+"""
+Journal - журнал незавершених завдань видалення для відновлення після збою
+Кожне завдання зберігається окремим JSON-файлом, що замінюється атомарно
+(запис у тимчасовий файл, fsync, os.replace); файл видаляється після завершення завдання.
+Каталог журналу синхронізується лише при створенні та видаленні запису: якщо після збою
+заміна запису не збереглася, лишається попередня версія (завдання лише повторить частину роботи)
+
+Групу файлів (вікно плану CLI, частину дерева) можна записати одним груповим записом
+batch-<id>.json разом із заздалегідь згенерованими ланцюжками імен: окремий запис файлу
+створюється лише з першою контрольною точкою, а груповий видаляється після завершення
+всіх його файлів. Після збою відновлюються всі файли групи, зокрема ще не розпочаті.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from dataclasses import dataclass, field
+
+from wipe_engine import DEFAULT_CHECKPOINT_INTERVAL
+
+
+DEFAULT_JOURNAL_DIR = '.secure_delete_journal'
+
+BATCH_PREFIX = 'batch-'
+
+
+@dataclass
+class JournalEntry:
+    """
+    Стан одного завдання у журналі
+
+    Args:
+        job_id: Ідентифікатор завдання (ім'я файлу журналу)
+        path: Початковий шлях до файлу
+        plan: Назва плану перезапису
+        size: Розмір файлу на початку завдання
+        device, inode: Ідентичність файлу (не змінюється при перейменуванні)
+        stage: 'overwrite' - виконуються проходи, 'rename' - перейменування та видалення
+        pass_index: Номер поточного проходу (з нуля)
+        offset: Зміщення, до якого поточний прохід гарантовано записано на носій
+        renames: Ланцюжок випадкових імен (кожне записується до перейменування)
+        batch: Ідентифікатор групового запису (None - завдання має лише окремий запис)
+    """
+    job_id: str
+    path: str
+    plan: str
+    size: int
+    device: int
+    inode: int
+    stage: str = 'overwrite'
+    pass_index: int = 0
+    offset: int = 0
+    renames: list = field(default_factory=list)
+    batch: str = None
+
+    def current_path(self):
+        """
+        Знайти файл завдання серед початкового шляху та ланцюжка перейменувань
+
+        Returns:
+            Шлях або None, якщо файл уже видалено (чи замінено іншим файлом)
+        """
+        for candidate in reversed([self.path] + self.renames):
+            try:
+                st = os.lstat(candidate)
+            except OSError:
+                continue
+            if (st.st_dev, st.st_ino) == (self.device, self.inode):
+                return candidate
+        return None
+
+
+class WipeJournal:
+    """
+    Каталог журналу завдань видалення
+
+    Журнал містить шлях до файлу, тому має зберігатися там, де це допустимо;
+    запис завдання видаляється одразу після видалення файлу.
+
+    Args:
+        directory: Каталог журналу (створюється за потреби)
+        checkpoint_interval: Період контрольних точок усередині проходу в секундах
+    """
+
+    def __init__(self, directory=DEFAULT_JOURNAL_DIR, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        self.directory = directory
+        self.checkpoint_interval = checkpoint_interval
+        # Груповий запис і його незавершені завдання; завдання груп з окремим записом
+        self._batches = {}
+        self._own = set()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _batch_path(self, batch_id):
+        return os.path.join(self.directory, f'{BATCH_PREFIX}{batch_id}.json')
+
+    def _write(self, path, data, sync_directory):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            # json.dumps кодує одним викликом C-кодувальника (json.dump пише частинами)
+            f.write(json.dumps(data, ensure_ascii=False))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        if sync_directory:
+            self._sync_directory()
+
+    def _sync_directory(self):
+        if not hasattr(os, 'O_DIRECTORY'):  # Windows: каталоги не синхронізуються
+            return
+        fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def save(self, entry, sync_directory=False):
+        """
+        Атомарно записати стан завдання (sync_directory - для нового запису; перше
+        збереження завдання групи створює його окремий запис і синхронізує каталог)
+        """
+        if entry.batch is not None:
+            with self._lock:
+                if entry.job_id not in self._own:
+                    self._own.add(entry.job_id)
+                    sync_directory = True
+        self._write(self._entry_path(entry.job_id), vars(entry), sync_directory)
+
+    def begin(self, path, plan):
+        """Зареєструвати нове завдання для файлу path"""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        entry = JournalEntry(job_id=uuid.uuid4().hex, path=path, plan=plan, size=st.st_size,
+                             device=st.st_dev, inode=st.st_ino)
+        self.save(entry, sync_directory=True)
+        return entry
+
+    def begin_batch(self, files, plan, renames):
+        """
+        Зареєструвати групу завдань одним груповим записом
+
+        Args:
+            files: Кортежі (абсолютний шлях, розмір, st_dev, st_ino)
+            plan: Назва плану перезапису
+            renames: Ланцюжок абсолютних шляхів для кожного файлу (записується заздалегідь,
+                тож перейменування не потребують збережень журналу)
+
+        Returns:
+            Список JournalEntry у порядку files
+        """
+        rows = [[path, size, device, inode, chain]
+                for (path, size, device, inode), chain in zip(files, renames)]
+        if not rows:
+            return []
+        # Спільні поля записуються один раз, кожен файл - рядком без значень за замовчуванням
+        record = {'batch': uuid.uuid4().hex, 'plan': plan, 'files': rows}
+        entries = self._batch_entries(record)
+        self._write(self._batch_path(record['batch']), record, sync_directory=True)
+        return entries
+
+    def _batch_entries(self, record):
+        """Завдання групового запису (реєструються як незавершені завдання групи)"""
+        batch_id = record['batch']
+        # Номери вилучених завдань (discard) пропускаються, решта зберігає свої ідентифікатори
+        skipped = set(record.get('done', ()))
+        entries = [JournalEntry(job_id=f'{batch_id}-{index}', path=path, plan=record['plan'], size=size,
+                                device=device, inode=inode, renames=chain, batch=batch_id)
+                   for index, (path, size, device, inode, chain) in enumerate(record['files'])
+                   if index not in skipped]
+        with self._lock:
+            self._batches[batch_id] = (record, {entry.job_id for entry in entries})
+        return entries
+
+    def checkpoint(self, entry, pass_index, offset):
+        """Зберегти контрольну точку: прохід pass_index записано до зміщення offset"""
+        entry.pass_index = pass_index
+        entry.offset = offset
+        self.save(entry)
+
+    def set_stage(self, entry, stage):
+        entry.stage = stage
+        self.save(entry)
+
+    def record_renames(self, entry, new_paths):
+        """
+        Записати весь ланцюжок випадкових імен до виконання перейменувань
+        (одне збереження; завдання переходить до етапу 'rename')
+        """
+        entry.stage = 'rename'
+        entry.renames.extend(os.path.abspath(path) for path in new_paths)
+        self.save(entry)
+
+    def finish(self, entry):
+        """
+        Видалити запис завершеного завдання (завдання групи - лише окремий запис, якщо він
+        є; груповий запис видаляється разом з останнім завданням групи)
+        """
+        if entry.batch is None:
+            self._remove(self._entry_path(entry.job_id))
+            self._sync_directory()
+            return
+        with self._lock:
+            own = entry.job_id in self._own
+            self._own.discard(entry.job_id)
+            _, remaining = self._batches.get(entry.batch, (None, None))
+            batch_done = False
+            if remaining is not None:
+                remaining.discard(entry.job_id)
+                if not remaining:
+                    del self._batches[entry.batch]
+                    batch_done = True
+        if own:
+            self._remove(self._entry_path(entry.job_id))
+        if batch_done:
+            self._remove(self._batch_path(entry.batch))
+        if own or batch_done:
+            self._sync_directory()
+
+    def discard(self, entries):
+        """
+        Вилучити з журналу завдання, які так і не розпочалися (скасовані або не передані
+        до пулу), щоб відновлення їх не виконало
+
+        Груповий запис перезаписується один раз лише з незавершеними завданнями (або
+        видаляється, якщо таких у ньому не лишилося).
+        """
+        changed = {}
+        for entry in entries:
+            if entry.batch is None:
+                self.finish(entry)
+                continue
+            with self._lock:
+                own = entry.job_id in self._own
+                self._own.discard(entry.job_id)
+                record, remaining = self._batches.get(entry.batch, (None, None))
+                if remaining is not None:
+                    remaining.discard(entry.job_id)
+                    changed[entry.batch] = record
+            if own:
+                self._remove(self._entry_path(entry.job_id))
+        # Під блокуванням: завдання групи, що ще виконуються, можуть водночас завершитися
+        with self._lock:
+            for batch_id, record in changed.items():
+                _, remaining = self._batches.get(batch_id, (None, None))
+                if remaining is None:
+                    continue
+                if remaining:
+                    # Завершені та вилучені завдання не відновлюються
+                    prefix = f'{batch_id}-'
+                    record['done'] = [index for index in range(len(record['files']))
+                                      if prefix + str(index) not in remaining]
+                    self._write(self._batch_path(batch_id), record, sync_directory=False)
+                else:
+                    del self._batches[batch_id]
+                    self._remove(self._batch_path(batch_id))
+        if changed:
+            self._sync_directory()
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def pending(self):
+        """
+        Список незавершених завдань (пошкоджені записи пропускаються)
+
+        Завдання групового запису з окремим записом (контрольна точка) береться з окремого.
+        """
+        batched = {}
+        entries = {}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if name.endswith('.tmp'):
+                # Збій під час запису: попередня версія запису залишилася цілою
+                os.remove(path)
+                continue
+            if not name.endswith('.json'):
+                continue
+            try:
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                if name.startswith(BATCH_PREFIX):
+                    batched.update((entry.job_id, entry) for entry in self._batch_entries(data))
+                else:
+                    entry = JournalEntry(**data)
+                    entries[entry.job_id] = entry
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logging.warning("Пошкоджений запис журналу %s: %s", path, e)
+        with self._lock:
+            self._own.update(job_id for job_id, entry in entries.items() if entry.batch is not None)
+        batched.update(entries)
+        return list(batched.values())
@@ -0,0 +1,160 @@
+"""
+Keystream sources - генератори псевдовипадкових даних для проходів перезапису
+Заповнюють цілий попередньо виділений буфер одним викликом замість побайтового random.randint
+"""
+
+import hashlib
+import os
+import random
+
+_aes = None
+
+
+def _load_aes():
+    """
+    Імпортувати AES-CTR з cryptography під час першого створення CSPRNG-потоку
+
+    cryptography - необов'язкова залежність, імпорт якої займає десятки мілісекунд,
+    тому він не виконується під час імпорту модуля. Повертає None без пакета.
+    """
+    global _aes
+    if _aes is None:
+        try:
+            from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+            _aes = (Cipher, algorithms, modes)
+        except ImportError:
+            _aes = False
+    return _aes or None
+
+
+# Розмір блоку ключового потоку: вміст кожного блоку залежить лише від ключа
+# та номера блоку, тому потік можна генерувати з будь-якого зміщення
+KEYSTREAM_BLOCK = 64 * 1024
+
+
+class KeystreamSource:
+    """
+    Базовий клас джерела ключового потоку
+
+    Вміст потоку детермінований для заданого ключа, тому той самий потік можна
+    відтворити повторно (наприклад, для перевірки) або генерувати частинами
+    з довільного зміщення.
+    """
+
+    name = 'base'
+    _cached_index = None
+    _cached_block = None
+
+    def _block(self, index, length=KEYSTREAM_BLOCK):
+        """
+        Згенерувати перші length байтів блоку ключового потоку з номером index
+
+        Префікс блоку не залежить від length (length кратна 4), тож частковий блок
+        збігається з початком повного.
+        """
+        raise NotImplementedError
+
+    def clone(self):
+        """Незалежна копія джерела з тим самим ключем (для генерації в іншому потоці)"""
+        raise NotImplementedError
+
+    def fill(self, buffer, offset=0):
+        """
+        Заповнити буфер даними потоку, починаючи зі зміщення offset
+
+        Args:
+            buffer: bytearray, memoryview або mmap, доступний для запису
+            offset: Зміщення в потоці (зазвичай зміщення у файлі)
+        """
+        view = memoryview(buffer).cast('B')
+        size = len(view)
+        pos = 0
+
+        while pos < size:
+            index, skip = divmod(offset + pos, KEYSTREAM_BLOCK)
+            count = min(KEYSTREAM_BLOCK - skip, size - pos)
+            if index != self._cached_index:
+                # Новий блок генерується лише до кінця потрібних даних (дрібні файли)
+                end = skip + count
+                self._cached_block = self._block(index, min(end + -end % 4, KEYSTREAM_BLOCK))
+                self._cached_index = index
+            elif len(self._cached_block) < skip + count:
+                # Дрібні послідовні буфери в тому самому блоці: далі кешується повний блок
+                self._cached_block = self._block(index)
+            block = self._cached_block
+            view[pos:pos + count] = block[skip:skip + count]
+            pos += count
+
+    def generate(self, size, offset=0):
+        """Повернути size байтів потоку як bytes"""
+        buffer = bytearray(size)
+        self.fill(buffer, offset)
+        return bytes(buffer)
+
+
+class PRNGKeystream(KeystreamSource):
+    """Швидкий детермінований потік на основі random.Random (Mersenne Twister)"""
+
+    name = 'prng'
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(16), 'little')
+        self._rng = random.Random()
+
+    def clone(self):
+        return PRNGKeystream(self.seed)
+
+    def _block(self, index, length=KEYSTREAM_BLOCK):
+        # getrandbits заповнює 32-бітні слова від молодших байтів: префікс стабільний
+        self._rng.seed((self.seed << 64) | index)
+        return self._rng.getrandbits(length * 8).to_bytes(length, 'little')
+
+
+class CSPRNGKeystream(KeystreamSource):
+    """
+    Криптографічно стійкий потік з випадковим ключем від os.urandom
+
+    Використовує AES-256-CTR, якщо встановлено пакет cryptography,
+    інакше SHAKE-256 з ключем та номером блоку зі стандартної бібліотеки.
+    """
+
+    name = 'csprng'
+
+    def __init__(self, key=None):
+        self.key = key if key is not None else os.urandom(32)
+        self._aes = _load_aes()
+        self.backend = 'aes-ctr' if self._aes is not None else 'shake256'
+        self._zeros = bytes(KEYSTREAM_BLOCK)
+
+    def clone(self):
+        return CSPRNGKeystream(self.key)
+
+    def _block(self, index, length=KEYSTREAM_BLOCK):
+        if self._aes is not None:
+            Cipher, algorithms, modes = self._aes
+            # Лічильник CTR відповідає номеру 16-байтового блоку AES у потоці
+            counter = (index * (KEYSTREAM_BLOCK // 16)).to_bytes(16, 'big')
+            encryptor = Cipher(algorithms.AES(self.key), modes.CTR(counter)).encryptor()
+            return encryptor.update(self._zeros[:length])
+        return hashlib.shake_256(self.key + index.to_bytes(8, 'little')).digest(length)
+
+
+KEYSTREAM_MODES = {
+    'prng': PRNGKeystream,
+    'csprng': CSPRNGKeystream,
+}
+
+
+def make_keystream(mode='prng', **kwargs):
+    """
+    Створити джерело ключового потоку за назвою режиму
+
+    Args:
+        mode: 'prng' (швидкий, з seed) або 'csprng' (криптографічно стійкий)
+        **kwargs: Параметри конструктора (seed для prng, key для csprng)
+    """
+    try:
+        source_class = KEYSTREAM_MODES[mode]
+    except KeyError:
+        raise ValueError(f"Невідомий режим ключового потоку: {mode}")
+    return source_class(**kwargs)
@@ -0,0 +1,190 @@
+"""
+Server metrics in Prometheus text exposition format
+
+Phases of a deletion job are timed once per phase (chmod, each overwrite pass,
+fsync, rename, unlink), never per chunk, so the write loop carries no
+instrumentation cost. Observations are recorded on the event loop from the
+timings a worker returns, which also works with a process pool.
+
+    GET /metrics  ->  text/plain; version=0.0.4
+"""
+
+import asyncio
+import bisect
+import threading
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0, 300.0)
+THROUGHPUT_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2000, 4000, 8000)  # MB/s
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = label_names
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple((name, labels[name]) for name in self.label_names)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = dict(self.values) or ({(): 0} if not self.label_names else {})
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_labels(key)} {_number(value)}')
+        return lines
+
+
+class Gauge:
+    """Gauge whose value is read from func at scrape time"""
+
+    def __init__(self, name, help_text, func):
+        self.name = name
+        self.help = help_text
+        self.func = func
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} gauge',
+                f'{self.name} {_number(self.func())}']
+
+
+class DeviceMetrics:
+    """Per-device queue metrics read from DeviceScheduler.stats() at scrape time"""
+
+    # stats() field -> (metric name, type, help)
+    FIELDS = (
+        ('queued', 'secure_delete_device_jobs_queued', 'gauge', 'Jobs waiting for a device slot'),
+        ('active', 'secure_delete_device_jobs_active', 'gauge', 'Jobs holding a device slot'),
+        ('completed', 'secure_delete_device_jobs_completed_total', 'counter', 'Jobs finished per device'),
+        ('bytes_written', 'secure_delete_device_bytes_written_total', 'counter', 'Bytes written per device'),
+        ('throughput_mb_s', 'secure_delete_device_throughput_mb_per_second', 'gauge',
+         'Write throughput while the device had active jobs'),
+    )
+
+    def __init__(self, func):
+        self.func = func
+
+    def render(self):
+        devices = self.func()
+        lines = []
+        for field, name, kind, help_text in self.FIELDS:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            lines.extend(f'{name}{_labels((("device", stats["device"]),))} {_number(stats[field])}'
+                         for stats in devices)
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.label_names = label_names
+        self.series = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple((name, labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: list(values) for key, values in self.series.items()}
+        for key, values in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(float(bound))
+                lines.append(f'{self.name}_bucket{_labels(key + (("le", le),))} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(key)} {_number(values[-2])}')
+            lines.append(f'{self.name}_count{_labels(key)} {values[-1]}')
+        return lines
+
+
+class ServerMetrics:
+    """Metrics of one DeletionServer"""
+
+    def __init__(self, in_flight=lambda: 0, devices=lambda: []):
+        self.phase_seconds = Histogram('secure_delete_phase_seconds',
+                                       'Duration of each deletion phase', LATENCY_BUCKETS, ('phase',))
+        self.pass_throughput = Histogram('secure_delete_pass_throughput_mb_per_second',
+                                         'Overwrite throughput of each pass', THROUGHPUT_BUCKETS)
+        self.job_seconds = Histogram('secure_delete_job_seconds', 'Duration of whole jobs',
+                                     LATENCY_BUCKETS)
+        self.bytes_wiped = Counter('secure_delete_bytes_wiped_total', 'Bytes overwritten')
+        self.jobs = Counter('secure_delete_jobs_total', 'Finished jobs by outcome', ('outcome',))
+        self.failures = Counter('secure_delete_failures_total', 'Failed jobs by phase', ('phase',))
+        self.rejected = Counter('secure_delete_requests_rejected_total', 'Requests rejected with a full queue')
+        self.in_flight = Gauge('secure_delete_jobs_in_flight', 'Queued and running jobs', in_flight)
+        self.devices = DeviceMetrics(devices)
+
+    def record_job(self, ok, timings, seconds):
+        for phase in ('chmod', 'unlink'):
+            if phase in timings:
+                self.phase_seconds.observe(timings[phase], phase=phase)
+        for phase in ('fsync', 'rename'):
+            for duration in timings.get(phase, ()):
+                self.phase_seconds.observe(duration, phase=phase)
+        for duration, size in timings.get('passes', ()):
+            self.phase_seconds.observe(duration, phase='pass')
+            if duration > 0:
+                self.pass_throughput.observe(size / (1024 * 1024) / duration)
+            self.bytes_wiped.inc(size)
+        self.job_seconds.observe(seconds)
+        self.jobs.inc(outcome='ok' if ok else 'failed')
+        if not ok:
+            self.failures.inc(phase=timings.get('failed_phase', 'unknown'))
+
+    def render(self):
+        lines = []
+        for metric in (self.phase_seconds, self.pass_throughput, self.job_seconds, self.bytes_wiped,
+                       self.jobs, self.failures, self.rejected, self.in_flight, self.devices):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    async def handle_http(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():  # skip headers
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) >= 2 and parts[0] == 'GET' and parts[1].split('?')[0] == '/metrics':
+                status, content_type, body = '200 OK', CONTENT_TYPE, self.render().encode()
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'Not found\n'
+            writer.write(f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                         f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode() + body)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def start_http(self, host='127.0.0.1', port=9464):
+        server = await asyncio.start_server(self.handle_http, host, port)
+        print(f"Metrics available at http://{host}:{port}/metrics")
+        return server
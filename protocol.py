@@ -0,0 +1,89 @@
+"""
+Framed message protocol shared by client.py and server.py
+
+Every message is a 4-byte big-endian length followed by a UTF-8 JSON object.
+
+Client -> server:
+    {"type": "delete", "id": <request id>, "paths": [<path>, ...], "plan": <optional plan name>}
+
+Server -> client (several per request, jobs may interleave):
+    {"type": "accepted", "id": ..., "jobs": [{"job": <job id>, "path": ...}, ...]}
+    {"type": "pass", "job": ..., "pass": <n>, "total": <passes>, "name": ...}
+    {"type": "progress", "job": ..., "percent": <0-100>, "eta": <seconds, only with --autotune>}
+    {"type": "result", "job": ..., "path": ..., "ok": <bool>, "message": ...}
+    {"type": "done", "id": ...}
+    {"type": "error", "message": ...}
+"""
+
+import asyncio
+import json
+import struct
+
+HEADER = struct.Struct('>I')
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class ProtocolError(Exception):
+    pass
+
+
+def encode_message(message):
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Message too large: {len(payload)} bytes")
+    return HEADER.pack(len(payload)) + payload
+
+
+def decode_payload(payload):
+    try:
+        message = json.loads(payload.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError) as e:
+        raise ProtocolError(f"Malformed message: {e}")
+    if not isinstance(message, dict) or 'type' not in message:
+        raise ProtocolError("Message must be an object with a 'type' field")
+    return message
+
+
+def _check_length(length):
+    if length > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Frame too large: {length} bytes")
+    return length
+
+
+# Blocking socket helpers (client side)
+
+def _recv_exact(sock, size):
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        data += chunk
+    return bytes(data)
+
+
+def send_message(sock, message):
+    sock.sendall(encode_message(message))
+
+
+def recv_message(sock):
+    length = _check_length(HEADER.unpack(_recv_exact(sock, HEADER.size))[0])
+    return decode_payload(_recv_exact(sock, length))
+
+
+# Asyncio stream helpers (server side)
+
+async def read_message(reader):
+    """Read one message; returns None when the peer closed the connection cleanly"""
+    try:
+        header = await reader.readexactly(HEADER.size)
+    except asyncio.IncompleteReadError as e:
+        if not e.partial:
+            return None
+        raise ConnectionError("Connection closed mid-frame")
+    length = _check_length(HEADER.unpack(header)[0])
+    return decode_payload(await reader.readexactly(length))
+
+
+def write_message(writer, message):
+    writer.write(encode_message(message))
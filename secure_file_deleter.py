@@ -1,190 +1,72 @@
 """
 Secure File Deleter - German VSITR Algorithm Implementation
 Десктопна програма для остаточного видалення файлів
+(логіка видалення - в deleter.py, консольна версія - cli.py)
 """
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import os
-import random
-import stat
-import string
-from pathlib import Path
+import queue
+import threading
+import time
+from dataclasses import replace
 import logging
 from datetime import datetime
 
-# Налаштування логування
-logging.basicConfig(
-    filename='secure_delete_log.txt',
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
-)
+from audit_log import AuditLogger, configure_text_log
+from calibration import CalibrationCache
+from deleter import SecureFileDeleter
+from free_space_wipe import DEFAULT_RESERVE, free_bytes
+from journal import WipeJournal
 
 
-class SecureFileDeleter:
-    """Клас для безпечного видалення файлів за алгоритмом German VSITR"""
-    
-    def __init__(self):
-        self.passes = [
-            ('0x00', b'\x00'),  # Прохід 1
-            ('0xFF', b'\xFF'),  # Прохід 2
-            ('Random 1', None), # Прохід 3
-            ('Random 2', None), # Прохід 4
-            ('Random 3', None), # Прохід 5
-            ('0xAA', b'\xAA'),  # Прохід 6
-            ('Random 4', None)  # Прохід 7
-        ]
+
+class ThrottledCallback:
+    """
+    Обгортка callback, що пропускає не більше rate_hz викликів за секунду
     
-    def make_writable(self, filepath):
-        """Зробити файл доступним для запису (для файлів тільки для читання)"""
-        try:
-            os.chmod(filepath, stat.S_IWRITE | stat.S_IREAD)
-            logging.info(f"Змінено атрибути файлу: {filepath}")
-            return True
-        except Exception as e:
-            logging.error(f"Помилка зміни атрибутів: {e}")
-            return False
+    Проміжні значення відкидаються; значення 100 (завершення) передається завжди.
+    """
     
-    def overwrite_file(self, filepath, data_byte, file_size, progress_callback=None):
-        """Перезаписати файл заданими даними"""
-        try:
-            with open(filepath, 'rb+') as f:
-                chunk_size = 4096  # 4 KB chunks
-                written = 0
-                
-                while written < file_size:
-                    remaining = file_size - written
-                    current_chunk = min(chunk_size, remaining)
-                    
-                    if data_byte is None:  # Псевдовипадкові дані
-                        chunk = bytes(random.randint(0, 255) for _ in range(current_chunk))
-                    else:
-                        chunk = data_byte * current_chunk
-                    
-                    f.write(chunk)
-                    written += current_chunk
-                    
-                    if progress_callback:
-                        progress = (written / file_size) * 100
-                        progress_callback(progress)
-                
-                f.flush()
-                os.fsync(f.fileno())
-            
-            return True
-        except Exception as e:
-            logging.error(f"Помилка перезапису файлу: {e}")
-            return False
-    
-    def rename_file_randomly(self, filepath, times=3):
-        """Перейменувати файл випадковими іменами"""
-        current_path = Path(filepath)
-        parent_dir = current_path.parent
-        
-        try:
-            for i in range(times):
-                # Генерація випадкового імені
-                random_name = ''.join(random.choices(string.ascii_letters + string.digits, k=16))
-                new_path = parent_dir / random_name
-                
-                os.rename(current_path, new_path)
-                logging.info(f"Перейменовано: {current_path.name} -> {new_path.name}")
-                current_path = new_path
-            
-            return str(current_path)
-        except Exception as e:
-            logging.error(f"Помилка перейменування: {e}")
-            return str(current_path)
+    def __init__(self, callback, rate_hz=20):
+        self.callback = callback
+        self.interval = 1.0 / rate_hz
+        self.last_call = 0.0
     
-    def secure_delete(self, filepath, progress_callback=None, status_callback=None):
-        """
-        Безпечне видалення файлу за алгоритмом German VSITR
-        
-        Алгоритм German VSITR (7 проходів):
-        1. Запис 0x00
-        2. Запис 0xFF
-        3-5. Запис псевдовипадкових даних (3 проходи)
-        6. Запис 0xAA
-        7. Запис псевдовипадкових даних
-        """
-        try:
-            # Перевірка існування файлу
-            if not os.path.exists(filepath):
-                raise FileNotFoundError(f"Файл не знайдено: {filepath}")
-            
-            # Отримання розміру файлу
-            file_size = os.path.getsize(filepath)
-            logging.info(f"Початок безпечного видалення: {filepath} (розмір: {file_size} байт)")
-            
-            if status_callback:
-                status_callback(f"Підготовка файлу до видалення...")
-            
-            # Зробити файл доступним для запису
-            self.make_writable(filepath)
-            
-            # Виконання 7 проходів перезапису
-            total_passes = len(self.passes)
-            for pass_num, (pass_name, data_byte) in enumerate(self.passes, 1):
-                if status_callback:
-                    status_callback(f"Прохід {pass_num}/{total_passes}: {pass_name}")
-                
-                logging.info(f"Прохід {pass_num}: {pass_name}")
-                
-                def pass_progress(progress):
-                    if progress_callback:
-                        # Загальний прогрес = (завершені проходи + поточний прогрес) / загальна кількість проходів
-                        total_progress = ((pass_num - 1) * 100 + progress) / total_passes
-                        progress_callback(total_progress)
-                
-                success = self.overwrite_file(filepath, data_byte, file_size, pass_progress)
-                if not success:
-                    raise Exception(f"Помилка на проході {pass_num}")
-            
-            # Перейменування файлу
-            if status_callback:
-                status_callback("Перейменування файлу...")
-            
-            logging.info("Початок перейменування файлу")
-            final_path = self.rename_file_randomly(filepath, times=3)
-            
-            # Остаточне видалення
-            if status_callback:
-                status_callback("Остаточне видалення...")
-            
-            os.remove(final_path)
-            logging.info(f"Файл успішно видалено: {filepath}")
-            
-            if progress_callback:
-                progress_callback(100)
-            
-            if status_callback:
-                status_callback("Файл успішно видалено!")
-            
-            return True
-            
-        except Exception as e:
-            error_msg = f"Помилка видалення файлу: {str(e)}"
-            logging.error(error_msg)
-            if status_callback:
-                status_callback(f"ПОМИЛКА: {str(e)}")
-            raise
+    def __call__(self, value):
+        now = time.monotonic()
+        if now - self.last_call >= self.interval or value == 100:
+            self.last_call = now
+            self.callback(value)
 
 
 class SecureFileDeleterGUI:
     """Графічний інтерфейс для програми безпечного видалення файлів"""
     
-    def __init__(self, root):
+    POLL_INTERVAL_MS = 50   # Період опитування черги подій
+    PROGRESS_RATE_HZ = 20   # Максимальна частота оновлення прогресу
+    
+    def __init__(self, root, audit_logger=None, journal=None, calibration=None):
         self.root = root
         self.root.title("Secure File Deleter - German VSITR")
         self.root.geometry("700x600")
         self.root.resizable(True, True)
         self.root.minsize(600, 500)
         
-        self.deleter = SecureFileDeleter()
+        self.deleter = SecureFileDeleter(audit_logger=audit_logger, journal=journal,
+                                         calibration=calibration)
         self.selected_file = None
+        self.estimated_seconds = None  # оцінка тривалості поточного видалення файлу
+        
+        # Події від фонового потоку видалення: ('progress' | 'status' | 'tree' | 'done' | 'error', дані)
+        self.events = queue.Queue()
+        self.worker = None
         
         self.create_widgets()
+        
+        if journal is not None and journal.pending():
+            self.resume_interrupted()
     
     def create_widgets(self):
         """Створення елементів інтерфейсу"""
@@ -236,6 +118,18 @@ class SecureFileDeleterGUI:
         )
         browse_btn.pack(side=tk.RIGHT)
         
+        browse_dir_btn = tk.Button(
+            file_frame,
+            text="Вибрати папку",
+            command=self.browse_directory,
+            bg="#3498db",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            cursor="hand2",
+            padx=15
+        )
+        browse_dir_btn.pack(side=tk.RIGHT, padx=(0, 5))
+        
         # Інформація про алгоритм
         info_frame = tk.LabelFrame(main_frame, text="Алгоритм German VSITR", font=("Arial", 10, "bold"), padx=10, pady=10)
         info_frame.pack(fill=tk.X, pady=(0, 15))
@@ -275,8 +169,17 @@ class SecureFileDeleterGUI:
         )
         status_label.pack(anchor=tk.W)
         
+        self.eta_var = tk.StringVar(value="")
+        eta_label = tk.Label(
+            progress_frame,
+            textvariable=self.eta_var,
+            font=("Arial", 9),
+            fg="#7f8c8d"
+        )
+        eta_label.pack(anchor=tk.W)
+        
         # Кнопка видалення
-        delete_btn = tk.Button(
+        self.delete_btn = tk.Button(
             main_frame,
             text="БЕЗПЕЧНО ВИДАЛИТИ ФАЙЛ",
             command=self.delete_file,
@@ -287,7 +190,19 @@ class SecureFileDeleterGUI:
             padx=20,
             pady=10
         )
-        delete_btn.pack(pady=10)
+        self.delete_btn.pack(pady=10)
+        
+        self.free_space_btn = tk.Button(
+            main_frame,
+            text="Перезаписати вільне місце диска",
+            command=self.wipe_free_space,
+            bg="#7f8c8d",
+            fg="white",
+            font=("Arial", 10, "bold"),
+            cursor="hand2",
+            padx=15
+        )
+        self.free_space_btn.pack()
         
         # Попередження
         warning_label = tk.Label(
@@ -309,40 +224,270 @@ class SecureFileDeleterGUI:
             self.selected_file = filename
             self.file_path_var.set(filename)
             self.status_var.set(f"Вибрано файл: {os.path.basename(filename)}")
-            logging.info(f"Вибрано файл: {filename}")
+            logging.info("Вибрано файл: %s", filename)
+    
+    def browse_directory(self):
+        """Вибір каталогу для рекурсивного видалення"""
+        dirname = filedialog.askdirectory(title="Виберіть папку для безпечного видалення")
+        
+        if dirname:
+            self.selected_file = dirname
+            self.file_path_var.set(dirname)
+            self.status_var.set(f"Вибрано папку: {os.path.basename(dirname)}")
+            logging.info("Вибрано папку: %s", dirname)
+    
+    def update_tree_progress(self, progress):
+        """Оновлення прогресу видалення каталогу"""
+        self.progress_var.set(progress.percent)
+        self.status_var.set(
+            f"Видалено файлів: {progress.files_done}/{progress.files_seen} "
+            f"({progress.bytes_done / (1024 * 1024):.1f} MB)"
+        )
     
     def update_progress(self, value):
-        """Оновлення прогрес-бару"""
+        """Оновлення прогрес-бару та залишку часу (за оцінкою плану)"""
         self.progress_var.set(value)
-        self.root.update_idletasks()
+        if self.estimated_seconds is not None and value < 100:
+            self.eta_var.set(f"Залишилось ≈ {self.estimated_seconds * (100 - value) / 100:.0f} с")
+        else:
+            self.eta_var.set("")
     
     def update_status(self, message):
         """Оновлення статусу операції"""
         self.status_var.set(message)
-        self.root.update_idletasks()
+    
+    def run_in_background(self, task, on_success, on_error):
+        """
+        Виконати видалення у фоновому потоці
+        
+        task отримує callbacks (progress, status, tree), що лише кладуть події в чергу;
+        прогрес обмежується до PROGRESS_RATE_HZ, тож швидкість перезапису не залежить від GUI.
+        on_success/on_error викликаються в головному потоці Tk.
+        """
+        self.delete_btn.config(state=tk.DISABLED)
+        self.free_space_btn.config(state=tk.DISABLED)
+        self.on_success = on_success
+        self.on_error = on_error
+        
+        put = self.events.put
+        progress = ThrottledCallback(lambda value: put(('progress', value)), self.PROGRESS_RATE_HZ)
+        tree_progress = ThrottledCallback(lambda value: put(('tree', replace(value))), self.PROGRESS_RATE_HZ)
+        status = lambda message: put(('status', message))
+        
+        def worker():
+            try:
+                result = task(progress, status, tree_progress)
+            except Exception as e:
+                put(('error', e))
+            else:
+                put(('done', result))
+        
+        self.worker = threading.Thread(target=worker, daemon=True)
+        self.worker.start()
+        self.root.after(self.POLL_INTERVAL_MS, self.poll_events)
+    
+    def poll_events(self):
+        """Забрати всі накопичені події з черги та застосувати лише останній стан"""
+        last_progress = last_status = last_tree = None
+        finished = None
+        try:
+            while True:
+                kind, value = self.events.get_nowait()
+                if kind == 'progress':
+                    last_progress = value
+                elif kind == 'status':
+                    last_status = value
+                elif kind == 'tree':
+                    last_tree = value
+                else:
+                    finished = (kind, value)
+        except queue.Empty:
+            pass
+        
+        if last_progress is not None:
+            self.update_progress(last_progress)
+        if last_tree is not None:
+            self.update_tree_progress(last_tree)
+        if last_status is not None:
+            self.update_status(last_status)
+        
+        if finished is None:
+            self.root.after(self.POLL_INTERVAL_MS, self.poll_events)
+            return
+        
+        self.worker = None
+        self.delete_btn.config(state=tk.NORMAL)
+        self.free_space_btn.config(state=tk.NORMAL)
+        kind, value = finished
+        if kind == 'done':
+            self.on_success(value)
+        else:
+            self.on_error(value)
+    
+    def reset_selection(self, status_message):
+        """Скидання вибору після успішного видалення"""
+        self.selected_file = None
+        self.file_path_var.set("")
+        self.estimated_seconds = None
+        self.update_progress(0)
+        self.update_status(status_message)
+    
+    def resume_interrupted(self):
+        """Продовжити видалення, перервані попереднім запуском програми"""
+        self.update_status("Продовження перерваних видалень...")
+        
+        def task(progress, status, tree_progress):
+            return self.deleter.resume_pending(progress_callback=progress, status_callback=status)
+        
+        def on_success(results):
+            failed = [path for path, error in results if error is not None]
+            self.progress_var.set(0)
+            if failed:
+                messagebox.showerror(
+                    "Помилка",
+                    "Не вдалося завершити перервані видалення:\n" + "\n".join(failed)
+                )
+            self.update_status(f"Завершено перерваних видалень: {len(results) - len(failed)}. "
+                               f"Очікування вибору файлу...")
+        
+        def on_error(e):
+            self.progress_var.set(0)
+            self.update_status(f"Помилка: {str(e)}")
+        
+        self.run_in_background(task, on_success, on_error)
+    
+    def delete_directory(self):
+        """Видалення вибраного каталогу разом з усім вмістом"""
+        dir_path = self.selected_file
+        dir_name = os.path.basename(os.path.normpath(dir_path))
+        confirm = messagebox.askyesno(
+            "Підтвердження видалення",
+            f"Ви впевнені, що хочете НАЗАВЖДИ видалити папку з усім вмістом?\n\n"
+            f"Папка: {dir_name}\n\n"
+            f"Цю операцію НЕМОЖЛИВО скасувати!",
+            icon='warning'
+        )
+        
+        if not confirm:
+            return
+        
+        self.progress_var.set(0)
+        self.update_status("Початок безпечного видалення папки...")
+        
+        def task(progress, status, tree_progress):
+            return self.deleter.secure_delete_directory(
+                dir_path,
+                progress_callback=tree_progress,
+                status_callback=status
+            )
+        
+        def on_success(progress):
+            messagebox.showinfo(
+                "Успіх",
+                f"Папку '{dir_name}' успішно видалено!\n\n"
+                f"Файлів: {progress.files_done}, каталогів: {progress.dirs_removed}."
+            )
+            self.reset_selection("Папку успішно видалено. Очікування нового файлу...")
+        
+        def on_error(e):
+            messagebox.showerror("Помилка", f"Не вдалося видалити папку:\n{str(e)}")
+            self.progress_var.set(0)
+            self.update_status(f"Помилка: {str(e)}")
+        
+        self.run_in_background(task, on_success, on_error)
+    
+    def wipe_free_space(self):
+        """Перезапис вільного місця диска вибраної папки (залишків раніше видалених файлів)"""
+        if self.worker is not None:
+            return
+        
+        if self.selected_file and os.path.isdir(self.selected_file):
+            dir_path = self.selected_file
+        else:
+            dir_path = filedialog.askdirectory(title="Виберіть папку на диску для перезапису вільного місця")
+            if not dir_path:
+                return
+        
+        available = max(0, free_bytes(dir_path) - DEFAULT_RESERVE)
+        confirm = messagebox.askyesno(
+            "Підтвердження",
+            f"Перезаписати вільне місце диска, на якому розташована папка?\n\n"
+            f"Папка: {dir_path}\n"
+            f"Буде перезаписано: {available / (1024 ** 3):.1f} GB "
+            f"(вільними лишаться {DEFAULT_RESERVE // (1024 * 1024)} MB)\n\n"
+            f"Під час перезапису диск буде майже повністю заповнений.",
+            icon='warning'
+        )
+        
+        if not confirm:
+            return
+        
+        self.progress_var.set(0)
+        self.update_status("Початок перезапису вільного місця...")
+        
+        def task(progress, status, tree_progress):
+            megabyte = 1024 * 1024
+            free_progress = ThrottledCallback(lambda p: (
+                progress(p.percent),
+                status(f"Записано {p.bytes_done / megabyte:.0f} з {p.bytes_total / megabyte:.0f} MB")
+            ), self.PROGRESS_RATE_HZ)
+            return self.deleter.wipe_free_space(dir_path, progress_callback=free_progress)
+        
+        def on_success(progress):
+            messagebox.showinfo(
+                "Успіх",
+                f"Вільне місце перезаписано!\n\n"
+                f"Заповнено: {progress.bytes_allocated / (1024 ** 3):.1f} GB, "
+                f"файлів-заповнювачів: {progress.files_created}."
+            )
+            self.progress_var.set(0)
+            self.update_status("Вільне місце перезаписано. Очікування нового файлу...")
+        
+        def on_error(e):
+            messagebox.showerror("Помилка", f"Не вдалося перезаписати вільне місце:\n{str(e)}")
+            self.progress_var.set(0)
+            self.update_status(f"Помилка: {str(e)}")
+        
+        self.run_in_background(task, on_success, on_error)
     
     def delete_file(self):
         """Видалення вибраного файлу"""
+        if self.worker is not None:
+            return
+        
         if not self.selected_file:
             messagebox.showwarning("Попередження", "Будь ласка, виберіть файл для видалення!")
             return
         
-        if not os.path.exists(self.selected_file):
-            messagebox.showerror("Помилка", "Вибраний файл не існує!")
+        # Один lstat для всіх перевірок; план передається у secure_delete. Для одного файлу
+        # фізичний порядок не потрібен: FIEMAP (з FIEMAP_FLAG_SYNC) не блокує головний потік
+        plan = self.deleter.plan_batch([self.selected_file], physical=False)
+        
+        if plan.directories:
+            self.delete_directory()
+            return
+        
+        if not plan.files:
+            error = plan.errors[0][1]
+            if isinstance(error, FileNotFoundError):
+                messagebox.showerror("Помилка", "Вибраний файл не існує!")
+            else:
+                messagebox.showerror("Помилка", f"Не вдалося видалити файл:\n{error}")
             self.selected_file = None
             self.file_path_var.set("")
             return
         
         # Підтвердження видалення
+        planned = plan.files[0]
         file_name = os.path.basename(self.selected_file)
-        file_size = os.path.getsize(self.selected_file)
-        file_size_mb = file_size / (1024 * 1024)
+        file_size_mb = planned.size / (1024 * 1024)
         
         confirm = messagebox.askyesno(
             "Підтвердження видалення",
             f"Ви впевнені, що хочете НАЗАВЖДИ видалити файл?\n\n"
             f"Файл: {file_name}\n"
-            f"Розмір: {file_size_mb:.2f} MB\n\n"
+            f"Розмір: {file_size_mb:.2f} MB\n"
+            f"Орієнтовний час: {plan.estimated_seconds:.1f} с\n\n"
             f"Цю операцію НЕМОЖЛИВО скасувати!",
             icon='warning'
         )
@@ -351,17 +496,22 @@ class SecureFileDeleterGUI:
             return
         
         # Скидання прогресу
-        self.progress_var.set(0)
+        self.estimated_seconds = plan.estimated_seconds
+        self.update_progress(0)
         self.update_status("Початок безпечного видалення...")
         
-        try:
+        file_path = self.selected_file
+        
+        def task(progress, status, tree_progress):
             # Виконання безпечного видалення
-            self.deleter.secure_delete(
-                self.selected_file,
-                progress_callback=self.update_progress,
-                status_callback=self.update_status
+            return self.deleter.secure_delete(
+                file_path,
+                progress_callback=progress,
+                status_callback=status,
+                planned=planned
             )
-            
+        
+        def on_success(result):
             messagebox.showinfo(
                 "Успіх",
                 f"Файл '{file_name}' успішно видалено!\n\n"
@@ -369,22 +519,27 @@ class SecureFileDeleterGUI:
             )
             
             # Скидання вибору
-            self.selected_file = None
-            self.file_path_var.set("")
-            self.progress_var.set(0)
-            self.update_status("Файл успішно видалено. Очікування нового файлу...")
-            
-        except Exception as e:
+            self.reset_selection("Файл успішно видалено. Очікування нового файлу...")
+        
+        def on_error(e):
             messagebox.showerror("Помилка", f"Не вдалося видалити файл:\n{str(e)}")
-            self.progress_var.set(0)
+            self.estimated_seconds = None
+            self.update_progress(0)
             self.update_status(f"Помилка: {str(e)}")
+        
+        self.run_in_background(task, on_success, on_error)
 
 
 def main():
     """Головна функція програми"""
+    configure_text_log()
+    audit_logger = AuditLogger(text_log=True)
     root = tk.Tk()
-    app = SecureFileDeleterGUI(root)
-    root.mainloop()
+    app = SecureFileDeleterGUI(root, audit_logger, WipeJournal(), CalibrationCache())
+    try:
+        root.mainloop()
+    finally:
+        audit_logger.close()
 
 
 if __name__ == "__main__":
@@ -1,81 +1,423 @@
-import socket
+import argparse
+import asyncio
 import os
 import random
 import string
 import stat
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from batch_planner import estimate_seconds
+from calibration import CalibrationCache, default_cache_path
+from dir_batch import DirectoryBatch
+from io_scheduler import DeviceScheduler
+from journal import WipeJournal
+from metrics import ServerMetrics
+from protocol import ProtocolError, read_message, write_message
+from wipe_engine import FILE_DURABILITY_POLICIES, WipeEngine, WipeReport
+from wipe_plans import DEFAULT_PLAN, PLANS, get_plan
+
+# Fixed per-job buffer memory, independent of file size
+JOB_MEMORY_BUDGET = 4 * 1024 * 1024
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+BUSY_RESPONSE = "Server busy: job queue is full, try again later"
+SUCCESS_RESPONSE = "File securely deleted"
 
 def generate_random_name(length=10):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
 
-def overwrite_file(file_path, pattern, passes=7):
+def pattern_passes(pattern, passes=1):
+    data_byte = None if pattern == 'random' else bytes([pattern])
+    return [(str(pattern), data_byte)] * passes
+
+def overwrite_file(file_path, pattern, passes=7, progress_callback=None):
     if not os.path.exists(file_path):
         return False
     try:
-        with open(file_path, 'wb') as f:
-            file_size = os.path.getsize(file_path)
-            for _ in range(passes):
-                if pattern == 'random':
-                    data = bytes(random.getrandbits(8) for _ in range(file_size))
-                else:
-                    data = bytes([pattern]) * file_size
-                f.seek(0)
-                f.write(data)
-                f.flush()
+        engine = WipeEngine.for_memory_budget(pattern_passes(pattern, passes), JOB_MEMORY_BUDGET)
+        engine.run(file_path, progress_callback=progress_callback)
         return True
     except Exception as e:
         print(f"Error overwriting file: {e}")
         return False
 
-def secure_delete(file_path, rename_count=5):
+# Compiled engines are shared by all jobs: pattern buffers are built once per plan
+_compiled_plans = {}
+
+def get_engine(plan=DEFAULT_PLAN, durability='fsync', direct_io=False):
+    key = (plan, durability, direct_io)
+    if key not in _compiled_plans:
+        _compiled_plans[key] = get_plan(plan).compile(memory_budget=JOB_MEMORY_BUDGET,
+                                                      durability=durability, direct_io=direct_io)
+    return _compiled_plans[key]
+
+# One calibration cache per cache file and worker process
+_calibration_caches = {}
+
+def get_tuning(file_path, calibration_path):
+    # Cached calibration of the file's filesystem; the first job on a filesystem runs the probes
+    if calibration_path is None:
+        return None
+    if calibration_path not in _calibration_caches:
+        _calibration_caches[calibration_path] = CalibrationCache(calibration_path)
+    return _calibration_caches[calibration_path].get(os.path.dirname(os.path.abspath(file_path)))
+
+def secure_delete(file_path, rename_count=5, progress_callback=None, pass_callback=None,
+                  plan=DEFAULT_PLAN, durability='fsync', journal_dir=None, journal_entry=None,
+                  timings=None, calibration_path=None, throttle=None):
+    # timings (optional dict) receives per-phase durations: chmod, passes [(seconds, bytes)],
+    # fsync, rename, unlink and failed_phase; the write loop itself is never instrumented.
+    # With calibration_path the engine uses the filesystem's cached direct I/O choice (chunk
+    # size stays bounded by JOB_MEMORY_BUDGET) and progress_callback also gets an ETA in seconds.
+    # throttle (optional) is charged with the byte count before each write
+    if timings is None:
+        timings = {}
     if not os.path.exists(file_path):
+        timings['failed_phase'] = 'stat'
         return "File does not exist"
+    if not os.path.isfile(file_path):
+        timings['failed_phase'] = 'stat'
+        return "Not a regular file"
     
     # Make file writable if read-only
+    started = time.perf_counter()
     try:
         os.chmod(file_path, stat.S_IWRITE)
     except:
         pass
+    timings['chmod'] = time.perf_counter() - started
     
-    # Overwrite with German VSITR patterns
-    patterns = [0x00, 0xFF, 0x00, 0xFF, 0x00, 0xFF, 'random']
-    for i, pattern in enumerate(patterns):
-        if not overwrite_file(file_path, pattern):
-            return f"Failed at overwrite pass {i+1}"
+    # Journal the job so it can be resumed after a crash (journal_entry is an interrupted job)
+    journal = WipeJournal(journal_dir) if journal_dir else None
+    entry = journal_entry
+    if journal and entry is None:
+        entry = journal.begin(file_path, plan)
+
+    def fail(phase, message):
+        # A failed job is dropped from the journal; only a killed server leaves it to be resumed
+        timings['failed_phase'] = phase
+        if entry is not None:
+            journal.finish(entry)
+        return message
     
-    # Rename multiple times
-    dir_path = os.path.dirname(file_path)
-    base_name = os.path.basename(file_path)
-    for _ in range(rename_count):
-        new_name = generate_random_name()
-        new_path = os.path.join(dir_path, new_name)
+    # Overwrite using the shared wipe plan (German VSITR by default)
+    current_pass = [0]
+    def on_pass(pass_num, total, name):
+        current_pass[0] = pass_num
+        if pass_callback:
+            pass_callback(pass_num, total, name)
+    if entry is None or entry.stage == 'overwrite':
+        tuning = None
         try:
-            os.rename(file_path, new_path)
-            file_path = new_path
+            tuning = get_tuning(file_path, calibration_path)
+        except OSError as e:
+            print(f"Calibration failed, using defaults: {e}")
+        engine = get_engine(plan, durability, tuning.direct_io if tuning else False)
+        on_progress = progress_callback
+        if tuning is not None and progress_callback is not None:
+            estimated = estimate_seconds(os.path.getsize(file_path), 1, len(engine.passes),
+                                         **tuning.estimate_kwargs())
+            def on_progress(percent):
+                progress_callback(percent, estimated * (100 - percent) / 100)
+        kwargs = {}
+        if entry is not None:
+            kwargs = {'resume': (entry.pass_index, entry.offset),
+                      'checkpoint': partial(journal.checkpoint, entry),
+                      'checkpoint_interval': journal.checkpoint_interval}
+        report = WipeReport(path=file_path, size=None)
+        try:
+            engine.run(file_path, progress_callback=on_progress, pass_callback=on_pass,
+                       report=report, throttle=throttle, **kwargs)
         except Exception as e:
-            return f"Failed to rename: {e}"
+            return fail('overwrite', f"Failed at overwrite pass {current_pass[0]}: {e}")
+        finally:
+            timings['passes'] = list(zip(report.pass_durations, report.pass_bytes))
+            timings['fsync'] = list(report.sync_durations)
     
-    # Delete the file
-    try:
-        os.remove(file_path)
-        return "File securely deleted"
-    except Exception as e:
-        return f"Failed to delete: {e}"
-
-def start_server(host='localhost', port=12345):
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind((host, port))
-        s.listen()
-        print(f"Server listening on {host}:{port}")
-        while True:
-            conn, addr = s.accept()
-            with conn:
-                print(f"Connected by {addr}")
-                data = conn.recv(1024)
-                if not data:
+    # Rename multiple times and delete relative to one directory fd; the directory
+    # is synced once for the whole job, and only then is the journal entry dropped
+    with DirectoryBatch() as directories:
+        dir_path = os.path.dirname(os.path.abspath(file_path))
+        if entry is not None and entry.renames:
+            # Resumed job: continue the journaled name chain
+            chain = [entry.path] + entry.renames
+            names = [os.path.basename(p) for p in chain[chain.index(os.path.abspath(file_path)) + 1:]]
+        else:
+            # The whole chain is journaled in one save before the first rename
+            names = [generate_random_name() for _ in range(rename_count)]
+            if entry is not None:
+                try:
+                    journal.record_renames(entry, [os.path.join(dir_path, name) for name in names])
+                except Exception as e:
+                    return fail('rename', f"Failed to rename: {e}")
+        rename_times = timings['rename'] = []
+        for new_name in names:
+            started = time.perf_counter()
+            try:
+                file_path = directories.rename(file_path, new_name)
+            except Exception as e:
+                return fail('rename', f"Failed to rename: {e}")
+            rename_times.append(time.perf_counter() - started)
+        
+        # Delete the file
+        started = time.perf_counter()
+        try:
+            directories.unlink(file_path)
+            timings['unlink'] = time.perf_counter() - started
+        except Exception as e:
+            return fail('unlink', f"Failed to delete: {e}")
+        
+        started = time.perf_counter()
+        try:
+            directories.sync()
+        except Exception as e:
+            return fail('fsync', f"Failed to sync directory: {e}")
+        timings.setdefault('fsync', []).append(time.perf_counter() - started)
+    if entry is not None:
+        journal.finish(entry)
+    return SUCCESS_RESPONSE
+
+def timed_secure_delete(file_path, **kwargs):
+    # Runs in the worker; timings travel back with the result so metrics work with processes too
+    timings = {}
+    return secure_delete(file_path, timings=timings, **kwargs), timings
+
+class DeletionServer:
+    """Asyncio server: connections are handled on the event loop, disk work on a worker pool"""
+
+    def __init__(self, host='localhost', port=12345, workers=DEFAULT_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, use_processes=False,
+                 plan=DEFAULT_PLAN, durability='fsync', journal_dir=None, metrics_port=None,
+                 calibration_path=None, device_workers=None, device_bandwidth=None):
+        get_plan(plan)
+        # Jobs are wiped one file at a time, so the group-wide 'batch' policy does not apply
+        if durability not in FILE_DURABILITY_POLICIES:
+            raise ValueError(f"Unsupported durability policy for the server: {durability}")
+        # The bandwidth throttle lives in this process and cannot follow a job into a worker process
+        if use_processes and device_bandwidth:
+            raise ValueError("Per-device bandwidth limits need the thread pool")
+        self.plan = plan
+        self.durability = durability
+        self.journal_dir = journal_dir
+        self.calibration_path = calibration_path
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.next_job_id = 0
+        self.use_processes = use_processes
+        pool_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = pool_class(max_workers=workers)
+        # Jobs first wait for a slot of their device (st_dev), then run on the shared pool
+        self.scheduler = DeviceScheduler(None, concurrency=device_workers or workers,
+                                         bandwidth=device_bandwidth)
+        self.metrics_port = metrics_port
+        self.metrics = ServerMetrics(in_flight=lambda: self.pending, devices=self.scheduler.stats)
+
+    async def submit(self, func, file_path, device=None, **kwargs):
+        if device is None:
+            try:
+                device = (await asyncio.to_thread(os.stat, file_path)).st_dev
+            except OSError:
+                pass  # the job itself reports the missing file
+        future = self.scheduler.submit_call(device, self.run_pooled, func, file_path, **kwargs)
+        return await asyncio.wrap_future(future)
+
+    def run_pooled(self, func, *args, throttle=None, **kwargs):
+        # Runs on a device queue thread and holds its slot until the pool finishes the job.
+        # func is timed_secure_delete; a worker process reports its bytes to the device afterwards
+        if not self.use_processes:
+            return self.executor.submit(partial(func, *args, throttle=throttle, **kwargs)).result()
+        result, timings = self.executor.submit(partial(func, *args, **kwargs)).result()
+        throttle(sum(size for _, size in timings.get('passes', ())))
+        return result, timings
+
+    async def feed(self, jobs, run):
+        # A batch holds at most `workers` pool slots and feeds its jobs into them as they free up,
+        # so a large batch is never rejected part-way. pending counts the held slots, i.e. the
+        # queued and running jobs; the slots are taken at admission, before any job starts.
+        slots = min(self.workers, len(jobs))
+        self.pending += slots
+        remaining = iter(jobs)
+
+        async def feeder():
+            for job in remaining:
+                await run(*job)
+
+        try:
+            await asyncio.gather(*(feeder() for _ in range(slots)))
+        finally:
+            self.pending -= slots
+
+    async def run_job(self, job_id, file_path, send, plan):
+        loop = asyncio.get_running_loop()
+        kwargs = {'plan': plan, 'durability': self.durability, 'journal_dir': self.journal_dir,
+                  'calibration_path': self.calibration_path}
+        if not self.use_processes:
+            # Callbacks fire on a worker thread; hand events over to the event loop.
+            # Progress is sent only when the whole percent changes.
+            last_percent = [-1]
+
+            def on_progress(percent, eta=None):
+                if int(percent) != last_percent[0]:
+                    last_percent[0] = int(percent)
+                    message = {'type': 'progress', 'job': job_id, 'percent': round(percent, 1)}
+                    if eta is not None:
+                        message['eta'] = round(eta, 1)
+                    loop.call_soon_threadsafe(send, message)
+
+            def on_pass(pass_num, total, name):
+                loop.call_soon_threadsafe(send, {'type': 'pass', 'job': job_id, 'pass': pass_num,
+                                                 'total': total, 'name': name})
+
+            kwargs.update(progress_callback=on_progress, pass_callback=on_pass)
+        result = await self.submit_timed(file_path, **kwargs)
+        send({'type': 'result', 'job': job_id, 'path': file_path,
+              'ok': result == SUCCESS_RESPONSE, 'message': result})
+
+    async def submit_timed(self, file_path, device=None, **kwargs):
+        # Run secure_delete on the pool and record its phase timings
+        started = time.perf_counter()
+        try:
+            outcome = await self.submit(timed_secure_delete, file_path, device, **kwargs)
+        except Exception as e:
+            outcome = (f"Failed: {e}", {'failed_phase': 'worker'})
+        result, timings = outcome
+        self.metrics.record_job(result == SUCCESS_RESPONSE, timings, time.perf_counter() - started)
+        return result
+
+    async def run_request(self, message, send):
+        paths = message.get('paths')
+        if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+            send({'type': 'error', 'id': message.get('id'), 'message': "'paths' must be a list of strings"})
+            return
+        plan = message.get('plan', self.plan)
+        if plan not in PLANS:
+            send({'type': 'error', 'id': message.get('id'), 'message': f"Unknown wipe plan: {plan}"})
+            return
+        # Overload is checked once per request: an admitted batch runs in full, a rejected one not at all
+        if self.pending >= self.max_pending:
+            self.metrics.rejected.inc()
+            send({'type': 'error', 'id': message.get('id'), 'message': BUSY_RESPONSE})
+            return
+        jobs = []
+        for path in paths:
+            self.next_job_id += 1
+            jobs.append((self.next_job_id, path))
+        send({'type': 'accepted', 'id': message.get('id'),
+              'jobs': [{'job': job_id, 'path': path} for job_id, path in jobs]})
+        await self.feed(jobs, lambda job_id, path: self.run_job(job_id, path, send, plan))
+        send({'type': 'done', 'id': message.get('id')})
+
+    async def handle_client(self, reader, writer):
+        addr = writer.get_extra_info('peername')
+        print(f"Connected by {addr}")
+        tasks = set()
+
+        def send(message):
+            if not writer.is_closing():
+                write_message(writer, message)
+
+        try:
+            while True:
+                message = await read_message(reader)
+                if message is None:
                     break
-                file_path = data.decode('utf-8')
-                result = secure_delete(file_path)
-                conn.sendall(result.encode('utf-8'))
+                if message['type'] != 'delete':
+                    send({'type': 'error', 'message': f"Unknown message type: {message['type']}"})
+                    continue
+                # Requests on one connection run concurrently; reading never waits on disk I/O
+                task = asyncio.ensure_future(self.run_request(message, send))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                await writer.drain()
+            if tasks:
+                await asyncio.gather(*tasks)
+                await writer.drain()
+        except (ConnectionError, ProtocolError) as e:
+            print(f"Connection error from {addr}: {e}")
+        finally:
+            writer.close()
+
+    async def resume_job(self, journal, entry):
+        file_path = entry.current_path()
+        if file_path is None:
+            # Already removed before the journal was updated, or replaced by another file
+            journal.finish(entry)
+            return
+        print(f"Resuming interrupted job: {entry.path} (pass {entry.pass_index + 1}, offset {entry.offset})")
+        result = await self.submit_timed(file_path, entry.device, plan=entry.plan, durability=self.durability,
+                                         journal_dir=self.journal_dir, journal_entry=entry,
+                                         calibration_path=self.calibration_path)
+        print(f"Resumed job {entry.path}: {result}")
+
+    async def serve_forever(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"Server listening on {self.host}:{self.port}")
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = await self.metrics.start_http(port=self.metrics_port)
+        resumed = []
+        if self.journal_dir:
+            journal = WipeJournal(self.journal_dir)
+            entries = [(entry,) for entry in journal.pending()]
+            if entries:
+                resumed = [asyncio.ensure_future(self.feed(entries, partial(self.resume_job, journal)))]
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in resumed:
+                task.cancel()
+            if metrics_server is not None:
+                metrics_server.close()
+            self.scheduler.shutdown(wait=True)
+            self.executor.shutdown(wait=True)
+
+def start_server(host='localhost', port=12345, workers=DEFAULT_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, use_processes=False,
+                 plan=DEFAULT_PLAN, durability='fsync', journal_dir=None, metrics_port=None,
+                 calibration_path=None, device_workers=None, device_bandwidth=None):
+    server = DeletionServer(host, port, workers, max_pending, use_processes, plan, durability,
+                            journal_dir, metrics_port, calibration_path, device_workers,
+                            device_bandwidth)
+    asyncio.run(server.serve_forever())
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Secure deletion server")
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=12345)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Number of disk workers")
+    parser.add_argument('--device-workers', type=int,
+                        help="Maximum concurrent jobs per device (default: --workers)")
+    parser.add_argument('--device-bandwidth', type=float, metavar='MB',
+                        help="Write bandwidth cap per device in MB/s (thread pool only)")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help="Maximum queued and running jobs before new requests are rejected")
+    parser.add_argument('--processes', action='store_true',
+                        help="Use a process pool instead of a thread pool")
+    parser.add_argument('--plan', choices=sorted(PLANS), default=DEFAULT_PLAN,
+                        help="Default wipe plan (clients may override it per request)")
+    parser.add_argument('--durability', choices=FILE_DURABILITY_POLICIES, default='fsync',
+                        help="Sync policy after each pass")
+    parser.add_argument('--journal', metavar='DIR',
+                        help="Journal directory; interrupted jobs are resumed at startup")
+    parser.add_argument('--metrics-port', type=int,
+                        help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    parser.add_argument('--autotune', nargs='?', const=default_cache_path(), metavar='CACHE',
+                        dest='calibration_path',
+                        help="Calibrate each filesystem once (results cached in CACHE) to pick "
+                             "direct I/O and report ETAs in progress messages")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    start_server()
\ No newline at end of file
+    args = parse_args()
+    start_server(args.host, args.port, args.workers, args.max_pending, args.processes,
+                 args.plan, args.durability, args.journal, args.metrics_port,
+                 args.calibration_path, args.device_workers,
+                 args.device_bandwidth * 1024 * 1024 if args.device_bandwidth else None)
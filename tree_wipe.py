@@ -0,0 +1,231 @@
+"""
+Tree Wipe - рекурсивне безпечне видалення каталогу
+Обхід os.scandir як потоковий генератор, перезапис файлів у пулі потоків,
+видалення спорожнілих каталогів знизу вгору; перейменування та видалення
+виконуються через дескриптори каталогів з однією синхронізацією на каталог
+"""
+
+import os
+import queue
+import stat
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from batch_planner import PlannedFile
+from dir_batch import DirectoryBatch
+
+
+DEFAULT_TREE_WORKERS = 4
+
+# Кількість файлів в одному груповому записі журналу (якщо видаляч веде журнал)
+JOURNAL_BATCH_FILES = 256
+
+
+@dataclass
+class TreeProgress:
+    """Сукупний прогрес видалення дерева (загальні значення ростуть під час обходу)"""
+    files_seen: int = 0
+    bytes_seen: int = 0
+    files_done: int = 0
+    bytes_done: int = 0
+    files_failed: int = 0
+    dirs_removed: int = 0
+    walk_finished: bool = False
+
+    @property
+    def percent(self):
+        if self.bytes_seen:
+            return self.bytes_done / self.bytes_seen * 100
+        return 100.0 if self.walk_finished else 0.0
+
+
+def iter_tree(root):
+    """
+    Обійти дерево каталогів без побудови повного списку файлів
+
+    Генерує кортежі (подія, шлях, розмір, батьківський каталог):
+    ('enter', ...) при вході в підкаталог, ('file', ...) для кожного файлу,
+    ('link', ...) для символічних посилань (не розіменовуються, розмір 0)
+    та ('exit', ...) після того, як увесь вміст каталогу перелічено.
+    """
+    stack = [(root, os.scandir(root))]
+    try:
+        while stack:
+            dirpath, iterator = stack[-1]
+            entry = next(iterator, None)
+            if entry is None:
+                iterator.close()
+                stack.pop()
+                parent = stack[-1][0] if stack else None
+                yield ('exit', dirpath, None, parent)
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                yield ('enter', entry.path, None, dirpath)
+                stack.append((entry.path, os.scandir(entry.path)))
+            elif entry.is_symlink():
+                yield ('link', entry.path, 0, dirpath)
+            else:
+                yield ('file', entry.path, entry.stat(follow_symlinks=False).st_size, dirpath)
+    finally:
+        for _, iterator in stack:
+            iterator.close()
+
+
+class TreeWipe:
+    """
+    Видалення дерева каталогу через пул потоків
+
+    Якщо видаляч веде журнал, файли передаються в пул частинами по JOURNAL_BATCH_FILES,
+    кожна з одним груповим записом журналу (deleter.journal_batch).
+
+    Args:
+        deleter: SecureFileDeleter, що виконує видалення окремих файлів
+        workers: Кількість паралельних потоків перезапису
+        progress_callback: Функція, що отримує TreeProgress після кожного файлу
+        remove_root: Видалити також кореневий каталог
+    """
+
+    def __init__(self, deleter, workers=DEFAULT_TREE_WORKERS, progress_callback=None,
+                 remove_root=True):
+        self.deleter = deleter
+        self.workers = max(1, workers)
+        self.progress_callback = progress_callback
+        self.remove_root = remove_root
+        self.progress = TreeProgress()
+        self.errors = []
+        # Кількість незавершених дочірніх елементів кожного каталогу
+        # (облік ведеться лише в потоці, що викликав run())
+        self._pending = {}
+        self._parents = {}
+        self._enumerated = set()
+        # Завершені завдання надходять у чергу: очікування не перебирає всі завдання в польоті
+        self._done = queue.SimpleQueue()
+        self.directories = None
+
+    def _wipe_one(self, kind, path, planned=None, entry=None):
+        if kind == 'link':
+            self.directories.unlink(path)
+        else:
+            self.deleter.secure_delete(path, directories=self.directories, planned=planned,
+                                       journal_entry=entry)
+
+    def _submit(self, executor, futures, kind, path, size, parent, *args):
+        future = executor.submit(self._wipe_one, kind, path, *args)
+        futures[future] = (path, size, parent)
+        future.add_done_callback(self._done.put)
+
+    def _submit_journaled(self, executor, futures, files):
+        """Записати частину файлів у журнал одним груповим записом і передати їх у пул"""
+        planned = {}
+        for path, _, _ in files:
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue  # помилку повідомить secure_delete
+            if stat.S_ISREG(st.st_mode):
+                planned[path] = PlannedFile(path, st.st_size, st.st_mode, st.st_dev, st.st_ino)
+        entries = self.deleter.journal_batch(list(planned.values()))
+        for path, size, parent in files:
+            self._submit(executor, futures, 'file', path, size, parent, planned.get(path),
+                         entries.get(path))
+        files.clear()
+
+    def _child_finished(self, dirpath):
+        """Зменшити лічильник каталогу та видалити його, якщо він спорожнів"""
+        while dirpath is not None:
+            self._pending[dirpath] -= 1
+            if self._pending[dirpath] or dirpath not in self._enumerated:
+                return
+            del self._pending[dirpath]
+            self._enumerated.discard(dirpath)
+            parent = self._parents.pop(dirpath)
+            if parent is None and not self.remove_root:
+                return
+            try:
+                self.directories.rmdir(dirpath)
+            except OSError as e:
+                self.errors.append((dirpath, e))
+                return
+            self.progress.dirs_removed += 1
+            dirpath = parent
+
+    def _report(self):
+        if self.progress_callback:
+            self.progress_callback(self.progress)
+
+    def _collect(self, futures):
+        """Дочекатися завершення хоча б одного завдання та обробити всі завершені"""
+        done = [self._done.get()]
+        while True:
+            try:
+                done.append(self._done.get_nowait())
+            except queue.Empty:
+                break
+        for future in done:
+            path, size, parent = futures.pop(future)
+            error = future.exception()
+            if error is None:
+                self.progress.files_done += 1
+                self.progress.bytes_done += size
+                self._child_finished(parent)
+            else:
+                self.progress.files_failed += 1
+                self.errors.append((path, error))
+            self._report()
+
+    def run(self, root):
+        """
+        Видалити всі файли дерева root
+
+        Returns:
+            TreeProgress з підсумком; помилки окремих файлів доступні в self.errors
+        """
+        root = os.fspath(root)
+        self._pending[root] = 0
+        self._parents[root] = None
+        futures = {}
+        # Кількість завдань у черзі обмежена, тож пам'ять не залежить від розміру дерева;
+        # з журналом у черзі лишається ціла частина, поки збирається наступна
+        max_in_flight = self.workers * 2
+        journaled = []
+        if self.deleter.journal is not None:
+            max_in_flight += JOURNAL_BATCH_FILES
+        self.directories = DirectoryBatch()
+
+        with self.directories, ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for kind, path, size, parent in iter_tree(root):
+                if kind == 'enter':
+                    self._pending[path] = 0
+                    self._parents[path] = parent
+                    self._pending[parent] += 1
+                    continue
+                if kind == 'exit':
+                    self._enumerated.add(path)
+                    # Фіктивний дочірній елемент: перевірити каталог після завершення обходу
+                    self._pending[path] += 1
+                    self._child_finished(path)
+                    continue
+
+                self._pending[parent] += 1
+                self.progress.files_seen += 1
+                self.progress.bytes_seen += size
+
+                if kind == 'file' and self.deleter.journal is not None:
+                    journaled.append((path, size, parent))
+                    if len(journaled) < JOURNAL_BATCH_FILES:
+                        continue
+                    self._submit_journaled(executor, futures, journaled)
+                else:
+                    self._submit(executor, futures, kind, path, size, parent)
+                while len(futures) >= max_in_flight:
+                    self._collect(futures)
+
+            if journaled:
+                self._submit_journaled(executor, futures, journaled)
+            self.progress.walk_finished = True
+            while futures:
+                self._collect(futures)
+
+        self._report()
+        return self.progress
@@ -0,0 +1,807 @@
+"""
+Wipe Engine - багатопрохідний перезапис файлу через один відкритий дескриптор
+Буфери шаблонів виділяються один раз на завдання, запис - os.pwrite зі зрізів memoryview
+"""
+
+import errno
+import math
+import mmap
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from extents import allocated_ranges
+from fallocate import is_zero_pattern, punch_holes, zero_ranges
+from keystream import make_keystream
+
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # 4 MiB
+
+# Розмір блоку для вибіркової перевірки та кількість блоків за замовчуванням
+VERIFY_SAMPLE_BLOCK = 64 * 1024
+DEFAULT_VERIFY_SAMPLES = 64
+
+# Вирівнювання буферів, зміщень та довжин для O_DIRECT
+DIRECT_IO_ALIGNMENT = max(mmap.PAGESIZE, 4096)
+
+# Політики збереження даних після кожного проходу:
+# fsync - дані та метадані, fdatasync - лише дані,
+# batch - синхронізація (fdatasync) усіх файлів групи наприкінці проходу (run_batch)
+DURABILITY_POLICIES = ('fsync', 'fdatasync', 'batch')
+
+# Політики для почергового видалення окремих файлів (WipeEngine.run): 'batch' діє лише в run_batch
+FILE_DURABILITY_POLICIES = ('fsync', 'fdatasync')
+
+# Максимальна кількість одночасно відкритих файлів у run_batch
+BATCH_MAX_OPEN = 256
+
+# Кількість буферів конвеєра випадкового проходу: один генерується, поки інший записується
+PIPELINE_BUFFERS = 2
+
+# Період контрольних точок усередині проходу: одна синхронізація файлу та один атомарний
+# запис журналу раз на кілька секунд - значно менше 1% часу перезапису
+DEFAULT_CHECKPOINT_INTERVAL = 5.0
+
+
+def repeat_pattern(pattern, size, phase=0):
+    """Повторити багатобайтовий шаблон до size байтів, починаючи з позиції phase у шаблоні"""
+    phase %= len(pattern)
+    repeats = -(-(size + phase) // len(pattern))
+    return (pattern * repeats)[phase:phase + size]
+
+
+def split_ranges(ranges, parts, multiple=1):
+    """
+    Розділити діапазони на parts суміжних частин приблизно однакового обсягу
+
+    Обсяг кожної частини (крім останньої) кратний multiple.
+    """
+    total = sum(length for _, length in ranges)
+    share = max(multiple, _round_up(-(-total // parts), multiple))
+    result = []
+    current = []
+    room = share
+    for start, length in ranges:
+        while length > 0:
+            take = min(length, room)
+            current.append((start, take))
+            start += take
+            length -= take
+            room -= take
+            if room == 0:
+                result.append(current)
+                current = []
+                room = share
+    if current:
+        result.append(current)
+    return result
+
+
+def _round_up(value, multiple):
+    return -(-value // multiple) * multiple
+
+
+def pwrite_all(fd, data, offset):
+    """
+    Записати весь буфер за зміщенням offset, обробляючи часткові записи
+
+    Повертає кількість системних викликів запису.
+    """
+    view = memoryview(data)
+    calls = 0
+    while view:
+        if hasattr(os, 'pwrite'):
+            written = os.pwrite(fd, view, offset)
+        else:  # Windows: os.pwrite недоступний
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        calls += 1
+        view = view[written:]
+        offset += written
+    return calls
+
+
+class VerificationError(Exception):
+    """Вміст файлу після останнього проходу не збігається з очікуваним"""
+
+
+@dataclass
+class WipeReport:
+    """Підсумок виконання завдання перезапису"""
+    path: str
+    size: int
+    passes: list = field(default_factory=list)
+    pass_durations: list = field(default_factory=list)
+    pass_bytes: list = field(default_factory=list)
+    bytes_written: int = 0
+    write_calls: int = 0
+    sync_calls: int = 0
+    sync_durations: list = field(default_factory=list)
+    buffers_allocated: int = 0
+    direct_io: bool = False
+    allocated_bytes: int = None
+    bytes_skipped: int = 0
+    offloaded_bytes: int = 0
+    deallocated: bool = False
+    resumed_from: tuple = None
+    verify_mode: str = None
+    verified_bytes: int = 0
+    verify_duration: float = 0.0
+
+    @property
+    def verify_throughput(self):
+        """Швидкість перевірки в MB/s"""
+        if not self.verify_duration:
+            return 0.0
+        return self.verified_bytes / (1024 * 1024) / self.verify_duration
+
+
+class FileTarget:
+    """
+    Відкритий файл для перезапису з необов'язковим обходом кешу сторінок (O_DIRECT)
+
+    Вирівняні частини записуються через дескриптор з O_DIRECT, невирівняний хвіст -
+    через звичайний дескриптор. Якщо файлова система відхиляє O_DIRECT (наприклад,
+    tmpfs), ціль прозоро переходить на буферизований запис.
+    """
+
+    def __init__(self, filepath, direct_io=False):
+        self.filepath = filepath
+        self.direct = False
+        self._buffered_fd = None
+        self._direct_fd = None
+        self.fd = None
+
+        if direct_io and hasattr(os, 'O_DIRECT'):
+            try:
+                self.fd = self._direct_fd = os.open(filepath, os.O_RDWR | os.O_DIRECT)
+                self.direct = True
+            except OSError as e:
+                if e.errno != errno.EINVAL:
+                    raise
+        if self.fd is None:
+            self.fd = self.buffered_fd()
+
+    def buffered_fd(self):
+        """Дескриптор без O_DIRECT (відкривається за потреби)"""
+        if self._buffered_fd is None:
+            self._buffered_fd = os.open(self.filepath, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        return self._buffered_fd
+
+    def _fallback_to_buffered(self):
+        """
+        Відмовитися від O_DIRECT після помилки EINVAL на записі
+
+        Дескриптор O_DIRECT закривається лише в close(): інші потоки паралельного
+        проходу можуть ще виконувати запис через нього.
+        """
+        self.direct = False
+        self.fd = self.buffered_fd()
+
+    def write(self, data, offset):
+        """Записати буфер за зміщенням offset; повертає кількість викликів запису"""
+        if not self.direct:
+            return pwrite_all(self.fd, data, offset)
+
+        view = memoryview(data)
+        aligned = len(view) - len(view) % DIRECT_IO_ALIGNMENT
+        calls = 0
+        if aligned and offset % DIRECT_IO_ALIGNMENT == 0:
+            try:
+                calls += pwrite_all(self.fd, view[:aligned], offset)
+            except OSError as e:
+                if e.errno != errno.EINVAL:
+                    raise
+                self._fallback_to_buffered()
+                return calls + pwrite_all(self.fd, view, offset)
+            view = view[aligned:]
+            offset += aligned
+        if view:
+            calls += pwrite_all(self.buffered_fd(), view, offset)
+        return calls
+
+    def sync(self, durability='fsync'):
+        """Скинути дані на диск; повертає кількість викликів синхронізації"""
+        if durability in ('fdatasync', 'batch') and hasattr(os, 'fdatasync'):
+            sync = os.fdatasync
+        else:
+            sync = os.fsync
+        sync(self.fd)
+        if self._buffered_fd is not None and self._buffered_fd != self.fd:
+            sync(self._buffered_fd)
+            return 2
+        return 1
+
+    def close(self):
+        if self._direct_fd is not None:
+            os.close(self._direct_fd)
+        if self._buffered_fd is not None:
+            os.close(self._buffered_fd)
+
+
+class WipeEngine:
+    """
+    Рушій перезапису: відкриває файл один раз і виконує всі проходи таблиці passes
+
+    Args:
+        passes: Список (назва, байт шаблону або None для псевдовипадкових даних)
+        chunk_size: Розмір буфера запису в байтах
+        keystream_mode: Режим джерела псевдовипадкових даних ('prng' або 'csprng')
+        direct_io: Писати в обхід кешу сторінок (O_DIRECT), якщо ФС це підтримує
+        throttle: Функція, що викликається з кількістю байтів перед кожним записом
+            (може блокувати, обмежуючи пропускну здатність)
+        verify: Перевірка останнього проходу: None, 'full' (весь файл)
+            або 'sample' (verify_samples випадкових блоків)
+        verify_samples: Кількість блоків для вибіркової перевірки
+        durability: Політика синхронізації після проходу (див. DURABILITY_POLICIES)
+        sparse: Перезаписувати лише розміщені діапазони (діри розріджених файлів пропускаються)
+        offload_zero: Виконувати проходи нулями через fallocate(FALLOC_FL_ZERO_RANGE), якщо ФС
+            це підтримує (інакше - звичайний запис). Деякі ФС лише позначають блоки як
+            незаписані, не перезаписуючи носій, тому режим вимкнено за замовчуванням.
+        deallocate: Після всіх проходів звільнити блоки файлу через FALLOC_FL_PUNCH_HOLE
+        range_workers: Кількість потоків, що записують суміжні частини файлу одночасно
+            (os.pwrite звільняє GIL); наступний прохід починається лише після запису
+            та синхронізації всіх частин попереднього
+        pipeline: Генерувати випадкові дані у фоновому потоці, поки записується попередній буфер
+
+    Шаблони можуть бути багатобайтовими (наприклад, 0x92 0x49 0x24 у методі Гутмана).
+    """
+
+    def __init__(self, passes, chunk_size=DEFAULT_CHUNK_SIZE, keystream_mode='prng',
+                 direct_io=False, throttle=None, verify=None, verify_samples=DEFAULT_VERIFY_SAMPLES,
+                 durability='fsync', sparse=True, offload_zero=False, deallocate=False,
+                 range_workers=1, pipeline=True):
+        if verify not in (None, 'full', 'sample'):
+            raise ValueError(f"Невідомий режим перевірки: {verify}")
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Невідома політика синхронізації: {durability}")
+        if chunk_size <= 0:
+            raise ValueError("chunk_size має бути додатним")
+        self.passes = list(passes)
+        self.direct_io = direct_io
+
+        # Розмір буфера кратний довжині кожного шаблону (щоб кожен фрагмент починався
+        # з початку шаблону) та, для O_DIRECT, вирівнюванню
+        multiple = 1
+        for _, data_byte in self.passes:
+            if data_byte is not None:
+                multiple = multiple * len(data_byte) // math.gcd(multiple, len(data_byte))
+        if direct_io:
+            multiple = multiple * DIRECT_IO_ALIGNMENT // math.gcd(multiple, DIRECT_IO_ALIGNMENT)
+        self.chunk_size = _round_up(chunk_size, multiple)
+
+        self.keystream_mode = keystream_mode
+        self.throttle = throttle
+        self.verify = verify
+        self.verify_samples = verify_samples
+        self.durability = durability
+        self.sparse = sparse
+        self.offload_zero = offload_zero
+        self.deallocate = deallocate
+        self.range_workers = max(1, range_workers)
+        self.pipeline = pipeline
+        self._compiled_buffers = None
+
+    @classmethod
+    def for_memory_budget(cls, passes, memory_budget, **kwargs):
+        """
+        Створити рушій, чиї буфери разом не перевищують memory_budget байтів
+
+        Розмір буфера не залежить від розміру файлу, тому споживання пам'яті
+        на завдання фіксоване.
+        """
+        patterns = {data_byte for _, data_byte in passes}
+        distinct = len(patterns) or 1
+        if None in patterns and kwargs.get('pipeline', True):
+            # Випадковий прохід з конвеєром використовує PIPELINE_BUFFERS буферів
+            distinct += PIPELINE_BUFFERS - 1
+        return cls(passes, chunk_size=max(1, memory_budget // distinct), **kwargs)
+
+    def new_keystream(self):
+        """Створити нове джерело псевдовипадкових даних для одного проходу"""
+        return make_keystream(self.keystream_mode)
+
+    def _new_buffer(self, data_byte, size):
+        # Буфер багатобайтового шаблону довший на len-1 байтів: зріз buffer[phase:]
+        # дає шаблон, що починається з будь-якої фази (для діапазонів з довільним зміщенням)
+        if data_byte is not None:
+            size += len(data_byte) - 1
+        if self.direct_io:
+            # Анонімний mmap завжди вирівняний по межі сторінки
+            buffer = memoryview(mmap.mmap(-1, _round_up(size, DIRECT_IO_ALIGNMENT)))[:size]
+            if data_byte is not None:
+                buffer[:] = repeat_pattern(data_byte, size)
+            return buffer
+        if data_byte is None:
+            return memoryview(bytearray(size))
+        return memoryview(repeat_pattern(data_byte, size))
+
+    def compile(self):
+        """
+        Попередньо обчислити буфери всіх постійних шаблонів
+
+        Після компіляції рушій можна використовувати для багатьох завдань (зокрема
+        з різних потоків): буфери шаблонів лише читаються й спільні для всіх завдань,
+        а буфер випадкових даних виділяється для кожного завдання окремо.
+        """
+        if self._compiled_buffers is None:
+            self._compiled_buffers = {
+                data_byte: self._new_buffer(data_byte, self.chunk_size)
+                for data_byte in {data_byte for _, data_byte in self.passes if data_byte is not None}
+            }
+        return self
+
+    def allocate_buffers(self, file_size, report):
+        """Виділити по одному буферу на кожен шаблон (та один для випадкових даних)"""
+        size = max(1, min(self.chunk_size, file_size))
+        buffers = {}
+        for _, data_byte in self.passes:
+            if data_byte in buffers:
+                continue
+            if self._compiled_buffers is not None and data_byte is not None:
+                buffers[data_byte] = self._compiled_buffers[data_byte][:size + len(data_byte) - 1]
+                continue
+            buffers[data_byte] = self._new_buffer(data_byte, size)
+            report.buffers_allocated += 1
+        return buffers
+
+    def write_pass(self, target, buffer, file_size, data_byte, report,
+                   progress_callback=None, keystream=None, throttle=None, sync=True, ranges=None,
+                   start_offset=0, checkpoint=None, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Виконати один прохід перезапису відкритого файлу
+
+        Args:
+            target: FileTarget, відкритий для запису
+            buffer: Попередньо виділений memoryview для цього шаблону
+            file_size: Кількість байтів для перезапису
+            data_byte: Шаблон (bytes) або None для псевдовипадкових даних
+            report: WipeReport для накопичення лічильників
+            progress_callback: Функція прогресу проходу (0-100)
+            keystream: Джерело даних для випадкового проходу
+            throttle: Обмежувач пропускної здатності (за замовчуванням self.throttle)
+            sync: Синхронізувати файл наприкінці проходу
+            ranges: Список (зміщення, довжина) для перезапису; None - весь файл
+            start_offset: Продовжити прохід з цього зміщення (відновлення після збою)
+            checkpoint: Викликається зі зміщенням, до якого прохід синхронізовано на носій,
+                не частіше ніж раз на checkpoint_interval секунд (лише для послідовного запису:
+                паралельний прохід фіксується контрольною точкою після завершення)
+        """
+        if data_byte is None and keystream is None:
+            keystream = self.new_keystream()
+        throttle = throttle or self.throttle
+        if ranges is None:
+            ranges = [(0, file_size)]
+        report.bytes_skipped += file_size - sum(length for _, length in ranges)
+        if start_offset:
+            ranges = [(max(start, start_offset), start + length - max(start, start_offset))
+                      for start, length in ranges if start + length > start_offset]
+
+        if self.offload_zero and is_zero_pattern(data_byte) and zero_ranges(target.fd, ranges):
+            report.offloaded_bytes += sum(length for _, length in ranges)
+            if sync:
+                self.sync_target(target, report)
+            if progress_callback:
+                progress_callback(100)
+            return
+
+        period = len(data_byte) if data_byte is not None else 1
+        chunk_size = len(buffer) - (period - 1)
+        total = sum(length for _, length in ranges)
+        parts = min(self.range_workers, -(-total // chunk_size))
+        if parts > 1:
+            self._write_parallel(target, buffer, data_byte, keystream, throttle, ranges, parts,
+                                 report, progress_callback)
+        else:
+            pool = self._buffer_pool(buffer, data_byte, total)
+            report.buffers_allocated += len(pool) - 1
+            done = 0
+            next_checkpoint = time.monotonic() + checkpoint_interval
+
+            def on_chunk(offset, size):
+                nonlocal done, next_checkpoint
+                done += size
+                if progress_callback:
+                    progress_callback((done / total) * 100)
+                if checkpoint and time.monotonic() >= next_checkpoint:
+                    self.sync_target(target, report)
+                    checkpoint(offset)
+                    next_checkpoint = time.monotonic() + checkpoint_interval
+
+            written, calls = self._write_ranges(target, pool, data_byte, keystream, throttle, ranges,
+                                                on_chunk if progress_callback or checkpoint else None)
+            report.bytes_written += written
+            report.write_calls += calls
+
+        if sync:
+            self.sync_target(target, report)
+
+    def _buffer_pool(self, buffer, data_byte, size):
+        """Буфери для запису size байтів: для випадкового проходу з конвеєром - PIPELINE_BUFFERS"""
+        if data_byte is not None or not self.pipeline or size <= len(buffer):
+            return [buffer]
+        return [buffer] + [self._new_buffer(None, len(buffer)) for _ in range(PIPELINE_BUFFERS - 1)]
+
+    def _write_ranges(self, target, buffers, data_byte, keystream, throttle, ranges, on_chunk=None):
+        """
+        Записати діапазони послідовно в одному потоці
+
+        on_chunk викликається з (зміщення кінця фрагмента, розмір) після кожного запису.
+        Якщо передано кілька буферів випадкового проходу, використовується конвеєр.
+
+        Returns:
+            (записано байтів, кількість викликів запису)
+        """
+        if len(buffers) > 1:
+            return self._write_pipelined(target, buffers, keystream, throttle, ranges, on_chunk)
+        buffer = buffers[0]
+        period = len(data_byte) if data_byte is not None else 1
+        chunk_size = len(buffer) - (period - 1)
+        written = calls = 0
+        for start, length in ranges:
+            offset = start
+            end = start + length
+            while offset < end:
+                current_chunk = min(chunk_size, end - offset)
+                phase = offset % period
+                chunk = buffer[phase:phase + current_chunk]
+                if data_byte is None:
+                    keystream.fill(chunk, offset)
+                if throttle:
+                    throttle(current_chunk)
+
+                calls += target.write(chunk, offset)
+                offset += current_chunk
+                written += current_chunk
+                if on_chunk:
+                    on_chunk(offset, current_chunk)
+        return written, calls
+
+    def _write_pipelined(self, target, buffers, keystream, throttle, ranges, on_chunk=None):
+        """
+        Записати випадкові дані конвеєром генерація/запис
+
+        Фоновий потік заповнює наступний вільний буфер ключовим потоком, поки поточний
+        потік записує попередній (os.pwrite звільняє GIL). Записані буфери повертаються
+        генератору, тож під час проходу пам'ять не виділяється.
+        """
+        chunk_size = len(buffers[0])
+        free = queue.SimpleQueue()
+        ready = queue.SimpleQueue()
+        for buffer in buffers:
+            free.put(buffer)
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for start, length in ranges:
+                    end = start + length
+                    for offset in range(start, end, chunk_size):
+                        buffer = free.get()
+                        if stop.is_set():
+                            return
+                        chunk = buffer[:min(chunk_size, end - offset)]
+                        keystream.fill(chunk, offset)
+                        ready.put((buffer, chunk, offset))
+                ready.put(None)
+            except BaseException as e:
+                ready.put(e)
+
+        producer = threading.Thread(target=produce, name='wipe-keystream', daemon=True)
+        producer.start()
+        written = calls = 0
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                buffer, chunk, offset = item
+                if throttle:
+                    throttle(len(chunk))
+                calls += target.write(chunk, offset)
+                written += len(chunk)
+                free.put(buffer)
+                if on_chunk:
+                    on_chunk(offset + len(chunk), len(chunk))
+        finally:
+            stop.set()
+            free.put(None)  # розбудити генератор, якщо він чекає на вільний буфер
+            producer.join()
+        return written, calls
+
+    def _write_parallel(self, target, buffer, data_byte, keystream, throttle, ranges, parts,
+                        report, progress_callback=None):
+        """
+        Записати діапазони проходу кількома потоками, кожен - свою суміжну частину файлу
+
+        Буфер шаблону лише читається й спільний для всіх потоків; для випадкового проходу
+        кожен потік має власні буфери і копію ключового потоку з тим самим ключем, тож
+        записані дані збігаються з послідовним проходом (і перевірка лишається коректною).
+        """
+        period = len(data_byte) if data_byte is not None else 1
+        total = sum(length for _, length in ranges)
+        split = split_ranges(ranges, parts, len(buffer) - (period - 1))
+        lock = threading.Lock()
+        done = 0
+
+        def on_chunk(offset, size):
+            nonlocal done
+            with lock:
+                done += size
+                progress_callback((done / total) * 100)
+
+        pools = []
+        for index, part in enumerate(split):
+            part_buffer = buffer
+            if data_byte is None and index:
+                part_buffer = self._new_buffer(None, len(buffer))
+            pools.append(self._buffer_pool(part_buffer, data_byte, sum(length for _, length in part)))
+            report.buffers_allocated += len(pools[-1]) - (0 if part_buffer is not buffer else 1)
+
+        def write_part(pool, part, index):
+            part_keystream = keystream.clone() if data_byte is None and index else keystream
+            return self._write_ranges(target, pool, data_byte, part_keystream, throttle, part,
+                                      on_chunk if progress_callback else None)
+
+        with ThreadPoolExecutor(max_workers=len(split), thread_name_prefix='wipe-range') as executor:
+            results = list(executor.map(write_part, pools, split, range(len(split))))
+
+        for written, calls in results:
+            report.bytes_written += written
+            report.write_calls += calls
+
+    def sync_target(self, target, report):
+        """Синхронізувати файл відповідно до політики durability, враховуючи тривалість"""
+        started = time.perf_counter()
+        report.sync_calls += target.sync(self.durability)
+        report.sync_durations.append(time.perf_counter() - started)
+
+    def deallocate_file(self, filepath, file_size, report, ranges=None):
+        """Звільнити блоки файлу (FALLOC_FL_PUNCH_HOLE) перед видаленням"""
+        fd = os.open(filepath, os.O_RDWR | getattr(os, 'O_BINARY', 0))
+        try:
+            report.deallocated = punch_holes(fd, ranges if ranges is not None else [(0, file_size)])
+            if report.deallocated:
+                os.fsync(fd)
+                report.sync_calls += 1
+        finally:
+            os.close(fd)
+
+    def file_ranges(self, target, file_size, report):
+        """Діапазони для перезапису: лише розміщені екстенти, якщо увімкнено sparse"""
+        if not self.sparse:
+            return None
+        ranges = allocated_ranges(target.fd, file_size)
+        report.allocated_bytes = sum(length for _, length in ranges)
+        return ranges
+
+    def verify_pass(self, filepath, file_size, data_byte, keystream, report, ranges=None):
+        """
+        Прочитати файл і порівняти з даними останнього проходу
+
+        Очікувані дані відтворюються тим самим детермінованим ключовим потоком
+        (або шаблоном); порівняння виконується цілими буферами без циклів по байтах.
+
+        Перевіряються лише діапазони ranges (None - весь файл).
+
+        Raises:
+            VerificationError: якщо знайдено розбіжність
+        """
+        if ranges is None:
+            ranges = [(0, file_size)]
+
+        if self.verify == 'full':
+            block = max(1, min(self.chunk_size, file_size))
+            blocks = (
+                (offset, min(block, start + length - offset))
+                for start, length in ranges
+                for offset in range(start, start + length, block)
+            )
+        else:
+            block = max(1, min(VERIFY_SAMPLE_BLOCK, file_size))
+            counts = [-(-length // block) for _, length in ranges]
+            chosen = sorted(random.SystemRandom().sample(range(sum(counts)),
+                                                         min(self.verify_samples, sum(counts))))
+            blocks = []
+            range_index = base = 0
+            for index in chosen:
+                while index >= base + counts[range_index]:
+                    base += counts[range_index]
+                    range_index += 1
+                start, length = ranges[range_index]
+                offset = start + (index - base) * block
+                blocks.append((offset, min(block, start + length - offset)))
+
+        actual = bytearray(block)
+        expected = bytearray(block) if data_byte is None else repeat_pattern(data_byte, block)
+        phase = 0
+        report.verify_mode = self.verify
+        started = time.perf_counter()
+
+        with open(filepath, 'rb', buffering=0) as f:
+            if hasattr(os, 'posix_fadvise'):
+                # Скинути сторінки з кешу, щоб читання йшло з носія, а не з пам'яті
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+            view = memoryview(actual)
+            for offset, size in blocks:
+                f.seek(offset)
+                got = 0
+                while got < size:
+                    count = f.readinto(view[got:size])
+                    if not count:
+                        break
+                    got += count
+                if keystream is not None:
+                    keystream.fill(memoryview(expected)[:size], offset)
+                elif offset % len(data_byte) != phase:
+                    phase = offset % len(data_byte)
+                    expected = repeat_pattern(data_byte, block, phase)
+
+                if size == block:
+                    matches = actual == expected
+                else:
+                    matches = got == size and actual[:size] == expected[:size]
+                if got != size or not matches:
+                    report.verify_duration = time.perf_counter() - started
+                    raise VerificationError(
+                        f"Перевірка не пройдена: розбіжність у блоці зі зміщенням {offset}"
+                    )
+                report.verified_bytes += size
+
+        report.verify_duration = time.perf_counter() - started
+
+    def run(self, filepath, file_size=None, progress_callback=None, pass_callback=None, report=None,
+            throttle=None, resume=None, checkpoint=None, checkpoint_interval=DEFAULT_CHECKPOINT_INTERVAL):
+        """
+        Виконати всі проходи для файлу
+
+        Args:
+            filepath: Шлях до файлу
+            file_size: Розмір файлу (якщо вже відомий)
+            progress_callback: Функція загального прогресу (0-100)
+            pass_callback: Викликається на початку кожного проходу з (номер, всього, назва)
+            report: WipeReport для заповнення (щоб зберегти частковий підсумок у разі помилки)
+            throttle: Обмежувач пропускної здатності для цього завдання
+            resume: (номер проходу з нуля, зміщення) - продовжити перерване завдання
+            checkpoint: Викликається з (номер проходу, зміщення) після синхронізації файлу:
+                періодично всередині проходу та після проходу, якщо з попередньої контрольної
+                точки минуло не менше checkpoint_interval (короткі файли не збільшують
+                кількість записів журналу)
+            checkpoint_interval: Мінімальний період контрольних точок у секундах
+
+        Returns:
+            WipeReport з підсумком виконання
+        """
+        if file_size is None:
+            file_size = os.path.getsize(filepath)
+
+        if report is None:
+            report = WipeReport(path=str(filepath), size=file_size)
+        buffers = self.allocate_buffers(file_size, report)
+        total_passes = len(self.passes)
+
+        start_pass, start_offset = resume or (0, 0)
+        if self.verify and self.passes and self.passes[-1][1] is None and start_pass >= total_passes - 1:
+            # Ключ потоку останнього проходу не зберігається: для перевірки прохід повторюється повністю
+            start_pass, start_offset = total_passes - 1, 0
+        if start_pass or start_offset:
+            # Нове завдання з журналом теж передає resume=(0, 0): це не продовження
+            report.resumed_from = (start_pass, start_offset)
+
+        target = FileTarget(filepath, self.direct_io)
+        keystream = None
+        ranges = None
+        last_checkpoint = [time.monotonic()]
+        try:
+            ranges = self.file_ranges(target, file_size, report)
+            for pass_num, (pass_name, data_byte) in enumerate(self.passes, 1):
+                if pass_num <= start_pass:
+                    continue
+                if pass_callback:
+                    pass_callback(pass_num, total_passes, pass_name)
+
+                def pass_progress(progress, pass_num=pass_num):
+                    if progress_callback:
+                        progress_callback(((pass_num - 1) * 100 + progress) / total_passes)
+
+                pass_checkpoint = None
+                if checkpoint:
+                    def pass_checkpoint(offset, pass_index=pass_num - 1):
+                        checkpoint(pass_index, offset)
+                        last_checkpoint[0] = time.monotonic()
+
+                keystream = self.new_keystream() if data_byte is None else None
+                started = time.perf_counter()
+                written = report.bytes_written + report.offloaded_bytes
+                self.write_pass(target, buffers[data_byte], file_size, data_byte, report,
+                                pass_progress, keystream, throttle, ranges=ranges,
+                                start_offset=start_offset if pass_num == start_pass + 1 else 0,
+                                checkpoint=pass_checkpoint, checkpoint_interval=checkpoint_interval)
+                report.passes.append(pass_name)
+                report.pass_durations.append(time.perf_counter() - started)
+                report.pass_bytes.append(report.bytes_written + report.offloaded_bytes - written)
+                if checkpoint and time.monotonic() - last_checkpoint[0] >= checkpoint_interval:
+                    checkpoint(pass_num, 0)
+                    last_checkpoint[0] = time.monotonic()
+        finally:
+            report.direct_io = target.direct
+            target.close()
+
+        if self.verify and self.passes:
+            self.verify_pass(filepath, file_size, self.passes[-1][1], keystream, report, ranges)
+        if self.deallocate:
+            self.deallocate_file(filepath, file_size, report, ranges)
+
+        return report
+
+    def run_batch(self, filepaths, progress_callback=None, pass_callback=None, throttle=None,
+                  sizes=None):
+        """
+        Виконати всі проходи для групи файлів: прохід N для всіх файлів, потім прохід N+1
+
+        З політикою 'batch' файли групи не синхронізуються після свого запису: наприкінці
+        проходу кожен ще відкритий файл групи скидається fdatasync, тож запис усіх файлів
+        проходу вже в черзі пристрою (інші ФС системи не зачіпаються, на відміну від os.sync).
+        sizes - вже відомі розміри файлів (інакше кожен файл перевіряється os.path.getsize).
+
+        Returns:
+            Список WipeReport у порядку filepaths
+        """
+        if sizes is None:
+            sizes = [os.path.getsize(path) for path in filepaths]
+        reports = [WipeReport(path=str(path), size=size) for path, size in zip(filepaths, sizes)]
+        total_bytes = sum(report.size for report in reports) * len(self.passes)
+        done_bytes = 0
+        deferred_sync = self.durability == 'batch'
+
+        for start in range(0, len(reports), BATCH_MAX_OPEN):
+            group = reports[start:start + BATCH_MAX_OPEN]
+            targets = []
+            try:
+                for report in group:
+                    targets.append(FileTarget(report.path, self.direct_io))
+                buffers = [self.allocate_buffers(report.size, report) for report in group]
+                ranges = [self.file_ranges(target, report.size, report)
+                          for target, report in zip(targets, group)]
+                keystreams = [None] * len(group)
+
+                for pass_num, (pass_name, data_byte) in enumerate(self.passes, 1):
+                    if pass_callback:
+                        pass_callback(pass_num, len(self.passes), pass_name)
+                    for i, (target, report) in enumerate(zip(targets, group)):
+                        keystreams[i] = self.new_keystream() if data_byte is None else None
+                        started = time.perf_counter()
+                        written = report.bytes_written + report.offloaded_bytes
+                        self.write_pass(target, buffers[i][data_byte], report.size, data_byte, report,
+                                        keystream=keystreams[i], throttle=throttle, sync=not deferred_sync,
+                                        ranges=ranges[i])
+                        report.passes.append(pass_name)
+                        report.pass_durations.append(time.perf_counter() - started)
+                        report.pass_bytes.append(report.bytes_written + report.offloaded_bytes - written)
+                        done_bytes += report.size
+                        if progress_callback and total_bytes:
+                            progress_callback(done_bytes / total_bytes * 100)
+                    if deferred_sync:
+                        for target, report in zip(targets, group):
+                            self.sync_target(target, report)
+            finally:
+                for target, report in zip(targets, group):
+                    report.direct_io = target.direct
+                    target.close()
+
+            if self.verify and self.passes:
+                for report, keystream, file_ranges in zip(group, keystreams, ranges):
+                    self.verify_pass(report.path, report.size, self.passes[-1][1], keystream, report,
+                                     file_ranges)
+            if self.deallocate:
+                for report, file_ranges in zip(group, ranges):
+                    self.deallocate_file(report.path, report.size, report, file_ranges)
+
+        return reports
@@ -0,0 +1,110 @@
+"""
+Wipe Plans - стандарти перезапису, спільні для SecureFileDeleter та server.py
+Кожен план - це таблиця проходів, що компілюється в WipeEngine з попередньо обчисленими буферами
+"""
+
+from dataclasses import dataclass
+
+from wipe_engine import DEFAULT_CHUNK_SIZE, WipeEngine
+
+
+@dataclass(frozen=True)
+class WipePlan:
+    """
+    План перезапису
+
+    Args:
+        name: Коротка назва плану
+        title: Назва для користувача
+        passes: Кортеж (назва проходу, шаблон bytes або None для псевдовипадкових даних)
+    """
+    name: str
+    title: str
+    passes: tuple
+
+    def compile(self, chunk_size=DEFAULT_CHUNK_SIZE, memory_budget=None, **engine_kwargs):
+        """
+        Скомпілювати план у рушій з попередньо обчисленими буферами шаблонів
+
+        Args:
+            chunk_size: Розмір буфера запису
+            memory_budget: Якщо задано - загальний обсяг буферів шаблонів (перекриває chunk_size)
+            **engine_kwargs: Параметри WipeEngine (durability, direct_io, verify, ...)
+        """
+        if memory_budget is not None:
+            engine = WipeEngine.for_memory_budget(self.passes, memory_budget, **engine_kwargs)
+        else:
+            engine = WipeEngine(self.passes, chunk_size=chunk_size, **engine_kwargs)
+        return engine.compile()
+
+
+def _pattern_pass(pattern):
+    return ('0x' + pattern.hex().upper(), pattern)
+
+
+def _random_passes(start, count):
+    return tuple((f'Random {i}', None) for i in range(start, start + count))
+
+
+VSITR = WipePlan(
+    name='vsitr',
+    title='German VSITR (7 проходів)',
+    passes=(
+        ('0x00', b'\x00'),
+        ('0xFF', b'\xFF'),
+        ('Random 1', None),
+        ('Random 2', None),
+        ('Random 3', None),
+        ('0xAA', b'\xAA'),
+        ('Random 4', None),
+    ),
+)
+
+DOD_5220_22_M = WipePlan(
+    name='dod',
+    title='DoD 5220.22-M (3 проходи)',
+    passes=(
+        ('0x00', b'\x00'),
+        ('0xFF', b'\xFF'),
+        ('Random', None),
+    ),
+)
+
+GUTMANN = WipePlan(
+    name='gutmann',
+    title='Peter Gutmann (35 проходів)',
+    passes=(
+        _random_passes(1, 4)
+        + tuple(_pattern_pass(bytes.fromhex(p)) for p in (
+            '55', 'AA', '924924', '492492', '249249',
+            '00', '11', '22', '33', '44', '55', '66', '77',
+            '88', '99', 'AA', 'BB', 'CC', 'DD', 'EE', 'FF',
+            '924924', '492492', '249249', '6DB6DB', 'B6DB6D', 'DB6DB6',
+        ))
+        + _random_passes(5, 4)
+    ),
+)
+
+ZERO = WipePlan(
+    name='zero',
+    title='Один прохід нулями',
+    passes=(('0x00', b'\x00'),),
+)
+
+RANDOM = WipePlan(
+    name='random',
+    title='Один прохід псевдовипадковими даними',
+    passes=(('Random', None),),
+)
+
+PLANS = {plan.name: plan for plan in (VSITR, DOD_5220_22_M, GUTMANN, ZERO, RANDOM)}
+
+DEFAULT_PLAN = VSITR.name
+
+
+def get_plan(name):
+    """Повернути план за назвою"""
+    try:
+        return PLANS[name]
+    except KeyError:
+        raise ValueError(f"Невідомий план перезапису: {name} (доступні: {', '.join(PLANS)})")